@@ -0,0 +1,23 @@
+# coastlib, a coastal engineering Python library
+# Copyright (C), 2019 Georgii Bocharov
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+"""
+Airspeed velocity (asv) benchmarks, see https://asv.readthedocs.io
+    asv run                                  - benchmark latest commit, results are stored in benchmarks/results
+    asv continuous master HEAD --factor 1.1  - compare HEAD against master, fails on >10% regressions
+    asv compare <commit_1> <commit_2>        - compare stored results
+    asv run --python=same --quick            - quick check in the current environment
+"""
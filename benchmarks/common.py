@@ -0,0 +1,59 @@
+# coastlib, a coastal engineering Python library
+# Copyright (C), 2019 Georgii Bocharov
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+import numpy as np
+import pandas as pd
+
+
+def synthetic_record(years, frequency='H', seed=0):
+    """
+    Generates a synthetic water level record - semidiurnal tide, Gumbel-distributed surge and sea level rise,
+    with a 30-day gap every 10 years and 1% of observations missing in 6-hour gaps.
+
+    Parameters
+    ----------
+    years : float
+        Record length in years.
+    frequency : str, optional
+        Sampling frequency, e.g. 'H' for hourly or '6min' for 6-minute records (default='H').
+    seed : int, optional
+        Random seed (default=0).
+
+    Returns
+    -------
+    pd.Series
+        Water level series with pd.DatetimeIndex.
+    """
+
+    random_state = np.random.RandomState(seed)
+    step = pd.tseries.frequencies.to_offset(frequency).nanos
+    index = pd.date_range('1950-01-01', periods=int(years * 365.2425 * 24 * 3600e9 / step), freq=frequency)
+    hours = (index - index[0]).total_seconds().values / 3600
+    values = (
+        np.sin(2 * np.pi * hours / 12.42) +
+        .2 * random_state.gumbel(size=len(index)) +
+        .003 * hours / 8766
+    )
+    series = pd.Series(values, index=index, name='Water Level')
+
+    # Long gaps (30 days every 10 years)
+    mask = np.ones(len(series), dtype=bool)
+    mask[(hours % (10 * 8766) > 5 * 8766) & (hours % (10 * 8766) < 5 * 8766 + 30 * 24)] = False
+    # Short gaps (6 hours)
+    gap = int(6 * 3600e9 / step)
+    for start in random_state.randint(0, max(1, len(series) - gap), size=max(1, len(series) // gap // 100)):
+        mask[start:start + gap] = False
+    return series[mask]
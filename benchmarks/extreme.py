@@ -0,0 +1,155 @@
+# coastlib, a coastal engineering Python library
+# Copyright (C), 2019 Georgii Bocharov
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+import numpy as np
+
+from coastlib.stats.extreme import EVA
+from .common import synthetic_record
+
+
+class Initialization:
+    params = ([1, 10, 100], ['H', '6min'])
+    param_names = ['years', 'frequency']
+    timeout = 600
+
+    def setup(self, years, frequency):
+        self.series = synthetic_record(years, frequency)
+
+    def time_init(self, years, frequency):
+        EVA(self.series)
+
+    def peakmem_init(self, years, frequency):
+        EVA(self.series)
+
+
+class Extraction:
+    params = ([1, 10, 100], ['H', '6min'])
+    param_names = ['years', 'frequency']
+    timeout = 600
+
+    def setup(self, years, frequency):
+        series = synthetic_record(years, frequency)
+        self.threshold = np.quantile(series.values, .999)
+        self.eva = EVA(series)
+
+    def time_block_maxima(self, years, frequency):
+        self.eva.get_extremes(method='BM')
+
+    def peakmem_block_maxima(self, years, frequency):
+        self.eva.get_extremes(method='BM')
+
+    def time_peaks_over_threshold(self, years, frequency):
+        self.eva.get_extremes(method='POT', threshold=self.threshold, r=24)
+
+    def peakmem_peaks_over_threshold(self, years, frequency):
+        self.eva.get_extremes(method='POT', threshold=self.threshold, r=24)
+
+    def time_r_largest(self, years, frequency):
+        self.eva.get_extremes(method='RL', r_largest=3, r=24)
+
+
+class Fit:
+    params = ([10, 100], ['BM', 'POT'])
+    param_names = ['years', 'method']
+    timeout = 600
+
+    def setup(self, years, method):
+        series = synthetic_record(years, 'H')
+        self.eva = EVA(series)
+        if method == 'BM':
+            self.distribution_name = 'genextreme'
+            self.eva.get_extremes(method='BM')
+        else:
+            self.distribution_name = 'genpareto'
+            self.eva.get_extremes(method='POT', threshold=np.quantile(series.values, .999), r=24)
+
+    def time_mle(self, years, method):
+        self.eva.fit(self.distribution_name, fit_method='MLE')
+
+    def peakmem_mle(self, years, method):
+        self.eva.fit(self.distribution_name, fit_method='MLE')
+
+    def time_mcmc(self, years, method):
+        self.eva.fit(self.distribution_name, fit_method='MCMC', nsamples=100, nwalkers=20)
+
+    def peakmem_mcmc(self, years, method):
+        self.eva.fit(self.distribution_name, fit_method='MCMC', nsamples=100, nwalkers=20)
+
+
+class ConfidenceInterval:
+    params = ([10, 100], ['BM', 'POT'])
+    param_names = ['years', 'method']
+    timeout = 1200
+
+    def setup(self, years, method):
+        series = synthetic_record(years, 'H')
+        self.eva = EVA(series)
+        if method == 'BM':
+            self.eva.get_extremes(method='BM')
+            self.eva.fit('genextreme')
+        else:
+            self.eva.get_extremes(method='POT', threshold=np.quantile(series.values, .999), r=24)
+            self.eva.fit('genpareto')
+        self.rp = np.array([2, 10, 50, 100, 500])
+
+    def time_monte_carlo(self, years, method):
+        self.eva.confidence_interval(self.rp, method='Monte Carlo', k=100)
+
+    def peakmem_monte_carlo(self, years, method):
+        self.eva.confidence_interval(self.rp, method='Monte Carlo', k=100)
+
+    def time_delta(self, years, method):
+        self.eva.confidence_interval(self.rp, method='Delta')
+
+    def peakmem_delta(self, years, method):
+        self.eva.confidence_interval(self.rp, method='Delta')
+
+    def time_generate_results(self, years, method):
+        self.eva.generate_results(alpha=.95, ci_kwargs=dict(method='Monte Carlo', k=100))
+
+
+class ThresholdDiagnostics:
+    params = ([10, 100], ['H', '6min'])
+    param_names = ['years', 'frequency']
+    timeout = 1200
+    # Setup runs before each timed call - select_threshold is timed without GPD fits cached by previous calls
+    number = 1
+
+    def setup(self, years, frequency):
+        series = synthetic_record(years, frequency)
+        self.thresholds = np.quantile(series.values, np.linspace(.99, .9995, 20))
+        self.eva = EVA(series)
+
+    def time_select_threshold(self, years, frequency):
+        self.eva.select_threshold(thresholds=self.thresholds, r=24)
+
+    def peakmem_select_threshold(self, years, frequency):
+        self.eva.select_threshold(thresholds=self.thresholds, r=24)
+
+    def time_mean_residual_life(self, years, frequency):
+        self.eva.plot_mean_residual_life(thresholds=self.thresholds, r=24, plot=False)
+
+    def peakmem_mean_residual_life(self, years, frequency):
+        self.eva.plot_mean_residual_life(thresholds=self.thresholds, r=24, plot=False)
+
+    def time_parameter_stability(self, years, frequency):
+        self.eva.plot_parameter_stability(thresholds=self.thresholds, r=24, plot=False)
+
+    def peakmem_parameter_stability(self, years, frequency):
+        self.eva.plot_parameter_stability(thresholds=self.thresholds, r=24, plot=False)
+
+    def time_extremal_index(self, years, frequency):
+        self.eva.get_extremal_index(self.thresholds)
@@ -15,4 +15,5 @@
 # along with this program. If not, see <http://www.gnu.org/licenses/>.
 
 from coastlib.helper.environment import append_bin
+from coastlib.helper.profiler import Profiler, profiled
 from coastlib.helper.progress_bar import ProgressBar
@@ -0,0 +1,154 @@
+# coastlib, a coastal engineering Python library
+# Copyright (C), 2019 Georgii Bocharov
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+import contextlib
+import functools
+import time
+import tracemalloc
+
+import pandas as pd
+
+
+class Profiler:
+
+    def __init__(self, memory=False, hook=None):
+        """
+        Records wall time, number of calls and, optionally, peak memory of named stages.
+        Stages may be nested - time and memory of a nested stage are included in the enclosing stage.
+
+        Parameters
+        ----------
+        memory : bool, optional
+            If True, traces peak memory allocated within each stage using tracemalloc (default=False).
+            Tracing memory slows down the profiled code significantly.
+        hook : callable, optional
+            Function called after each stage as hook(stage, wall_time, peak_memory) (default=None).
+            Can be used to pass timings to a logger, e.g. hook=lambda *args: logger.info('%s %.3f s %s', *args).
+        """
+
+        self.memory = memory
+        self.hook = hook
+        self.timings = {}
+
+        self.__frames = []
+        self.__started_tracing = False
+
+    @contextlib.contextmanager
+    def stage(self, name):
+        """
+        Context manager recording a stage with <name>.
+
+        Parameters
+        ----------
+        name : str
+            Stage name.
+        """
+
+        if self.memory:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+                self.__started_tracing = True
+            current, peak = tracemalloc.get_traced_memory()
+            # Carry peak of the enclosing stage over the reset
+            if len(self.__frames) > 0:
+                self.__frames[-1]['carried'] = max(self.__frames[-1]['carried'], peak)
+            self.__frames.append(dict(start=current, carried=0))
+            if hasattr(tracemalloc, 'reset_peak'):
+                tracemalloc.reset_peak()
+        start_time = time.perf_counter()
+
+        try:
+            yield
+        finally:
+            wall_time = time.perf_counter() - start_time
+            peak_memory = None
+            if self.memory:
+                frame = self.__frames.pop()
+                peak = max(tracemalloc.get_traced_memory()[1], frame['carried'])
+                peak_memory = peak - frame['start']
+                if len(self.__frames) > 0:
+                    self.__frames[-1]['carried'] = max(self.__frames[-1]['carried'], peak)
+                elif self.__started_tracing:
+                    tracemalloc.stop()
+                    self.__started_tracing = False
+            self.__record(name, wall_time, peak_memory)
+
+    def __record(self, name, wall_time, peak_memory):
+        record = self.timings.setdefault(name, dict(calls=0, wall_time=0., last_wall_time=0., peak_memory=None))
+        record['calls'] += 1
+        record['wall_time'] += wall_time
+        record['last_wall_time'] = wall_time
+        if peak_memory is not None:
+            record['peak_memory'] = max(record['peak_memory'] or 0, peak_memory)
+        if self.hook is not None:
+            self.hook(name, wall_time, peak_memory)
+
+    def reset(self):
+        """
+        Deletes all recorded timings.
+        """
+
+        self.timings.clear()
+
+    def to_dataframe(self):
+        """
+        Returns recorded timings as a table with one row per stage.
+
+        Returns
+        -------
+        pd.DataFrame
+            Table with number of calls, total and last wall time in seconds, and peak memory in bytes.
+        """
+
+        table = pd.DataFrame.from_dict(self.timings, orient='index', columns=[
+            'calls', 'wall_time', 'last_wall_time', 'peak_memory'
+        ])
+        table.columns = ['Calls', 'Wall Time', 'Last Wall Time', 'Peak Memory']
+        table.index.name = 'Stage'
+        return table
+
+    def __getstate__(self):
+        # Hooks (e.g. lambdas or loggers) may not be picklable
+        state = self.__dict__.copy()
+        state['hook'] = None
+        return state
+
+
+def profiled(stage=None):
+    """
+    Decorator recording a method call as a stage of the <profiler> attribute of the object it is called on.
+    Calls the method directly if the object has no profiler (profiler is None).
+
+    Parameters
+    ----------
+    stage : str, optional
+        Stage name (default=None, name of the decorated method).
+    """
+
+    def decorator(method):
+        name = method.__name__ if stage is None else stage
+
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            profiler = getattr(self, 'profiler', None)
+            if profiler is None:
+                return method(self, *args, **kwargs)
+            with profiler.stage(name):
+                return method(self, *args, **kwargs)
+
+        return wrapper
+
+    return decorator
@@ -14,6 +14,8 @@
 # You should have received a copy of the GNU General Public License
 # along with this program. If not, see <http://www.gnu.org/licenses/>.
 
+import functools
+
 import numpy as np
 import scipy.stats
 import mpmath
@@ -99,7 +101,231 @@ def partial_derivative(func, var, order=1, coordinates=None, dx='1e-6', precisio
             )
 
 
-def gradient(func, n, coordinates=None, dx='1e-6', precision=100):
+def stencils(n, orders=(1, 2)):
+    """
+    Generates central difference stencils for partial derivatives of a function of <n> arguments.
+    Derivative by arguments (i, j) is estimated as sum(weight * func(X + offset * dx)) / (2 * dx) ** order,
+    where offsets are integer multiples of spacing dx along each argument.
+    Second derivatives by the same argument use the f(X+2dx) - 2f(X) + f(X-2dx) stencil.
+
+    Parameters
+    ----------
+    n : int
+        Number of positional arguments of the differentiated function.
+    orders : tuple, optional
+        Orders of derivatives - 1 for the gradient and 2 for the Hessian (default=(1, 2)).
+
+    Returns
+    -------
+    dict
+        Dictionary {(i,) or (i, j): [(offset, weight), ...]} with stencils of first derivatives by argument i
+        and second derivatives by arguments i <= j, offset is a tuple of <n> integers.
+    """
+
+    def offset(*steps):
+        _offset = [0] * n
+        for index, step in steps:
+            _offset[index] += step
+        return tuple(_offset)
+
+    _stencils = {}
+    if 1 in orders:
+        for i in range(n):
+            _stencils[(i,)] = [(offset((i, 1)), 1), (offset((i, -1)), -1)]
+    if 2 in orders:
+        for i in range(n):
+            for j in range(i, n):
+                _stencils[(i, j)] = [
+                    (offset((i, step_i), (j, step_j)), step_i * step_j) for step_i in [1, -1] for step_j in [1, -1]
+                ]
+    return _stencils
+
+
+def _evaluate(func, precision, point):
+    """
+    Evaluates <func> at <point> with <precision>.
+    Defined at module level to be usable by process-based executors.
+    """
+
+    with mpmath.workdps(precision or mpmath.mp.dps):
+        return func(*point)
+
+
+def _evaluate_batch(scalar_function, x, vectorized, *coordinates):
+    """
+    Evaluates <scalar_function> for all <x> at <coordinates>.
+    Defined at module level to be usable by process-based executors.
+    """
+
+    if vectorized:
+        return scalar_function(x, *coordinates)
+    return np.array([scalar_function(_x, *coordinates) for _x in x])
+
+
+def finite_differences(func, n, coordinates, orders=(1, 2), dx='1e-6', precision=100,
+                       vectorized=False, executor=None):
+    """
+    Estimates gradient and/or Hessian of the <func> at given <coordinates> using central difference stencils.
+    Unique points of all stencils are enumerated first and <func> is evaluated only once at each of them,
+    derivatives are then assembled from the cached values (e.g. 25 instead of 42 evaluations
+    for the gradient and Hessian of a function of 3 arguments).
+
+    Parameters
+    ----------
+    func : function
+        Function, derivatives of which are estimated. Takes <n> positional arguments X1...Xn
+    n : int
+        Number of positional arguments <func> takes
+    coordinates : array_like or float
+        List of n coordinates X1...Xn, at which the <func> derivatives are estimated.
+    orders : tuple, optional
+        Orders of estimated derivatives - 1 for the gradient and 2 for the Hessian (default=(1, 2)).
+    dx : str or array_like, optional
+        String representing a float representing spacing at which the partial derivatives are estimated (default='1e-6')
+        or a list with spacing for each of n arguments.
+    precision : int, optional
+        Precision of floating point calculations (see mpmath library documentation) (default=100)
+        Set to None to run with numpy without mpmath
+    vectorized : bool, optional
+        If True, <func> is called once with all unique stencil points as an array of shape (m, n)
+        and returns an array of shape (m,) with function values at each of them (default=False).
+    executor : concurrent.futures.Executor, optional
+        Executor used to evaluate <func> at stencil points concurrently (default=None, evaluated sequentially).
+        <func> must be picklable (e.g. defined at module level) for process-based executors.
+
+    Returns
+    -------
+    tuple of numpy.ndarray
+        Gradient of shape (n,1) and/or Hessian of shape (n,n), in the order of <orders>.
+        Arrays hold mpmath.mpf's if <precision> is not None.
+    """
+
+    for order in orders:
+        if order not in [1, 2]:
+            raise ValueError(f'Derivatives of order {order} are not supported')
+    if vectorized and executor is not None:
+        raise ValueError('Vectorized function cannot be evaluated using an executor')
+
+    _stencils = stencils(n, orders)
+    with mpmath.workdps(precision or mpmath.mp.dps):
+        if precision is None:
+            coordinates = np.atleast_1d(np.asarray(coordinates, dtype=np.float64))
+            spacing = np.array([float(_dx) for _dx in np.broadcast_to(np.array(dx, dtype=object), (n,))])
+        else:
+            coordinates = np.array([mpmath.mpf(str(_c)) for _c in np.atleast_1d(coordinates)], dtype=object)
+            spacing = np.array([mpmath.mpf(_dx) for _dx in np.broadcast_to(np.array(dx, dtype=object), (n,))])
+        if len(coordinates) != n:
+            raise ValueError(f'Expected {n} coordinates, {len(coordinates)} were given')
+
+        # Evaluate <func> once at each unique stencil point
+        offsets = list(dict.fromkeys(offset for stencil in _stencils.values() for offset, weight in stencil))
+        points = coordinates + np.array(offsets) * spacing
+        if vectorized:
+            point_values = func(points)
+        elif executor is not None:
+            point_values = list(executor.map(functools.partial(_evaluate, func, precision), points))
+        else:
+            point_values = [func(*point) for point in points]
+        values = dict(zip(offsets, point_values))
+
+        # Assemble derivatives from cached values
+        estimates = {}
+        for indexes, stencil in _stencils.items():
+            estimates[indexes] = sum(weight * values[offset] for offset, weight in stencil)
+            for index in indexes:
+                estimates[indexes] /= 2 * spacing[index]
+        dtype = np.float64 if precision is None else object
+        results = []
+        for order in orders:
+            if order == 1:
+                results.append(np.array([[estimates[(i,)]] for i in range(n)], dtype=dtype))
+            else:
+                results.append(
+                    np.array([[estimates[(min(i, j), max(i, j))] for j in range(n)] for i in range(n)], dtype=dtype)
+                )
+    return tuple(results)
+
+
+def richardson(func, n, coordinates, orders=(1, 2), dx='1e-2', levels=4, factor=2, vectorized=False, executor=None):
+    """
+    Estimates gradient and/or Hessian of the <func> at given <coordinates> in float64 using central differences
+    with spacing reduced by <factor> at each of <levels>, which are combined using Richardson extrapolation.
+    Extrapolation cancels truncation error of central differences, which allows large spacing
+    (rounding error of float64 is small) without the loss of accuracy - mpmath is not required.
+    For each derivative the extrapolated estimate with smallest error estimate is returned.
+    https://en.wikipedia.org/wiki/Richardson_extrapolation
+
+    Parameters
+    ----------
+    func : function
+        Function, derivatives of which are estimated. Takes <n> positional float arguments X1...Xn.
+        Must be smooth and finite within the initial spacing of <coordinates>.
+    n : int
+        Number of positional arguments <func> takes
+    coordinates : array_like or float
+        List of n coordinates X1...Xn, at which the <func> derivatives are estimated.
+    orders : tuple, optional
+        Orders of estimated derivatives - 1 for the gradient and 2 for the Hessian (default=(1, 2)).
+    dx : str or array_like, optional
+        String representing a float representing initial spacing relative to max(abs(X), 1) (default='1e-2')
+        or a list with relative initial spacing for each of n arguments.
+    levels : int, optional
+        Number of spacings (default=4).
+    factor : float, optional
+        Ratio of consecutive spacings (default=2).
+    vectorized : bool, optional
+        See finite_differences (default=False).
+    executor : concurrent.futures.Executor, optional
+        See finite_differences (default=None).
+
+    Returns
+    -------
+    tuple(tuple, tuple)
+        Estimates and estimates of their truncation error (rounding error of float64 is not included) -
+        gradient of shape (n,1) and/or Hessian of shape (n,n) in the order of <orders>.
+    """
+
+    if levels < 2:
+        raise ValueError(f'At least 2 levels are required, {levels} was given')
+
+    coordinates = np.atleast_1d(np.asarray(coordinates, dtype=np.float64))
+    if len(coordinates) != n:
+        raise ValueError(f'Expected {n} coordinates, {len(coordinates)} were given')
+    spacing = np.array([float(_dx) for _dx in np.broadcast_to(np.array(dx, dtype=object), (n,))])
+    spacing *= np.maximum(np.abs(coordinates), 1)
+    # Central difference estimates for each spacing - tables[k][order index]
+    tables = [
+        finite_differences(
+            func=func, n=n, coordinates=coordinates, orders=orders, dx=spacing / factor ** level,
+            precision=None, vectorized=vectorized, executor=executor
+        )
+        for level in range(levels)
+    ]
+
+    estimates, errors = [], []
+    for index in range(len(orders)):
+        # Romberg table - truncation error of central differences is a series in even powers of spacing,
+        # each column cancels the leading term of the previous one
+        previous = [table[index] for table in tables]
+        best_estimate, best_error = previous[-1], np.full(previous[-1].shape, np.inf)
+        for column in range(1, levels):
+            current = [
+                fine + (fine - coarse) / (factor ** (2 * column) - 1)
+                for coarse, fine in zip(previous[:-1], previous[1:])
+            ]
+            # Error is estimated as the largest difference with estimates of the previous column it was derived from
+            for estimate, coarse, fine in zip(current, previous[:-1], previous[1:]):
+                error = np.maximum(np.abs(estimate - fine), np.abs(estimate - coarse))
+                improved = error < best_error
+                best_estimate = np.where(improved, estimate, best_estimate)
+                best_error = np.where(improved, error, best_error)
+            previous = current
+        estimates.append(best_estimate)
+        errors.append(best_error)
+    return tuple(estimates), tuple(errors)
+
+
+def gradient(func, n, coordinates=None, dx='1e-6', precision=100, vectorized=False, executor=None):
     """
     Estimates gradient of the <func> at given <coordinates>
     or returns an array with partial derivative functions of shape (n,1)
@@ -120,6 +346,12 @@ def gradient(func, n, coordinates=None, dx='1e-6', precision=100):
         Precision of floating point calculations (see mpmath library documentation) (default=100)
         Some functions are incompatible with mpmath. Set <precision> to None to avoid errors or rewrite the function.
         Derivative estimated without high <precision> may have a significant error due to rounding and under-/overflow
+    vectorized : bool, optional
+        If True, <func> takes an array of shape (m, n) with m points and returns an array of shape (m,)
+        (default=False). Used only if <coordinates> are passed (see finite_differences).
+    executor : concurrent.futures.Executor, optional
+        Executor used to evaluate <func> concurrently (default=None).
+        Used only if <coordinates> are passed (see finite_differences).
 
     Returns
     -------
@@ -127,6 +359,11 @@ def gradient(func, n, coordinates=None, dx='1e-6', precision=100):
         The gradient matrix of the <func> with either partial derivative functions or estimates
         of these functions at <coordinates>
     """
+    if coordinates is not None:
+        return finite_differences(
+            func=func, n=n, coordinates=coordinates, orders=(1,), dx=dx, precision=precision,
+            vectorized=vectorized, executor=executor
+        )[0]
     return np.array(
         [
             [partial_derivative(func=func, var=i, order=1, coordinates=coordinates, dx=dx, precision=precision)]
@@ -135,7 +372,7 @@ def gradient(func, n, coordinates=None, dx='1e-6', precision=100):
     )
 
 
-def hessian(func, n, coordinates=None, dx='1e-6', precision=100):
+def hessian(func, n, coordinates=None, dx='1e-6', precision=100, vectorized=False, executor=None):
     """
     Estimates Hessian of the <base_function> at given <coordinates>
     or returns an array with respective partial derivative functions of shape (n,n)
@@ -156,6 +393,12 @@ def hessian(func, n, coordinates=None, dx='1e-6', precision=100):
         Precision of floating point calculations (see mpmath library documentation) (default=100)
         Some functions are incompatible with mpmath. Set <precision> to None to avoid errors or rewrite the function.
         Derivative estimated without high <precision> may have a significant error due to rounding and under-/overflow
+    vectorized : bool, optional
+        If True, <func> takes an array of shape (m, n) with m points and returns an array of shape (m,)
+        (default=False). Used only if <coordinates> are passed (see finite_differences).
+    executor : concurrent.futures.Executor, optional
+        Executor used to evaluate <func> concurrently (default=None).
+        Used only if <coordinates> are passed (see finite_differences).
 
     Returns
     -------
@@ -163,6 +406,11 @@ def hessian(func, n, coordinates=None, dx='1e-6', precision=100):
         The Hessian matrix of the <func> with either partial derivative functions or estimates
         of these functions at <coordinates>
     """
+    if coordinates is not None:
+        return finite_differences(
+            func=func, n=n, coordinates=coordinates, orders=(2,), dx=dx, precision=precision,
+            vectorized=vectorized, executor=executor
+        )[0]
     hessian_matrix = []
     for i in range(n):
         partial_derivative_i = partial_derivative(
@@ -178,11 +426,14 @@ def hessian(func, n, coordinates=None, dx='1e-6', precision=100):
     return np.array(hessian_matrix)
 
 
-def delta_confidence(x, scalar_function, likelihood_function, theta, alpha=0.95, dx='1e-6', precision=100):
+def delta_confidence(x, scalar_function, likelihood_function, theta, alpha=0.95, dx=None, precision=100,
+                     information_matrix=None, method='central', vectorized=False, executor=None):
     """
     Estimates confidence interval of <scalar_function> for value(s) <x> with probability <alpha>,
-    assuming asymptotic normality of <mle> estimates and resulting <scalar_function> outputs for same <x>.
-    <mle> is(are) estimate(s) of parameters maximizing the <likelihood_function>.
+    assuming asymptotic normality of <theta> estimates and resulting <scalar_function> outputs for same <x>.
+    <theta> is(are) estimate(s) of parameters maximizing the <likelihood_function>.
+    Information matrix is calculated and factorized once, gradients of <scalar_function> for all <x>
+    are estimated from shared stencil points and variances for all <x> are calculated at once.
     https://en.wikipedia.org/wiki/Delta_method
 
     Parameters
@@ -190,68 +441,80 @@ def delta_confidence(x, scalar_function, likelihood_function, theta, alpha=0.95,
     x : array_like or float
         Scalar value(s) taken by <scalar_function> for which the confidence interval(s) is(are) estimated
     scalar_function : function
-        Function which takes <x> and <mle> as its arguments <scalar_function(x, *mle)> and returns a scalar value.
-        Takes <x> and <*mle> as its arguments
+        Function which takes <x> and <theta> as its arguments <scalar_function(x, *theta)> and returns a scalar value.
         Can be a return value function estimating return value for a specific return period (constant)
-        using a distribution with parameters <mle>
+        using a distribution with parameters <theta>
     likelihood_function : function
-        Likelihood function, by maximizing parameters of which the <mle> was(were) estimated
-        Takes <*mle> as its arguments
-        Can be the log-likelihood function of a distribution with parameter(s) <mle>
+        Likelihood function, by maximizing parameters of which the <theta> was(were) estimated
+        Takes <*theta> as its arguments. Not used if <information_matrix> is passed.
+        Can be the log-likelihood function of a distribution with parameter(s) <theta>
     theta : array_like or float
         Array or float with parameter(s) estimated by maximizing the <likelihood_function>
         Can be an output of scipy.stats.some_distribution.fit(some_data)
     alpha : float, optional
         Probability that a <scalar_function> will be drawn from the returned range of normal distribution
-        with <scalar_function(*mle)> as location and <scalar_function> variance as scale.
+        with <scalar_function(x, *theta)> as location and <scalar_function> standard deviation as scale.
         Value should be in the range [0, 1]
-    dx : str, optional
-        String representing a float representing spacing at which the partial derivatives are estimated (default='1e-6')
+    dx : str or array_like, optional
+        Spacing at which the partial derivatives are estimated
+        (default=None, '1e-6' for method='central' and '1e-2' for method='richardson', see richardson)
     precision : int, optional
         Precision of floating point calculations (see mpmath library documentation) (default=100)
         Some functions are incompatible with mpmath. Set <precision> to None to avoid errors or rewrite the functions.
         Derivative estimated without high <precision> may have a significant error due to rounding and under-/overflow
+        Not used for method='richardson'.
+    information_matrix : array_like, optional
+        Observed information matrix of <theta> (default=None, negative Hessian of <likelihood_function>).
+    method : str, optional
+        'central' (default) - central differences with spacing <dx> and <precision> (see finite_differences)
+        'richardson' - float64 central differences with Richardson extrapolation (see richardson)
+    vectorized : bool, optional
+        If True, <scalar_function> takes an array <x> and returns an array with values for each of them
+        (default=False, <scalar_function> is called for each of <x>).
+    executor : concurrent.futures.Executor, optional
+        Executor used to evaluate <scalar_function> (and <likelihood_function> if <information_matrix> is None)
+        at stencil points concurrently (default=None).
+        Process-based executors require the functions to be picklable (e.g. defined at module level).
 
     Returns
     -------
     numpy.ndarray of shape (2,) of floats with lower and upper confidence bounds
-    or numpy.ndarray of shape (2,1) with 2 arrays of floats for lower and upper confidence bounds for each <x>
+    or numpy.ndarray of shape (2, len(<x>)) with lower and upper confidence bounds for each <x>
         end-points of range that contains 100*<alpha>% of the <scalar_function> possible values
     """
-    if np.isscalar(x):
-        def __scalar_function(*coordinates):
-            return scalar_function(x, *coordinates)
-        location = scalar_function(*theta)
-        delta_scalar = gradient(func=__scalar_function, n=len(theta), coordinates=theta, dx=dx, precision=precision)
-        information_matrix = -hessian(
-            func=likelihood_function, n=len(theta),
-            coordinates=theta, dx=dx, precision=precision
-        )
-        scale = np.dot(np.dot(delta_scalar.T, np.linalg.inv(information_matrix)), delta_scalar).flatten()[0]
-        return scipy.stats.norm.interval(alpha=alpha, loc=location, scale=scale)
-    else:
-        locations, scales = [], []
-        for _x in x:
-            def __scalar_function(*coordinates):
-                return scalar_function(_x, *coordinates)
-            locations.append(scalar_function(_x, *theta))
-            delta_scalar = gradient(
-                func=__scalar_function, n=len(theta),
-                coordinates=theta, dx=dx, precision=precision
-            )
-            information_matrix = -hessian(
-                func=likelihood_function, n=len(theta),
-                coordinates=theta, dx=dx, precision=precision
-            )
-            scales.append(
-                np.dot(np.dot(delta_scalar.T, np.linalg.inv(information_matrix)), delta_scalar).flatten()[0]
-            )
-        return np.array(
-            [
-                scipy.stats.norm.interval(alpha=alpha, loc=location, scale=scale)
-                for location, scale in zip(locations, scales)
-            ]
-        ).T
+
+    if method not in ['central', 'richardson']:
+        raise ValueError(f'Method {method} not recognized')
+    theta = np.atleast_1d(theta)
+    n = len(theta)
+    x_values = np.atleast_1d(x)
+
+    if dx is None:
+        dx = '1e-6' if method == 'central' else '1e-2'
+
+    def derivatives(func, order):
+        if method == 'central':
+            return finite_differences(
+                func=func, n=n, coordinates=theta, orders=(order,), dx=dx, precision=precision, executor=executor
+            )[0].astype(np.float64)
+        return richardson(func=func, n=n, coordinates=theta, orders=(order,), dx=dx, executor=executor)[0][0]
+
+    if information_matrix is None:
+        information_matrix = -derivatives(likelihood_function, order=2)
+    information_matrix = np.asarray(information_matrix, dtype=np.float64)
+
+    # Evaluate <scalar_function> for all <x> at each stencil point
+    batch_function = functools.partial(_evaluate_batch, scalar_function, x_values, vectorized)
+
+    # Gradients of shape (len(x), n), variance = gradient @ inverse(information_matrix) @ gradient.T for each <x>
+    gradients = derivatives(batch_function, order=1).reshape(n, len(x_values)).T
+    variances = np.sum(gradients * np.linalg.solve(information_matrix, gradients.T).T, axis=1)
+    locations = np.asarray(batch_function(*theta), dtype=np.float64)
+
+    lower, upper = scipy.stats.norm.interval(alpha, loc=locations, scale=np.sqrt(variances))
+    if np.ndim(x) == 0:
+        return np.array([lower[0], upper[0]])
+    return np.array([lower, upper])
 
 
 if __name__ == "__main__":
@@ -326,7 +589,7 @@ if __name__ == "__main__":
 
         confidence_intervals = delta_confidence(
             x=eval_range, scalar_function=scalar_function, likelihood_function=likelihood_function,
-            theta=mle_estimate, alpha=0.95, dx='1e-6', precision=None
+            theta=mle_estimate, alpha=0.95, dx='1e-6', precision=None, vectorized=True
         )
         conf_bot, conf_top = confidence_intervals[0], confidence_intervals[1]
 
@@ -16,3 +16,5 @@
 
 from .rose import rose_plot
 from .styles import matplotlib_styles
+from .downsample import decimate, minmax_downsample, lttb_downsample
+from .hover import HoverIndex, connect_hover
@@ -0,0 +1,151 @@
+# coastlib, a coastal engineering Python library
+# Copyright (C), 2019 Georgii Bocharov
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+import numpy as np
+
+
+def _as_float(x):
+    # Datetime-like axes are downsampled as integer nanoseconds
+    x = np.asarray(x)
+    if np.issubdtype(x.dtype, np.datetime64) or np.issubdtype(x.dtype, np.timedelta64):
+        return x.view('int64').astype(np.float64)
+    return x.astype(np.float64)
+
+
+def minmax_downsample(x, y, n_bins):
+    """
+    Selects first and last points, and points with smallest and largest <y> within each of <n_bins>
+    bins of equal width along <x>. Rendered as a line, the result is visually indistinguishable
+    from the full series when <n_bins> equals the plot width in pixels.
+
+    Parameters
+    ----------
+    x : array_like
+        Sorted array of abscissas (numbers or datetimes).
+    y : array_like
+        Array of ordinates.
+    n_bins : int
+        Number of bins.
+
+    Returns
+    -------
+    np.ndarray
+        Sorted integer indexes of selected points within <x> and <y>.
+    """
+
+    x, y = _as_float(x), np.asarray(y, dtype=np.float64)
+    if len(x) <= 2 * n_bins + 2:
+        return np.arange(len(x))
+
+    span = x[-1] - x[0]
+    if span == 0:
+        bins = np.zeros(len(x), dtype=np.int64)
+    else:
+        bins = np.minimum(((x - x[0]) / span * n_bins).astype(np.int64), n_bins - 1)
+
+    # Bins are contiguous since <x> is sorted - reduce each bin and find first point equal to its min and max
+    starts = np.concatenate(([0], np.flatnonzero(np.diff(bins)) + 1))
+    point_bins = np.repeat(np.arange(len(starts)), np.diff(np.append(starts, len(x))))
+    selected = [np.array([0, len(x) - 1])]
+    for reduce in [np.fmin, np.fmax]:
+        matches = np.flatnonzero(y == reduce.reduceat(y, starts)[point_bins])
+        selected.append(matches[np.unique(point_bins[matches], return_index=True)[1]])
+    return np.unique(np.concatenate(selected))
+
+
+def lttb_downsample(x, y, n_out):
+    """
+    Selects <n_out> points using the Largest-Triangle-Three-Buckets algorithm.
+    First and last points are always kept, remaining points are split into <n_out> - 2 buckets of
+    equal size, and from each bucket the point forming the largest triangle with the previously selected
+    point and the average of the next bucket is kept.
+
+    Parameters
+    ----------
+    x : array_like
+        Sorted array of abscissas (numbers or datetimes).
+    y : array_like
+        Array of ordinates.
+    n_out : int
+        Number of points to select (at least 3).
+
+    Returns
+    -------
+    np.ndarray
+        Sorted integer indexes of selected points within <x> and <y>.
+    """
+
+    x, y = _as_float(x), np.asarray(y, dtype=np.float64)
+    if n_out < 3:
+        raise ValueError(f'Number of points should be at least 3, {n_out} was passed')
+    if len(x) <= n_out:
+        return np.arange(len(x))
+
+    edges = np.linspace(1, len(x) - 1, n_out - 1).astype(np.int64)
+    # Average of each bucket (the last point serves as a bucket of its own)
+    sums_x, sums_y = np.add.reduceat(x[1:-1], edges[:-1] - 1), np.add.reduceat(y[1:-1], edges[:-1] - 1)
+    sizes = np.diff(edges)
+    averages_x = np.append(sums_x / sizes, x[-1])
+    averages_y = np.append(sums_y / sizes, y[-1])
+
+    selected = np.empty(n_out, dtype=np.int64)
+    selected[0], selected[-1] = 0, len(x) - 1
+    for i in range(n_out - 2):
+        a = selected[i]
+        bucket_x, bucket_y = x[edges[i]:edges[i + 1]], y[edges[i]:edges[i + 1]]
+        areas = np.abs(
+            (x[a] - averages_x[i + 1]) * (bucket_y - y[a]) - (x[a] - bucket_x) * (averages_y[i + 1] - y[a])
+        )
+        selected[i + 1] = edges[i] + np.argmax(np.nan_to_num(areas, nan=-1))
+    return selected
+
+
+def decimate(x, y, n, method='minmax', keep=None):
+    """
+    Downsamples a series for rendering. Points listed in <keep> are always selected.
+
+    Parameters
+    ----------
+    x : array_like
+        Sorted array of abscissas (numbers or datetimes).
+    y : array_like
+        Array of ordinates.
+    n : int
+        Target resolution - number of bins for 'minmax' (up to 2 * <n> + 2 points are selected),
+        number of points for 'lttb'. Usually the plot width in pixels.
+    method : str, optional
+        'minmax' - min/max-preserving downsampling, see <minmax_downsample>.
+        'lttb' - Largest-Triangle-Three-Buckets, see <lttb_downsample>.
+        Default='minmax'.
+    keep : array_like, optional
+        Integer indexes of points which must be selected (default=None).
+
+    Returns
+    -------
+    np.ndarray
+        Sorted integer indexes of selected points within <x> and <y>.
+    """
+
+    if method == 'minmax':
+        indexes = minmax_downsample(x, y, max(int(n), 1))
+    elif method == 'lttb':
+        indexes = lttb_downsample(x, y, max(int(n), 3))
+    else:
+        raise ValueError(f'Method {method} not recognized')
+
+    if keep is not None and len(keep) > 0:
+        indexes = np.union1d(indexes, np.asarray(keep, dtype=np.int64))
+    return indexes
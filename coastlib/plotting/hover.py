@@ -0,0 +1,154 @@
+# coastlib, a coastal engineering Python library
+# Copyright (C), 2019 Georgii Bocharov
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+import time
+
+import numpy as np
+import scipy.spatial
+
+
+class HoverIndex:
+
+    def __init__(self, ax, collection, update, artists, radius=None, interval=1/30):
+        """
+        Shows annotation artists when mouse cursor hovers over a point of a scatter <collection>.
+        The nearest point is found using a KD-tree of point positions in display coordinates, which is
+        rebuilt only when axes limits, scales or size change (zoom, pan, resize).
+        Redraws are requested only when the hovered point changes and no more often than once per <interval>.
+
+        Parameters
+        ----------
+        ax : matplotlib.axes.Axes
+            Axes containing <collection>.
+        collection : matplotlib.collections.PathCollection
+            Scatter collection returned by ax.scatter.
+        update : callable
+            Function called as update(n) when cursor moves onto point with index <n> within <collection>.
+            Should update position and text of <artists>.
+        artists : list
+            Artists (e.g. annotation and highlight marker) shown while cursor is over a point and hidden otherwise.
+        radius : float, optional
+            Largest distance in pixels between cursor and point (default=None, marker radius).
+        interval : float, optional
+            Smallest time in seconds between redraws (default=1/30).
+        """
+
+        self.ax = ax
+        self.collection = collection
+        self.update = update
+        self.artists = artists
+        self.interval = interval
+        if radius is None:
+            sizes = collection.get_sizes()
+            size = sizes.max() if len(sizes) > 0 else 36
+            radius = np.sqrt(size) / 2 * ax.figure.dpi / 72
+        self.radius = radius
+
+        self.current = None
+        self.__tree = None
+        self.__tree_key = None
+        self.__points = None
+        self.__last_draw = -np.inf
+        self.__timer = None
+
+        canvas = ax.figure.canvas
+        # Canvas holds only weak references to bound methods - connect through a closure
+        canvas.mpl_connect('motion_notify_event', lambda event: self.on_move(event))
+
+    def __get_tree(self):
+        # Display coordinates of points change only when axes limits, scales or size change
+        key = (
+            self.ax.bbox.bounds, self.ax.get_xlim(), self.ax.get_ylim(),
+            self.ax.get_xscale(), self.ax.get_yscale()
+        )
+        if key != self.__tree_key:
+            positions = self.collection.get_offset_transform().transform(self.collection.get_offsets())
+            finite = np.all(np.isfinite(positions), axis=1)
+            self.__points = np.flatnonzero(finite)
+            self.__tree = scipy.spatial.cKDTree(positions[finite]) if finite.any() else None
+            self.__tree_key = key
+        return self.__tree
+
+    def query(self, x, y):
+        """
+        Finds point nearest to display coordinates <x>, <y> within <self.radius>.
+
+        Parameters
+        ----------
+        x : float
+        y : float
+            Display coordinates in pixels (e.g. event.x, event.y).
+
+        Returns
+        -------
+        int or None
+            Index of point within <self.collection>, None if there are no points within <self.radius>.
+        """
+
+        tree = self.__get_tree()
+        if tree is None:
+            return None
+        distance, i = tree.query([x, y], distance_upper_bound=self.radius)
+        if not np.isfinite(distance):
+            return None
+        return int(self.__points[i])
+
+    def on_move(self, event):
+        if event.inaxes != self.ax:
+            return
+        n = self.query(event.x, event.y)
+        if n == self.current:
+            return
+        self.current = n
+        if n is not None:
+            self.update(n)
+        for artist in self.artists:
+            artist.set_visible(n is not None)
+        self.draw()
+
+    def draw(self):
+        """
+        Requests redraw of the canvas. Redraws requested within <self.interval> from the previous one
+        are deferred using a single-shot timer.
+        """
+
+        canvas = self.ax.figure.canvas
+        now = time.perf_counter()
+        if now - self.__last_draw >= self.interval:
+            self.__last_draw = now
+            canvas.draw_idle()
+        elif self.__timer is None:
+            self.__timer = canvas.new_timer(interval=int(self.interval * 1000))
+            self.__timer.single_shot = True
+            self.__timer.add_callback(self.__flush)
+            self.__timer.start()
+
+    def __flush(self):
+        self.__timer = None
+        self.__last_draw = time.perf_counter()
+        self.ax.figure.canvas.draw_idle()
+
+
+def connect_hover(ax, collection, update, artists, radius=None, interval=1/30):
+    """
+    Connects hover annotations to a scatter <collection>. See <HoverIndex> for parameters.
+
+    Returns
+    -------
+    HoverIndex
+    """
+
+    return HoverIndex(ax=ax, collection=collection, update=update, artists=artists, radius=radius, interval=interval)
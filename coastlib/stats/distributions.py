@@ -15,6 +15,7 @@
 # along with this program. If not, see <http://www.gnu.org/licenses/>.
 
 import numpy as np
+import scipy.stats
 import coastlib.math.derivatives
 import mpmath
 
@@ -24,6 +25,179 @@ distributions = [
     'genpareto'
 ]
 
+# Backends evaluating distribution methods:
+#   'numpy' - vectorized float64 arithmetic (log1p/expm1 formulations)
+#   'mpmath' - element-wise arbitrary precision arithmetic with <precision> decimal digits
+#   'adaptive' - 'numpy', with ill-conditioned elements recomputed using 'mpmath'
+backends = [
+    'numpy',
+    'mpmath',
+    'adaptive'
+]
+
+# Elements are ill-conditioned in float64 if absolute value of shape parameter (above dx), distance to the finite
+# end of the support (1 + shape * z) or distance of probability to 0 or 1 are below this tolerance
+adaptive_tolerance = 1e-6
+
+# Maximum number of random values sampled at once by rvs methods (larger samples are generated in chunks)
+rvs_chunk_size = 2 ** 20
+
+
+def _check_backend(backend):
+    if backend not in backends:
+        raise ValueError(f'Backend {backend} not recognized')
+
+
+def _refine(values, ill_conditioned, function, *arguments):
+    """
+    Replaces float64 <values> at <ill_conditioned> elements with outputs of <function> (an mpmath backend method)
+    evaluated at respective elements of <arguments>. Returns a new array, <values> are not modified.
+    """
+
+    values = np.array(values, dtype=np.float64)
+    ill_conditioned = np.broadcast_to(ill_conditioned, values.shape)
+    if np.any(ill_conditioned):
+        values[ill_conditioned] = np.asarray(
+            function(*[np.broadcast_to(argument, values.shape)[ill_conditioned] for argument in arguments]),
+            dtype=np.float64
+        )
+    return values
+
+
+def _is_batch(*parameters):
+    """
+    Returns True if any of distribution <parameters> is an array (methods are evaluated for a parameter ensemble).
+    """
+
+    return any(np.ndim(parameter) > 0 for parameter in parameters)
+
+
+def _broadcast(*arguments):
+    """
+    Returns <arguments> (values and distribution parameters) as float64 arrays broadcast against each other.
+    """
+
+    return np.broadcast_arrays(*[np.asarray(argument, dtype=np.float64) for argument in arguments])
+
+
+def _map_parameters(function, x, shape, loc, scale):
+    """
+    Evaluates scalar mpmath backend <function> for each element of <x> and parameters broadcast against each other.
+    Returns an object array of mpmath.mpf values (mpmath.mpf if all arguments are scalar).
+    """
+
+    return np.frompyfunc(function, 4, 1)(x, shape, loc, scale)
+
+
+def _data_axes(data, values):
+    """
+    Returns trailing axes of <values> (<data> broadcast against distribution parameters) which correspond to <data>.
+    """
+
+    return tuple(range(np.ndim(values) - np.ndim(data), np.ndim(values)))
+
+
+def _sample(quantile_function, shape, loc, scale, size, random_state, dtype=np.float64):
+    """
+    Samples random values by inverse transform sampling - evaluates <quantile_function> (ppf method) for uniform
+    random values generated by <random_state> in chunks of up to <rvs_chunk_size> values.
+    Returns an array of shape <size> broadcast against parameters.
+    """
+
+    random_state = np.random.default_rng(random_state)
+    size = (int(size),) if np.ndim(size) == 0 else tuple(size)
+    output_shape = np.broadcast_shapes(size, *[np.shape(parameter) for parameter in [shape, loc, scale]])
+    parameters = [
+        np.broadcast_to(parameter, output_shape) if np.ndim(parameter) > 0 else parameter
+        for parameter in [shape, loc, scale]
+    ]
+
+    values = np.empty(output_shape, dtype=dtype)
+    flat_values = values.reshape(-1)
+    for start in range(0, flat_values.size, rvs_chunk_size):
+        stop = min(start + rvs_chunk_size, flat_values.size)
+        # Uniform values on the open interval (0;1) - ends of the support are never sampled
+        probabilities = (random_state.integers(0, 2 ** 52, stop - start) + .5) / 2 ** 52
+        flat_values[start:stop] = quantile_function(
+            probabilities,
+            *[parameter.flat[start:stop] if np.ndim(parameter) > 0 else parameter for parameter in parameters]
+        )
+    return values
+
+
+def _map_support(function, x, valid):
+    """
+    Evaluates scalar mpmath <function> only at values <x> within the support (where boolean mask <valid> is True).
+    Returns mpmath.mpf('nan') in place of values outside of the support, <x> is not modified.
+    """
+
+    if np.isscalar(x):
+        return function(x) if valid else mpmath.mpf('nan')
+    x = np.asarray(x)
+    values = np.full(x.shape, mpmath.mpf('nan'), dtype=object)
+    values[valid] = [function(_x) for _x in x[valid]]
+    return values
+
+
+def _shape_derivatives(z, shape, dx='1e-10', terms=20):
+    """
+    Calculates first and second derivatives by shape of -log(1 + shape * z) / shape in float64
+    (logarithm of t for GEV and of survival function for GPD).
+    Series expansion is used where |shape * z| is small to avoid cancellation, which also covers the shape=0 limit.
+    """
+
+    z, shape = _broadcast(z, shape)
+    shape = np.where(np.abs(shape) <= float(dx), 0, shape)
+    u = shape * z
+    series = np.abs(u) < .05
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        w = 1 + u
+        log_w = np.log1p(u)
+        first = log_w / shape ** 2 - z / (shape * w)
+        second = 2 * z / (shape ** 2 * w) - 2 * log_w / shape ** 3 + z ** 2 / (shape * w ** 2)
+
+    # -log(1 + u) / shape = sum((-1) ** k * shape ** (k - 1) * z ** k / k) for k >= 1, differentiated term-wise
+    u = np.where(series, u, 0)
+    series_first, series_second = np.zeros(u.shape), np.zeros(u.shape)
+    for k in range(terms + 2, 1, -1):
+        series_first = series_first * u + (-1) ** k * (k - 1) / k
+        if k > 2:
+            series_second = series_second * u + (-1) ** k * (k - 1) * (k - 2) / k
+    return np.where(series, z ** 2 * series_first, first), np.where(series, z ** 3 * series_second, second)
+
+
+def _location_scale_derivatives(z, scale, f_z, f_zz, f_shape, f_shape_shape, f_z_shape):
+    """
+    Calculates gradient and Hessian of log-density f(shape, z) - log(scale), where z = (x - loc) / scale,
+    by (shape, loc, scale) from partial derivatives of f by shape and z.
+    Returns arrays of shape (3, ...) and (3, 3, ...) with trailing dimensions of observations broadcast against scale.
+    """
+
+    z, f_z, f_zz, f_shape, f_shape_shape, f_z_shape = np.broadcast_arrays(
+        z, f_z, f_zz, f_shape, f_shape_shape, f_z_shape
+    )
+    f_loc_shape = -f_z_shape / scale
+    f_scale_shape = -f_z_shape * z / scale
+    f_loc_scale = (f_zz * z + f_z) / scale ** 2
+    gradient = np.array([f_shape, -f_z / scale, -(f_z * z + 1) / scale])
+    hessian = np.array(
+        [
+            [f_shape_shape, f_loc_shape, f_scale_shape],
+            [f_loc_shape, f_zz / scale ** 2, f_loc_scale],
+            [f_scale_shape, f_loc_scale, (f_zz * z ** 2 + 2 * f_z * z + 1) / scale ** 2]
+        ]
+    )
+    return gradient, hessian
+
+
+def _ill_conditioned_shape(shape, dx):
+    return (float(dx) < np.abs(shape)) & (np.abs(shape) < adaptive_tolerance)
+
+
+def _ill_conditioned_quantile(q, shape, dx):
+    return _ill_conditioned_shape(shape, dx) | (q < adaptive_tolerance) | (q > 1 - adaptive_tolerance)
+
 
 class GeneralizedExtreme:
     """
@@ -32,90 +206,87 @@ class GeneralizedExtreme:
     Has methods equivalent to those of scipy.stats.genextreme.
     Shape parameter has sign opposite to that of scipy.
     Shape parameter is called 'shape', while in scipy its called 'c'.
+    Methods are evaluated in float64 by default, pass backend='mpmath' to use arbitrary precision arithmetic
+    or backend='adaptive' to use it only for elements which are ill-conditioned in float64.
+    Parameters may be arrays (e.g. a parameter ensemble), which are broadcast against each other and against values
+    using numpy broadcasting rules, e.g. isf(q, shape, loc, scale) with <q> of shape (1, m) and parameters
+    of shape (n, 1) returns an array of shape (n, m).
     """
 
     def __init__(self):
         pass
 
+    @staticmethod
+    def in_support(x, shape, loc, scale, dx='1e-10'):
+        """
+        Returns a boolean mask of values <x> which lie within the support (bool if <x> is scalar).
+        Raises ValueError for invalid parameters.
+
+        Parameters
+        ----------
+        x : float or array_like
+        shape : float or array_like
+        loc : float or array_like
+        scale : float or array_like
+        dx : str, optional
+        """
+
+        # Parameters constraint
+        if np.any(np.asarray(scale) <= 0):
+            raise ValueError('Scale parameter must be larger than 0')
+
+        x, shape, loc, scale = np.broadcast_arrays(x, shape, loc, scale)
+        positive = np.asarray(shape > float(dx), dtype=bool)
+        negative = np.asarray(shape < -float(dx), dtype=bool)
+        bound = loc - scale / np.where(positive | negative, shape, 1)
+        # Shape > 0 - bounded below, shape < 0 - bounded above,
+        # shape == 0 - support is unbounded (only np.nan's are excluded)
+        valid = np.where(positive, x >= bound, np.where(negative, x <= bound, x == x))
+        return np.asarray(valid, dtype=bool)[()]
+
     @staticmethod
     def check_support(x, shape, loc, scale, dx='1e-10', precision=100):
         """
         Verify that passed parameters are valid.
-        Returns np.nan in place of invalid inputs (if array, replaces invalid values with np.nan's).
+        Returns np.nan in place of invalid inputs (if array, returns a copy with invalid values replaced by np.nan's).
         """
 
         with mpmath.workdps(precision):
-            if not np.isscalar(x):
-                x = np.array(x)
-
-            # Parameters constraint
-            if scale <= 0:
-                raise ValueError('Scale parameter must be larger than 0')
-
-            # Support constraint
-            if np.isscalar(x):
-                # Shape > 0
-                if mpmath.mpf(shape) > mpmath.mpf(dx):
-                    condition = x >= loc - scale / shape
-                # Shape < 0
-                elif mpmath.mpf(shape) < -mpmath.mpf(dx):
-                    condition = x <= loc - scale / shape
-                # Shape == 0
-                else:
-                    condition = True
-            else:
-                # Shape > 0
-                if mpmath.mpf(shape) > mpmath.mpf(dx):
-                    condition = np.all(x >= loc - scale / shape)
-                # Shape < 0
-                elif mpmath.mpf(shape) < -mpmath.mpf(dx):
-                    condition = np.all(x <= loc - scale / shape)
-                # Shape == 0
-                else:
-                    condition = True
-
-            # Test conditions - replace invalid x's with np.nan
-            if condition:
-                return x
-            else:
-                if np.isscalar(x):
-                    return np.nan
-                else:
-                    truncated_x = x
-                    # Shape > 0
-                    if mpmath.mpf(shape) > mpmath.mpf(dx):
-                        truncated_x[truncated_x < loc - scale / shape] = np.nan
-                    # Shape < 0
-                    elif mpmath.mpf(shape) < -mpmath.mpf(dx):
-                        truncated_x[truncated_x > loc - scale / shape] = np.nan
-                    # Shape == 0
-                    else:
-                        pass
-                    return truncated_x
+            valid = GeneralizedExtreme.in_support(x, shape, loc, scale, dx)
+        if np.ndim(valid) == 0:
+            return x if valid else np.nan
+        return np.where(valid, x, np.nan)
 
-    def rvs(self, shape, loc, scale, size=1, random_state=None, dx='1e-10', precision=100):
+    def rvs(self, shape, loc, scale, size=1, random_state=None, dx='1e-10', precision=100, backend='numpy'):
         """
-        Returns random value or an array of random values of given size sampled from the GEV distribution.
+        Returns an array of random values of given size sampled from the GEV distribution
+        using inverse transform sampling. Global numpy random state is neither used nor modified.
 
         Parameters
         ----------
-        shape : float
-        loc : float
-        scale : float
-        size : int, optional
-        random_state : int, optional
+        shape : float or array_like
+        loc : float or array_like
+        scale : float or array_like
+        size : int or tuple, optional
+            Sample shape, broadcast against array_like parameters.
+        random_state : int or np.random.Generator, optional
+            Seed or random number generator (default=None).
         dx : str, optional
         precision : int, optional
+        backend : str, optional
+            'numpy' (default), 'mpmath' or 'adaptive'.
         """
 
+        _check_backend(backend)
+
         # Parameter constraint
-        if scale <= 0:
+        if np.any(np.asarray(scale) <= 0):
             raise ValueError(f'Invalid parameter passed in scale={scale}')
 
-        with mpmath.workdps(precision):
-            if random_state is not None:
-                np.random.seed(random_state)
-            return self.ppf(np.random.random(size), shape, loc, scale, dx, precision)
+        return _sample(
+            lambda *_arguments: self.ppf(*_arguments, dx, precision, backend),
+            shape, loc, scale, size, random_state, object if backend == 'mpmath' else np.float64
+        )
 
     @staticmethod
     def fit(data, *args, **kwargs):
@@ -127,13 +298,112 @@ class GeneralizedExtreme:
         raw_scipy = scipy.stats.genextreme.fit(np.float64(data), *args, **kwargs)
         return raw_scipy * np.array([-1, 1, 1])
 
-    def __t(self, x, shape, loc, scale, dx='1e-10', precision=100):
+    @staticmethod
+    def __log_t(x, shape, loc, scale, dx='1e-10'):
         """
-        Calculates support value t, used further in self.cdf and self.pdf.
+        Calculates logarithm of support value t in float64, used further in self.cdf and self.pdf.
+        Evaluated only within the support, returns np.nan in place of values outside of the support.
 
         Parameters
         ----------
         x : float or array_like
+        shape : float or array_like
+        loc : float or array_like
+        scale : float or array_like
+        dx : str, optional
+        """
+
+        x, shape, loc, scale = _broadcast(x, shape, loc, scale)
+        valid = GeneralizedExtreme.in_support(x, shape, loc, scale, dx)
+        log_t = np.full(x.shape, np.nan)
+        shape, z = shape[valid], (x[valid] - loc[valid]) / scale[valid]
+        gumbel = np.abs(shape) <= float(dx)
+        # Shape == 0 - log(t) = -z
+        # Shape != 0 - log(t) = -log(1 + shape * z) / shape, rounding below -1 at the support bound is clipped
+        with np.errstate(divide='ignore'):
+            log_t[valid] = np.where(
+                gumbel, -z, -np.log1p(np.maximum(shape * z, -1)) / np.where(gumbel, 1, shape)
+            )
+        return log_t
+
+    @staticmethod
+    def __ill_conditioned(x, shape, loc, scale, dx='1e-10'):
+        """
+        Returns a boolean mask of values <x> which are ill-conditioned in float64 (see adaptive_tolerance).
+        """
+
+        x, shape, loc, scale = _broadcast(x, shape, loc, scale)
+        z = (x - loc) / scale
+        return (np.abs(shape) > float(dx)) & (
+            _ill_conditioned_shape(shape, dx) | (np.abs(1 + shape * z) < adaptive_tolerance)
+        )
+
+    @staticmethod
+    def __check_quantile(q, shape, dx='1e-10', upper=False):
+        """
+        Raises ValueError if any of the lower (upper if <upper> is True) tail probabilities <q> lie outside
+        of the interval with valid probabilities. Probability of the bounded end of the support is valid.
+        """
+
+        q, shape = np.broadcast_arrays(q, shape)
+        include_0, include_1 = shape > float(dx), shape < -float(dx)
+        if upper:
+            include_0, include_1 = include_1, include_0
+        invalid = (q < 0) | (q > 1) | ((q == 0) & ~include_0) | ((q == 1) & ~include_1)
+        if np.any(invalid):
+            include_0, include_1 = include_0[invalid][0], include_1[invalid][0]
+            interval = f'{"[" if include_0 else "("}0;1{"]" if include_1 else ")"}'
+            raise ValueError(f'Quantile must lie in interval {interval}, {q[invalid][0]} was given')
+
+    @staticmethod
+    def __quantile(log_y, shape, loc, scale, dx='1e-10'):
+        """
+        Calculates value x in float64 from log(y), where y = -log(cdf(x)) = t(x).
+        """
+
+        gumbel = np.abs(shape) <= float(dx)
+        # Shape == 0 - x = loc - scale * log(y)
+        # Shape != 0 - x = loc + scale * (y ** -shape - 1) / shape
+        with np.errstate(over='ignore', invalid='ignore'):
+            return np.where(
+                gumbel, loc - scale * log_y, loc + scale * np.expm1(-shape * log_y) / np.where(gumbel, 1, shape)
+            )
+
+    @staticmethod
+    def __log_density_derivatives(data, shape, loc, scale, dx='1e-10'):
+        """
+        Calculates gradient and Hessian of log-density by (shape, loc, scale) for each of <data> in float64.
+        Returns arrays of shape (3, ...) and (3, 3, ...) with trailing dimensions of <data> broadcast
+        against parameters, derivatives are np.nan for <data> outside of the support.
+        """
+
+        x, shape, loc, scale = _broadcast(data, shape, loc, scale)
+        valid = GeneralizedExtreme.in_support(x, shape, loc, scale, dx)
+        z = np.where(valid, (x - loc) / scale, np.nan)
+        # Shape == 0 - w = 1 and log(t) = -z
+        shape = np.where(np.abs(shape) <= float(dx), 0, shape)
+        w = 1 + shape * z
+        with np.errstate(divide='ignore', invalid='ignore'):
+            log_t = np.where(shape == 0, -z, -np.log1p(np.maximum(shape * z, -1)) / np.where(shape == 0, 1, shape))
+        t = np.exp(log_t)
+        log_t_shape, log_t_shape_shape = _shape_derivatives(z, shape, dx)
+
+        # Log-density f = -(1 + 1 / shape) * log(w) - t - log(scale), w = 1 + shape * z
+        with np.errstate(divide='ignore', invalid='ignore'):
+            f_z = (t - 1 - shape) / w
+            f_zz = (1 + shape) * (shape - t) / w ** 2
+            f_shape = (1 - t) * log_t_shape - z / w
+            f_shape_shape = -t * log_t_shape ** 2 + (1 - t) * log_t_shape_shape + z ** 2 / w ** 2
+            f_z_shape = (t * log_t_shape - 1) / w - (t - 1 - shape) * z / w ** 2
+        return _location_scale_derivatives(z, scale, f_z, f_zz, f_shape, f_shape_shape, f_z_shape)
+
+    def __t(self, x, shape, loc, scale, dx='1e-10', precision=100):
+        """
+        Calculates support value t for a single value <x> within the support, used further in self.cdf and self.pdf.
+
+        Parameters
+        ----------
+        x : float
         shape : float
         loc : float
         scale : float
@@ -142,61 +412,58 @@ class GeneralizedExtreme:
         """
 
         with mpmath.workdps(precision):
-            # Make sure passed values are valid
-            x = self.check_support(x, shape, loc, scale, dx, precision)
-
             # Shape == 0
             if mpmath.fabs(shape) <= mpmath.mpf(dx):
-                if np.isscalar(x):
-                    return mpmath.exp(-(mpmath.mpf(x) - mpmath.mpf(loc)) / mpmath.mpf(scale))
-                else:
-                    return np.array(
-                        [
-                            mpmath.exp(-(mpmath.mpf(_x) - mpmath.mpf(loc)) / mpmath.mpf(scale))
-                            for _x in x
-                        ]
-                    )
+                return mpmath.exp(-(mpmath.mpf(x) - mpmath.mpf(loc)) / mpmath.mpf(scale))
             # Shape != 0
             else:
-                if np.isscalar(x):
-                    part_1 = mpmath.mpf('1') +\
-                             mpmath.mpf(shape) * (mpmath.mpf(x) - mpmath.mpf(loc)) / mpmath.mpf(scale)
-                    part_2 = -mpmath.mpf('1') / mpmath.mpf(shape)
-                    return mpmath.power(part_1, part_2)
-                else:
-                    part_1 = np.array(
-                        [
-                            mpmath.mpf('1') +
-                            mpmath.mpf(shape) * (mpmath.mpf(_x) - mpmath.mpf(loc)) / mpmath.mpf(scale)
-                            for _x in x
-                        ]
-                    )
-                    part_2 = -mpmath.mpf('1') / mpmath.mpf(shape)
-                    return np.array(
-                        [
-                            mpmath.power(p_1, part_2) for p_1 in part_1
-                        ]
-                    )
+                part_1 = mpmath.mpf('1') +\
+                         mpmath.mpf(shape) * (mpmath.mpf(x) - mpmath.mpf(loc)) / mpmath.mpf(scale)
+                part_2 = -mpmath.mpf('1') / mpmath.mpf(shape)
+                # Support is checked in float, rounding below 0 at the support bound is clipped
+                return mpmath.power(max(part_1, mpmath.mpf('0')), part_2)
 
     @staticmethod
-    def ppf(q, shape, loc, scale, dx='1e-10', precision=100):
+    def ppf(q, shape, loc, scale, dx='1e-10', precision=100, backend='numpy'):
         """
         Calculates percent point function (inverse CDF, value for given lower tail probability).
 
         Parameters
         ----------
         q : float or array_like
-        shape : float
-        loc : float
-        scale : float
+        shape : float or array_like
+        loc : float or array_like
+        scale : float or array_like
         dx : str, optional
         precision : int, optional
+        backend : str, optional
+            'numpy' (default), 'mpmath' or 'adaptive'.
         """
 
+        _check_backend(backend)
+
         # Parameter constraint
-        if scale <= 0:
+        if np.any(np.asarray(scale) <= 0):
             raise ValueError(f'Invalid parameter passed in scale={scale}')
 
+        if backend != 'mpmath':
+            q = np.asarray(q, dtype=np.float64)
+            GeneralizedExtreme.__check_quantile(q, shape, dx)
+            with np.errstate(divide='ignore'):
+                values = GeneralizedExtreme.__quantile(np.log(-np.log(q)), shape, loc, scale, dx)
+            if backend == 'adaptive':
+                values = _refine(
+                    values, _ill_conditioned_quantile(q, shape, dx),
+                    lambda *_arguments: GeneralizedExtreme.ppf(*_arguments, dx, precision, 'mpmath'),
+                    q, shape, loc, scale
+                )
+            return values[()]
+
+        if _is_batch(shape, loc, scale):
+            return _map_parameters(
+                lambda *_arguments: GeneralizedExtreme.ppf(*_arguments, dx, precision, backend), q, shape, loc, scale
+            )
+
         with mpmath.workdps(precision):
             # Shape == 0
             if mpmath.fabs(shape) <= mpmath.mpf(dx):
@@ -250,148 +517,315 @@ class GeneralizedExtreme:
                         ]
                     )
 
-    def isf(self, q, shape, loc, scale, dx='1e-10', precision=100):
+    def isf(self, q, shape, loc, scale, dx='1e-10', precision=100, backend='numpy'):
         """
         Calculates inverse survival function (inverse SF, value for given upper tail probability).
 
         Parameters
         ----------
         q : float or array_like
-        shape : float
-        loc : float
-        scale : float
+        shape : float or array_like
+        loc : float or array_like
+        scale : float or array_like
         dx : str, optional
         precision : int, optional
+        backend : str, optional
+            'numpy' (default), 'mpmath' or 'adaptive'.
         """
 
+        _check_backend(backend)
+
+        if backend != 'mpmath':
+            if np.any(np.asarray(scale) <= 0):
+                raise ValueError(f'Invalid parameter passed in scale={scale}')
+            q = np.asarray(q, dtype=np.float64)
+            self.__check_quantile(q, shape, dx, upper=True)
+            # -log(1 - q) is evaluated as -log1p(-q) to retain precision for small upper tail probabilities
+            with np.errstate(divide='ignore'):
+                values = self.__quantile(np.log(-np.log1p(-q)), shape, loc, scale, dx)
+            if backend == 'adaptive':
+                values = _refine(
+                    values, _ill_conditioned_quantile(q, shape, dx),
+                    lambda *_arguments: self.isf(*_arguments, dx, precision, 'mpmath'), q, shape, loc, scale
+                )
+            return values[()]
+
+        if _is_batch(shape, loc, scale):
+            return _map_parameters(
+                lambda *_arguments: self.isf(*_arguments, dx, precision, backend), q, shape, loc, scale
+            )
+
         with mpmath.workdps(precision):
-            return self.ppf(1-q, shape, loc, scale, dx, precision)
+            # 1 - q is evaluated with <precision> to retain small upper tail probabilities
+            if np.isscalar(q):
+                return self.ppf(mpmath.mpf('1') - mpmath.mpf(q), shape, loc, scale, dx, precision, backend)
+            else:
+                return self.ppf(
+                    np.array([mpmath.mpf('1') - mpmath.mpf(_q) for _q in q]),
+                    shape, loc, scale, dx, precision, backend
+                )
 
-    def pdf(self, x, shape, loc, scale, dx='1e-10', precision=100):
+    def pdf(self, x, shape, loc, scale, dx='1e-10', precision=100, backend='numpy'):
         """
         Calculates pdf.
 
         Parameters
         ----------
         x : float or array_like
-        shape : float
-        loc : float
-        scale : float
+        shape : float or array_like
+        loc : float or array_like
+        scale : float or array_like
         dx : str, optional
         precision : int, optional
+        backend : str, optional
+            'numpy' (default), 'mpmath' or 'adaptive'.
         """
 
-        with mpmath.workdps(precision):
-            # Make sure passed values are valid
-            x = self.check_support(x, shape, loc, scale, dx, precision)
-
-            part_1 = mpmath.mpf('1') / mpmath.mpf(scale)
-            if np.isscalar(x):
-                part_2 = mpmath.power(
-                    self.__t(x, shape, loc, scale, dx, precision),
-                    mpmath.mpf(shape) + mpmath.mpf('1')
+        _check_backend(backend)
+
+        if backend != 'mpmath':
+            log_t = self.__log_t(x, shape, loc, scale, dx)
+            with np.errstate(over='ignore', invalid='ignore'):
+                density = np.exp((shape + 1) * log_t - np.exp(log_t)) / scale
+            # t is infinite at the lower end of the support (shape > 0), where density is 0
+            density = np.where(log_t == np.inf, 0, density)
+            if backend == 'adaptive':
+                density = _refine(
+                    density, self.__ill_conditioned(x, shape, loc, scale, dx),
+                    lambda *_arguments: self.pdf(*_arguments, dx, precision, 'mpmath'), x, shape, loc, scale
                 )
-                part_3 = mpmath.exp(-self.__t(x, shape, loc, scale, dx, precision))
+            return density[()]
+
+        if _is_batch(shape, loc, scale):
+            return _map_parameters(
+                lambda *_arguments: self.pdf(*_arguments, dx, precision, backend), x, shape, loc, scale
+            )
+
+        with mpmath.workdps(precision):
+            def density(_x):
+                t = self.__t(_x, shape, loc, scale, dx, precision)
+                part_1 = mpmath.mpf('1') / mpmath.mpf(scale)
+                part_2 = mpmath.power(t, mpmath.mpf(shape) + mpmath.mpf('1'))
+                part_3 = mpmath.exp(-t)
                 return part_1 * part_2 * part_3
-            else:
-                part_2 = np.array(
-                    [
-                        mpmath.power(
-                            self.__t(_x, shape, loc, scale, dx, precision),
-                            mpmath.mpf(shape) + mpmath.mpf('1')
-                        ) for _x in x
-                    ]
-                )
-                part_3 = np.array(
-                    [
-                        mpmath.exp(
-                            -self.__t(_x, shape, loc, scale, dx, precision)
-                        ) for _x in x
-                    ]
-                )
-                return np.array(
-                    [part_1 * p_2 * p_3 for p_2, p_3 in zip(part_2, part_3)]
-                )
 
-    def cdf(self, x, shape, loc, scale, dx='1e-10', precision=100):
+            return _map_support(density, x, self.in_support(x, shape, loc, scale, dx))
+
+    def cdf(self, x, shape, loc, scale, dx='1e-10', precision=100, backend='numpy'):
         """
         Calculates cdf.
 
         Parameters
         ----------
         x : float or array_like
-        shape : float
-        loc : float
-        scale : float
+        shape : float or array_like
+        loc : float or array_like
+        scale : float or array_like
         dx : str, optional
         precision : int, optional
+        backend : str, optional
+            'numpy' (default), 'mpmath' or 'adaptive'.
         """
 
-        with mpmath.workdps(precision):
-            # Make sure passed values are valid
-            x = self.check_support(x, shape, loc, scale, dx, precision)
+        _check_backend(backend)
 
-            if np.isscalar(x):
-                return mpmath.exp(-self.__t(x, shape, loc, scale, dx, precision))
-            else:
-                return np.array(
-                    [
-                        mpmath.exp(-self.__t(_x, shape, loc, scale, dx, precision))
-                        for _x in x
-                    ]
+        if backend != 'mpmath':
+            with np.errstate(over='ignore'):
+                values = np.exp(-np.exp(self.__log_t(x, shape, loc, scale, dx)))
+            if backend == 'adaptive':
+                values = _refine(
+                    values, self.__ill_conditioned(x, shape, loc, scale, dx),
+                    lambda *_arguments: self.cdf(*_arguments, dx, precision, 'mpmath'), x, shape, loc, scale
                 )
+            return values[()]
+
+        if _is_batch(shape, loc, scale):
+            return _map_parameters(
+                lambda *_arguments: self.cdf(*_arguments, dx, precision, backend), x, shape, loc, scale
+            )
+
+        with mpmath.workdps(precision):
+            return _map_support(
+                lambda _x: mpmath.exp(-self.__t(_x, shape, loc, scale, dx, precision)),
+                x, self.in_support(x, shape, loc, scale, dx)
+            )
 
-    def log_likelihood(self, data, shape, loc, scale, dx='1e-10', precision=100):
+    def __log_pdf(self, x, shape, loc, scale, dx='1e-10', precision=100):
+        """
+        Calculates logarithm of pdf for each of <x> and parameters broadcast against each other using mpmath.
+        """
+
+        with mpmath.workdps(precision):
+            return np.frompyfunc(mpmath.log, 1, 1)(self.pdf(x, shape, loc, scale, dx, precision, 'mpmath'))
+
+    def log_likelihood(self, data, shape, loc, scale, dx='1e-10', precision=100, backend='numpy'):
         """
         Calculates log-likelihood.
 
         Parameters
         ----------
         data : float or array_like
-        shape : float
-        loc : float
-        scale : float
+        shape : float or array_like
+        loc : float or array_like
+        scale : float or array_like
         dx : str, optional
         precision : int, optional
+        backend : str, optional
+            'numpy' (default), 'mpmath' or 'adaptive'.
+            Log-likelihood is -np.inf outside of the support for 'numpy' and 'adaptive'.
+
+        Returns
+        -------
+        float or np.ndarray
+            Log-likelihood summed over dimensions of <data>. For array_like parameters, <data> is broadcast against
+            them and its dimensions are the trailing ones, e.g. <data> of shape (m,) and parameters of shape (n, 1)
+            return an array of shape (n,).
         """
 
-        with mpmath.workdps(precision):
-            # Make sure passed values are valid
-            data = self.check_support(data, shape, loc, scale, dx, precision)
+        _check_backend(backend)
+
+        if backend != 'mpmath':
+            log_t = self.__log_t(data, shape, loc, scale, dx)
+            with np.errstate(over='ignore', invalid='ignore'):
+                log_density = (shape + 1) * log_t - np.exp(log_t) - np.log(scale)
+            # Density is 0 outside of the support and at the lower end of the support for shape > 0 (t is infinite)
+            log_density = np.where(np.isnan(log_t) | (log_t == np.inf), -np.inf, log_density)
+            if backend == 'adaptive':
+                log_density = _refine(
+                    log_density, self.__ill_conditioned(data, shape, loc, scale, dx) & np.isfinite(log_density),
+                    lambda *_arguments: self.__log_pdf(*_arguments, dx, precision), data, shape, loc, scale
+                )
+            return np.sum(log_density, axis=_data_axes(data, log_density))
+
+        if _is_batch(shape, loc, scale):
+            with mpmath.workdps(precision):
+                log_densities = self.__log_pdf(data, shape, loc, scale, dx, precision)
+                return np.sum(log_densities, axis=_data_axes(data, log_densities))
 
+        with mpmath.workdps(precision):
+            densities = self.pdf(data, shape, loc, scale, dx, precision, backend)
             if np.isscalar(data):
-                return mpmath.log(self.pdf(data, shape, loc, scale, dx, precision))
+                return mpmath.log(densities)
             else:
-                return mpmath.fsum(
-                    [
-                        mpmath.log(
-                            self.pdf(_x, shape, loc, scale, dx, precision)
-                        ) for _x in data
-                    ]
-                )
+                return mpmath.fsum([mpmath.log(density) for density in np.ravel(densities)])
 
-    def observed_information(self, data, shape, loc, scale, dx='1e-10', precision=100):
+    @staticmethod
+    def r_largest_log_likelihood(data, shape, loc, scale, dx='1e-10'):
         """
-        Calculates observed (Fisher) information matrix for 3-parameter GEV (non-degenerate).
-        Calculate observed_information manually if any of the parameters are fixed (were assumed and not estimated).
+        Calculates log-likelihood of the r-largest order statistics GEV model (see Coles, 2001, eq. 3.15).
+        Vectorized over all blocks using numpy float64 arithmetic.
+        Returns -np.inf for parameters outside of the support.
 
         Parameters
         ----------
-        data : float or array_like
+        data : array_like
+            2D array of shape (number of blocks, r) with r largest values in each block (one row per block).
+            Blocks with fewer than r values are padded with np.nan.
         shape : float
         loc : float
         scale : float
+        dx : str, optional
+            Absolute value of <shape> below which the Gumbel (shape=0) limit is used.
+        """
+
+        data = np.array(data, dtype=np.float64, ndmin=2)
+        if scale <= 0:
+            return -np.inf
+
+        valid = ~np.isnan(data)
+        z = (data[valid] - loc) / scale
+        # Standardized r'th (smallest) order statistic in each block
+        z_r = (np.nanmin(data, axis=1) - loc) / scale
+
+        if np.abs(shape) <= float(dx):
+            return -np.sum(np.exp(-z_r)) - np.sum(z) - len(z) * np.log(scale)
+
+        if np.any(1 + shape * z <= 0):
+            return -np.inf
+        return (
+            - np.sum(np.exp(-np.log1p(shape * z_r) / shape))
+            - (1 + 1 / shape) * np.sum(np.log1p(shape * z))
+            - len(z) * np.log(scale)
+        )
+
+    def log_likelihood_gradient(self, data, shape, loc, scale, dx='1e-10'):
+        """
+        Calculates gradient of log-likelihood by (shape, loc, scale) in closed form using float64.
+        Returns np.nan's if any of <data> lie outside of the support.
+        Dimensions of <data> are summed over as in self.log_likelihood.
+
+        Parameters
+        ----------
+        data : float or array_like
+        shape : float or array_like
+        loc : float or array_like
+        scale : float or array_like
+        dx : str, optional
+
+        Returns
+        -------
+        np.ndarray
+            Array of shape (3,), or (3, ...) for array_like parameters.
+        """
+
+        gradient = self.__log_density_derivatives(data, shape, loc, scale, dx)[0]
+        return np.sum(gradient, axis=_data_axes(data, gradient))
+
+    def log_likelihood_hessian(self, data, shape, loc, scale, dx='1e-10'):
+        """
+        Calculates Hessian of log-likelihood by (shape, loc, scale) in closed form using float64.
+        Returns np.nan's if any of <data> lie outside of the support.
+        Dimensions of <data> are summed over as in self.log_likelihood.
+
+        Parameters
+        ----------
+        data : float or array_like
+        shape : float or array_like
+        loc : float or array_like
+        scale : float or array_like
+        dx : str, optional
+
+        Returns
+        -------
+        np.ndarray
+            Array of shape (3, 3), or (3, 3, ...) for array_like parameters.
+        """
+
+        hessian = self.__log_density_derivatives(data, shape, loc, scale, dx)[1]
+        return np.sum(hessian, axis=_data_axes(data, hessian))
+
+    def observed_information(self, data, shape, loc, scale, dx='1e-10', precision=100, backend='numpy'):
+        """
+        Calculates observed (Fisher) information matrix for 3-parameter GEV (non-degenerate).
+        Calculate observed_information manually if any of the parameters are fixed (were assumed and not estimated),
+        e.g. as a submatrix of this matrix for remaining parameters.
+
+        Parameters
+        ----------
+        data : float or array_like
+        shape : float or array_like
+        loc : float or array_like
+        scale : float or array_like
         dx : str, optional
         precision : int, optional
+        backend : str, optional
+            'numpy' (default) and 'adaptive' calculate negative Hessian in closed form using float64.
+            'mpmath' estimates it using finite differences with spacing <dx> and <precision>
+            (only for scalar parameters).
         """
 
-        with mpmath.workdps(precision):
-            # Make sure passed values are valid
-            data = self.check_support(data, shape, loc, scale, dx, precision)
+        _check_backend(backend)
+
+        if backend != 'mpmath':
+            return -self.log_likelihood_hessian(data, shape, loc, scale, dx)
+
+        if _is_batch(shape, loc, scale):
+            raise NotImplementedError('Finite difference observed information requires scalar parameters')
 
+        with mpmath.workdps(precision):
             # Define log likelihood function to be differentiated
             def log_likelihood_stationary(*theta):
-                return self.log_likelihood(data, theta[0], theta[1], theta[2], dx, precision)
+                return self.log_likelihood(data, theta[0], theta[1], theta[2], dx, precision, backend='mpmath')
 
             return -coastlib.math.derivatives.hessian(
                 func=log_likelihood_stationary, n=3,
@@ -408,82 +842,84 @@ class GeneralizedPareto:
     https://en.wikipedia.org/wiki/Generalized_Pareto_distribution
     Has methods equivalent to those of scipy.stats.genepareto.
     Shape parameter is called 'shape', while in scipy its called 'c'.
+    Methods are evaluated in float64 by default, pass backend='mpmath' to use arbitrary precision arithmetic
+    or backend='adaptive' to use it only for elements which are ill-conditioned in float64.
+    Parameters may be arrays (e.g. a parameter ensemble), which are broadcast against each other and against values
+    using numpy broadcasting rules, e.g. isf(q, shape, loc, scale) with <q> of shape (1, m) and parameters
+    of shape (n, 1) returns an array of shape (n, m).
     """
 
     def __init__(self):
         pass
 
+    @staticmethod
+    def in_support(x, shape, loc, scale, dx='1e-10'):
+        """
+        Returns a boolean mask of values <x> which lie within the support (bool if <x> is scalar).
+        Raises ValueError for invalid parameters.
+
+        Parameters
+        ----------
+        x : float or array_like
+        shape : float or array_like
+        loc : float or array_like
+        scale : float or array_like
+        dx : str, optional
+        """
+
+        # Parameters constraint
+        if np.any(np.asarray(scale) <= 0):
+            raise ValueError('Scale parameter must be larger than 0')
+
+        x, shape, loc, scale = np.broadcast_arrays(x, shape, loc, scale)
+        negative = np.asarray(shape < -float(dx), dtype=bool)
+        # Shape >= 0 - bounded below, shape < 0 - bounded on both ends
+        valid = (x >= loc) & (~negative | (x <= loc - scale / np.where(negative, shape, -1)))
+        return np.asarray(valid, dtype=bool)[()]
+
     @staticmethod
     def check_support(x, shape, loc, scale, dx='1e-10', precision=100):
         """
         Verify that passed parameters are valid.
-        Returns np.nan in place of invalid inputs (if array, replaces invalid values with np.nan's).
+        Returns np.nan in place of invalid inputs (if array, returns a copy with invalid values replaced by np.nan's).
         """
 
         with mpmath.workdps(precision):
-            if not np.isscalar(x):
-                x = np.array(x)
-
-            # Parameters constraint
-            if scale <= 0:
-                raise ValueError('Scale parameter must be larger than 0')
-
-            # Support constraint
-            if np.isscalar(x):
-                # Shape >= 0
-                if mpmath.mpf(shape) >= -mpmath.mpf(dx):
-                    condition = x >= loc
-                # Shape < 0
-                else:
-                    condition = loc <= x <= loc - scale / shape
-            else:
-                # Shape >= 0
-                if mpmath.mpf(shape) >= -mpmath.mpf(dx):
-                    condition = np.all(x >= loc)
-                # Shape < 0
-                else:
-                    condition = np.all(x >= loc) and np.all(x <= loc - scale / shape)
-
-            # Test conditions - replace invalid x's with np.nan
-            if condition:
-                return x
-            else:
-                if np.isscalar(x):
-                    return np.nan
-                else:
-                    truncated_x = x
-                    # Shape >= 0
-                    if mpmath.mpf(shape) >= -mpmath.mpf(dx):
-                        truncated_x[truncated_x < loc] = np.nan
-                    # Shape < 0
-                    else:
-                        truncated_x[truncated_x < loc] = np.nan
-                        truncated_x[truncated_x > loc - scale / shape] = np.nan
-                    return truncated_x
+            valid = GeneralizedPareto.in_support(x, shape, loc, scale, dx)
+        if np.ndim(valid) == 0:
+            return x if valid else np.nan
+        return np.where(valid, x, np.nan)
 
-    def rvs(self, shape, loc, scale, size=1, random_state=None, dx='1e-10', precision=100):
+    def rvs(self, shape, loc, scale, size=1, random_state=None, dx='1e-10', precision=100, backend='numpy'):
         """
-        Returns random value or an array of random values of given size sampled from the GPD distribution.
+        Returns an array of random values of given size sampled from the GPD distribution
+        using inverse transform sampling. Global numpy random state is neither used nor modified.
 
         Parameters
         ----------
-        shape : float
-        loc : float
-        scale : float
-        size : int, optional
-        random_state : int, optional
+        shape : float or array_like
+        loc : float or array_like
+        scale : float or array_like
+        size : int or tuple, optional
+            Sample shape, broadcast against array_like parameters.
+        random_state : int or np.random.Generator, optional
+            Seed or random number generator (default=None).
         dx : str, optional
         precision : int, optional
+        backend : str, optional
+            'numpy' (default), 'mpmath' or 'adaptive'.
         """
 
+        _check_backend(backend)
+
         # Parameter constraint
-        if scale <= 0:
+        if np.any(np.asarray(scale) <= 0):
             raise ValueError('Scale parameter must be larger than 0')
 
-        with mpmath.workdps(precision):
-            if random_state is not None:
-                np.random.seed(random_state)
-            return self.ppf(np.random.random(size), shape, loc, scale, dx, precision)
+        return _sample(
+            lambda *_arguments: self.ppf(*_arguments, dx, precision, backend),
+            shape, loc, scale, size, random_state, object if backend == 'mpmath' else np.float64
+        )
 
     @staticmethod
     def fit(data, *args, **kwargs):
@@ -494,13 +930,104 @@ class GeneralizedPareto:
 
         return scipy.stats.genpareto.fit(data, *args, **kwargs)
 
-    def __z(self, x, shape, loc, scale, dx='1e-10', precision=100):
+    @staticmethod
+    def __log_sf(x, shape, loc, scale, dx='1e-10'):
         """
-        Calculates support value z, used further in self.cdf and self.pdf.
+        Calculates logarithm of survival function in float64, used further in self.cdf and self.pdf.
+        Evaluated only within the support, returns np.nan in place of values outside of the support.
 
         Parameters
         ----------
         x : float or array_like
+        shape : float or array_like
+        loc : float or array_like
+        scale : float or array_like
+        dx : str, optional
+        """
+
+        x, shape, loc, scale = _broadcast(x, shape, loc, scale)
+        valid = GeneralizedPareto.in_support(x, shape, loc, scale, dx)
+        log_sf = np.full(x.shape, np.nan)
+        shape, z = shape[valid], (x[valid] - loc[valid]) / scale[valid]
+        exponential = np.abs(shape) <= float(dx)
+        # Shape == 0 - log(sf) = -z
+        # Shape != 0 - log(sf) = -log(1 + shape * z) / shape, rounding below -1 at the support bound is clipped
+        with np.errstate(divide='ignore'):
+            log_sf[valid] = np.where(
+                exponential, -z, -np.log1p(np.maximum(shape * z, -1)) / np.where(exponential, 1, shape)
+            )
+        return log_sf
+
+    @staticmethod
+    def __ill_conditioned(x, shape, loc, scale, dx='1e-10'):
+        """
+        Returns a boolean mask of values <x> which are ill-conditioned in float64 (see adaptive_tolerance).
+        """
+
+        x, shape, loc, scale = _broadcast(x, shape, loc, scale)
+        z = (x - loc) / scale
+        return (np.abs(shape) > float(dx)) & (
+            _ill_conditioned_shape(shape, dx) | (np.abs(1 + shape * z) < adaptive_tolerance)
+        )
+
+    @staticmethod
+    def __check_quantile(q, upper=False):
+        """
+        Raises ValueError if any of the lower (upper if <upper> is True) tail probabilities <q> lie outside
+        of the interval (0;1] ([0;1) if <upper> is True).
+        """
+
+        invalid = (q < 0) | (q > 1) | (q == (1 if upper else 0))
+        if np.any(invalid):
+            interval = '[0;1)' if upper else '(0;1]'
+            raise ValueError(f'Quantile must lie in interval {interval}, {q[invalid][0]} was given')
+
+    @staticmethod
+    def __quantile(y, shape, loc, scale, dx='1e-10'):
+        """
+        Calculates value x in float64 from y = -log(sf(x)).
+        """
+
+        exponential = np.abs(shape) <= float(dx)
+        # Shape == 0 - x = loc + scale * y
+        # Shape != 0 - x = loc + scale * (exp(shape * y) - 1) / shape
+        with np.errstate(over='ignore', invalid='ignore'):
+            return np.where(
+                exponential, loc + scale * y, loc + scale * np.expm1(shape * y) / np.where(exponential, 1, shape)
+            )
+
+    @staticmethod
+    def __log_density_derivatives(data, shape, loc, scale, dx='1e-10'):
+        """
+        Calculates gradient and Hessian of log-density by (shape, loc, scale) for each of <data> in float64.
+        Returns arrays of shape (3, ...) and (3, 3, ...) with trailing dimensions of <data> broadcast
+        against parameters, derivatives are np.nan for <data> outside of the support.
+        """
+
+        x, shape, loc, scale = _broadcast(data, shape, loc, scale)
+        valid = GeneralizedPareto.in_support(x, shape, loc, scale, dx)
+        z = np.where(valid, (x - loc) / scale, np.nan)
+        # Shape == 0 - w = 1
+        shape = np.where(np.abs(shape) <= float(dx), 0, shape)
+        w = 1 + shape * z
+        log_sf_shape, log_sf_shape_shape = _shape_derivatives(z, shape, dx)
+
+        # Log-density f = -(1 + 1 / shape) * log(w) - log(scale), w = 1 + shape * z
+        with np.errstate(divide='ignore', invalid='ignore'):
+            f_z = -(1 + shape) / w
+            f_zz = (1 + shape) * shape / w ** 2
+            f_shape = log_sf_shape - z / w
+            f_shape_shape = log_sf_shape_shape + z ** 2 / w ** 2
+            f_z_shape = -1 / w + (1 + shape) * z / w ** 2
+        return _location_scale_derivatives(z, scale, f_z, f_zz, f_shape, f_shape_shape, f_z_shape)
+
+    def __z(self, x, shape, loc, scale, dx='1e-10', precision=100):
+        """
+        Calculates support value z for a single value <x> within the support, used further in self.cdf and self.pdf.
+
+        Parameters
+        ----------
+        x : float
         shape : float
         loc : float
         scale : float
@@ -509,38 +1036,50 @@ class GeneralizedPareto:
         """
 
         with mpmath.workdps(precision):
-            # Make sure passed values are valid
-            x = self.check_support(x, shape, loc, scale, dx, precision)
-
-            if np.isscalar(x):
-                return (x - loc) / scale
-            else:
-                return np.array(
-                    [
-                        (_x - loc) / scale
-                        for _x in x
-                    ]
-                )
+            return (mpmath.mpf(x) - mpmath.mpf(loc)) / mpmath.mpf(scale)
 
     @staticmethod
-    def ppf(q, shape, loc, scale, dx='1e-10', precision=100):
+    def ppf(q, shape, loc, scale, dx='1e-10', precision=100, backend='numpy'):
         """
         Calculates percent point function (inverse CDF, value for given lower tail probability).
 
         Parameters
         ----------
         q : float or array_like
-        shape : float
-        loc : float
-        scale : float
+        shape : float or array_like
+        loc : float or array_like
+        scale : float or array_like
         dx : str, optional
         precision : int, optional
+        backend : str, optional
+            'numpy' (default), 'mpmath' or 'adaptive'.
         """
 
+        _check_backend(backend)
+
         # Parameter constraint
-        if scale <= 0:
+        if np.any(np.asarray(scale) <= 0):
             raise ValueError(f'Invalid parameter passed in scale={scale}')
 
+        if backend != 'mpmath':
+            q = np.asarray(q, dtype=np.float64)
+            GeneralizedPareto.__check_quantile(q)
+            # -log(1 - q) is evaluated as -log1p(-q) to retain precision for small lower tail probabilities
+            with np.errstate(divide='ignore'):
+                values = GeneralizedPareto.__quantile(-np.log1p(-q), shape, loc, scale, dx)
+            if backend == 'adaptive':
+                values = _refine(
+                    values, _ill_conditioned_quantile(q, shape, dx),
+                    lambda *_arguments: GeneralizedPareto.ppf(*_arguments, dx, precision, 'mpmath'),
+                    q, shape, loc, scale
+                )
+            return values[()]
+
+        if _is_batch(shape, loc, scale):
+            return _map_parameters(
+                lambda *_arguments: GeneralizedPareto.ppf(*_arguments, dx, precision, backend), q, shape, loc, scale
+            )
+
         with mpmath.workdps(precision):
             # Shape == 0
             if mpmath.fabs(shape) <= mpmath.mpf(dx):
@@ -594,145 +1133,274 @@ class GeneralizedPareto:
                         ]
                     )
 
-    def isf(self, q, shape, loc, scale, dx='1e-10', precision=100):
+    def isf(self, q, shape, loc, scale, dx='1e-10', precision=100, backend='numpy'):
         """
         Calculates inverse survival function (inverse SF, value for given upper tail probability).
 
         Parameters
         ----------
         q : float or array_like
-        shape : float
-        loc : float
-        scale : float
+        shape : float or array_like
+        loc : float or array_like
+        scale : float or array_like
         dx : str, optional
         precision : int, optional
+        backend : str, optional
+            'numpy' (default), 'mpmath' or 'adaptive'.
         """
 
+        _check_backend(backend)
+
+        if backend != 'mpmath':
+            if np.any(np.asarray(scale) <= 0):
+                raise ValueError(f'Invalid parameter passed in scale={scale}')
+            q = np.asarray(q, dtype=np.float64)
+            self.__check_quantile(q, upper=True)
+            with np.errstate(divide='ignore'):
+                values = self.__quantile(-np.log(q), shape, loc, scale, dx)
+            if backend == 'adaptive':
+                values = _refine(
+                    values, _ill_conditioned_quantile(q, shape, dx),
+                    lambda *_arguments: self.isf(*_arguments, dx, precision, 'mpmath'), q, shape, loc, scale
+                )
+            return values[()]
+
+        if _is_batch(shape, loc, scale):
+            return _map_parameters(
+                lambda *_arguments: self.isf(*_arguments, dx, precision, backend), q, shape, loc, scale
+            )
+
         with mpmath.workdps(precision):
-            return self.ppf(1-q, shape, loc, scale, dx, precision)
+            # 1 - q is evaluated with <precision> to retain small upper tail probabilities
+            if np.isscalar(q):
+                return self.ppf(mpmath.mpf('1') - mpmath.mpf(q), shape, loc, scale, dx, precision, backend)
+            else:
+                return self.ppf(
+                    np.array([mpmath.mpf('1') - mpmath.mpf(_q) for _q in q]),
+                    shape, loc, scale, dx, precision, backend
+                )
 
-    def pdf(self, x, shape, loc, scale, dx='1e-10', precision=100):
+    def pdf(self, x, shape, loc, scale, dx='1e-10', precision=100, backend='numpy'):
         """
         Calculates pdf.
 
         Parameters
         ----------
         x : float or array_like
-        shape : float
-        loc : float
-        scale : float
+        shape : float or array_like
+        loc : float or array_like
+        scale : float or array_like
         dx : str, optional
         precision : int, optional
+        backend : str, optional
+            'numpy' (default), 'mpmath' or 'adaptive'.
         """
 
-        with mpmath.workdps(precision):
-            # Make sure passed values are valid
-            x = self.check_support(x, shape, loc, scale, dx, precision)
-            z = self.__z(x, shape, loc, scale, dx, precision)
+        _check_backend(backend)
+
+        if backend != 'mpmath':
+            with np.errstate(over='ignore'):
+                density = np.exp((shape + 1) * self.__log_sf(x, shape, loc, scale, dx)) / scale
+            if backend == 'adaptive':
+                density = _refine(
+                    density, self.__ill_conditioned(x, shape, loc, scale, dx),
+                    lambda *_arguments: self.pdf(*_arguments, dx, precision, 'mpmath'), x, shape, loc, scale
+                )
+            return density[()]
+
+        if _is_batch(shape, loc, scale):
+            return _map_parameters(
+                lambda *_arguments: self.pdf(*_arguments, dx, precision, backend), x, shape, loc, scale
+            )
 
+        with mpmath.workdps(precision):
             part_1 = mpmath.mpf('1') / mpmath.mpf(scale)
             part_3 = -(mpmath.mpf('1') / mpmath.mpf(shape) + mpmath.mpf('1'))
-            if np.isscalar(x):
-                part_2 = mpmath.mpf('1') + mpmath.mpf(shape) * z
-                return part_1 * mpmath.power(part_2, part_3)
-            else:
-                parts_2 = [
-                    mpmath.mpf('1') + mpmath.mpf(shape) * _z
-                    for _z in z
-                ]
-                return np.array(
-                    [
-                        part_1 * mpmath.power(part_2, part_3)
-                        for part_2 in parts_2
-                    ]
-                )
 
-    def cdf(self, x, shape, loc, scale, dx='1e-10', precision=100):
+            def density(_x):
+                part_2 = mpmath.mpf('1') + mpmath.mpf(shape) * self.__z(_x, shape, loc, scale, dx, precision)
+                # Support is checked in float, rounding below 0 at the support bound is clipped
+                return part_1 * mpmath.power(max(part_2, mpmath.mpf('0')), part_3)
+
+            return _map_support(density, x, self.in_support(x, shape, loc, scale, dx))
+
+    def cdf(self, x, shape, loc, scale, dx='1e-10', precision=100, backend='numpy'):
         """
         Calculates cdf.
 
         Parameters
         ----------
         x : float or array_like
-        shape : float
-        loc : float
-        scale : float
+        shape : float or array_like
+        loc : float or array_like
+        scale : float or array_like
         dx : str, optional
         precision : int, optional
+        backend : str, optional
+            'numpy' (default), 'mpmath' or 'adaptive'.
         """
 
-        with mpmath.workdps(precision):
-            # Make sure passed values are valid
-            x = self.check_support(x, shape, loc, scale, dx, precision)
-            z = self.__z(x, shape, loc, scale, dx, precision)
+        _check_backend(backend)
 
-            part_2 = -(mpmath.mpf('1') / mpmath.mpf(shape))
-            if np.isscalar(x):
-                part_1 = mpmath.mpf('1') + mpmath.mpf(shape) * z
-                return mpmath.mpf('1') - mpmath.power(part_1, part_2)
-            else:
-                parts_1 = [
-                    mpmath.mpf('1') + mpmath.mpf(shape) * _z
-                    for _z in z
-                ]
-                return np.array(
-                    [
-                        mpmath.mpf('1') - mpmath.power(part_1, part_2)
-                        for part_1 in parts_1
-                    ]
+        if backend != 'mpmath':
+            with np.errstate(invalid='ignore'):
+                values = -np.expm1(self.__log_sf(x, shape, loc, scale, dx))
+            if backend == 'adaptive':
+                values = _refine(
+                    values, self.__ill_conditioned(x, shape, loc, scale, dx),
+                    lambda *_arguments: self.cdf(*_arguments, dx, precision, 'mpmath'), x, shape, loc, scale
                 )
+            return values[()]
 
-    def log_likelihood(self, data, shape, loc, scale, dx='1e-10', precision=100):
+        if _is_batch(shape, loc, scale):
+            return _map_parameters(
+                lambda *_arguments: self.cdf(*_arguments, dx, precision, backend), x, shape, loc, scale
+            )
+
+        with mpmath.workdps(precision):
+            part_2 = -(mpmath.mpf('1') / mpmath.mpf(shape))
+
+            def probability(_x):
+                part_1 = mpmath.mpf('1') + mpmath.mpf(shape) * self.__z(_x, shape, loc, scale, dx, precision)
+                return mpmath.mpf('1') - mpmath.power(max(part_1, mpmath.mpf('0')), part_2)
+
+            return _map_support(probability, x, self.in_support(x, shape, loc, scale, dx))
+
+    def __log_pdf(self, x, shape, loc, scale, dx='1e-10', precision=100):
+        """
+        Calculates logarithm of pdf for each of <x> and parameters broadcast against each other using mpmath.
+        """
+
+        with mpmath.workdps(precision):
+            return np.frompyfunc(mpmath.log, 1, 1)(self.pdf(x, shape, loc, scale, dx, precision, 'mpmath'))
+
+    def log_likelihood(self, data, shape, loc, scale, dx='1e-10', precision=100, backend='numpy'):
         """
         Calculates log-likelihood.
 
         Parameters
         ----------
         data : float or array_like
-        shape : float
-        loc : float
-        scale : float
+        shape : float or array_like
+        loc : float or array_like
+        scale : float or array_like
         dx : str, optional
         precision : int, optional
+        backend : str, optional
+            'numpy' (default), 'mpmath' or 'adaptive'.
+            Log-likelihood is -np.inf outside of the support for 'numpy' and 'adaptive'.
+
+        Returns
+        -------
+        float or np.ndarray
+            Log-likelihood summed over dimensions of <data>. For array_like parameters, <data> is broadcast against
+            them and its dimensions are the trailing ones, e.g. <data> of shape (m,) and parameters of shape (n, 1)
+            return an array of shape (n,).
         """
 
-        with mpmath.workdps(precision):
-            # Make sure passed values are valid
-            data = self.check_support(data, shape, loc, scale, dx, precision)
+        _check_backend(backend)
+
+        if backend != 'mpmath':
+            log_sf = self.__log_sf(data, shape, loc, scale, dx)
+            # Density is 0 outside of the support
+            log_density = np.where(np.isnan(log_sf), -np.inf, (shape + 1) * log_sf - np.log(scale))
+            if backend == 'adaptive':
+                log_density = _refine(
+                    log_density, self.__ill_conditioned(data, shape, loc, scale, dx) & np.isfinite(log_density),
+                    lambda *_arguments: self.__log_pdf(*_arguments, dx, precision), data, shape, loc, scale
+                )
+            return np.sum(log_density, axis=_data_axes(data, log_density))
+
+        if _is_batch(shape, loc, scale):
+            with mpmath.workdps(precision):
+                log_densities = self.__log_pdf(data, shape, loc, scale, dx, precision)
+                return np.sum(log_densities, axis=_data_axes(data, log_densities))
 
+        with mpmath.workdps(precision):
+            densities = self.pdf(data, shape, loc, scale, dx, precision, backend)
             if np.isscalar(data):
-                return mpmath.log(self.pdf(data, shape, loc, scale, dx, precision))
+                return mpmath.log(densities)
             else:
-                return mpmath.fsum(
-                    [
-                        mpmath.log(
-                            self.pdf(_x, shape, loc, scale, dx, precision)
-                        ) for _x in data
-                    ]
-                )
+                return mpmath.fsum([mpmath.log(density) for density in np.ravel(densities)])
+
+    def log_likelihood_gradient(self, data, shape, loc, scale, dx='1e-10'):
+        """
+        Calculates gradient of log-likelihood by (shape, loc, scale) in closed form using float64.
+        Returns np.nan's if any of <data> lie outside of the support.
+        Dimensions of <data> are summed over as in self.log_likelihood.
+
+        Parameters
+        ----------
+        data : float or array_like
+        shape : float or array_like
+        loc : float or array_like
+        scale : float or array_like
+        dx : str, optional
+
+        Returns
+        -------
+        np.ndarray
+            Array of shape (3,), or (3, ...) for array_like parameters.
+        """
+
+        gradient = self.__log_density_derivatives(data, shape, loc, scale, dx)[0]
+        return np.sum(gradient, axis=_data_axes(data, gradient))
+
+    def log_likelihood_hessian(self, data, shape, loc, scale, dx='1e-10'):
+        """
+        Calculates Hessian of log-likelihood by (shape, loc, scale) in closed form using float64.
+        Returns np.nan's if any of <data> lie outside of the support.
+        Dimensions of <data> are summed over as in self.log_likelihood.
+
+        Parameters
+        ----------
+        data : float or array_like
+        shape : float or array_like
+        loc : float or array_like
+        scale : float or array_like
+        dx : str, optional
+
+        Returns
+        -------
+        np.ndarray
+            Array of shape (3, 3), or (3, 3, ...) for array_like parameters.
+        """
+
+        hessian = self.__log_density_derivatives(data, shape, loc, scale, dx)[1]
+        return np.sum(hessian, axis=_data_axes(data, hessian))
 
-    def observed_information(self, data, shape, loc, scale, dx='1e-10', precision=100):
+    def observed_information(self, data, shape, loc, scale, dx='1e-10', precision=100, backend='numpy'):
         """
         Calculates observed (Fisher) information matrix for 3-parameter GPD (non-degenerate).
-        Calculate observed_information manually if any of the parameters are fixed (were assumed and not estimated).
+        Calculate observed_information manually if any of the parameters are fixed (were assumed and not estimated),
+        e.g. as a submatrix of this matrix for remaining parameters.
 
         Parameters
         ----------
         data : float or array_like
-        shape : float
-        loc : float
-        scale : float
+        shape : float or array_like
+        loc : float or array_like
+        scale : float or array_like
         dx : str, optional
         precision : int, optional
+        backend : str, optional
+            'numpy' (default) and 'adaptive' calculate negative Hessian in closed form using float64.
+            'mpmath' estimates it using finite differences with spacing <dx> and <precision>
+            (only for scalar parameters).
         """
 
-        with mpmath.workdps(precision):
-            # Make sure passed values are valid
-            data = self.check_support(data, shape, loc, scale, dx, precision)
+        _check_backend(backend)
 
+        if backend != 'mpmath':
+            return -self.log_likelihood_hessian(data, shape, loc, scale, dx)
+
+        if _is_batch(shape, loc, scale):
+            raise NotImplementedError('Finite difference observed information requires scalar parameters')
+
+        with mpmath.workdps(precision):
             # Define log likelihood function to be differentiated
             def log_likelihood_stationary(*theta):
-                return self.log_likelihood(data, theta[0], theta[1], theta[2], dx, precision)
+                return self.log_likelihood(data, theta[0], theta[1], theta[2], dx, precision, backend='mpmath')
 
             return -coastlib.math.derivatives.hessian(
                 func=log_likelihood_stationary, n=3,
@@ -748,8 +1416,7 @@ if __name__ == "__main__":
     import scipy.stats
 
     def __test_genextreme():
-        np.random.seed(0)
-        random_sample = genextreme.rvs(shape=.07, loc=1, scale=2, size=100)
+        random_sample = genextreme.rvs(shape=.07, loc=1, scale=2, size=100, random_state=0)
         random_sample = np.sort(np.float64(random_sample))
         fit_parameters = genextreme.fit(random_sample, loc=1)
 
@@ -861,8 +1528,7 @@ if __name__ == "__main__":
               f'\n{np.round(oi, 2)}')
 
     def __test_genpareto():
-        np.random.seed(0)
-        random_sample = genpareto.rvs(shape=0.2, loc=0, scale=.7, size=100)
+        random_sample = genpareto.rvs(shape=0.2, loc=0, scale=.7, size=100, random_state=0)
         random_sample = np.sort(np.float64(random_sample))
         fit_parameters = genpareto.fit(random_sample, floc=0)
 
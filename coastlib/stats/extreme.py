@@ -14,20 +14,47 @@
 # You should have received a copy of the GNU General Public License
 # along with this program. If not, see <http://www.gnu.org/licenses/>.
 
+import concurrent.futures
 import pickle
 
 import corner
 import emcee
 import matplotlib.pyplot as plt
 import matplotlib.ticker
-import mpmath
 import numpy as np
 import pandas as pd
+import scipy.optimize
 import scipy.stats
 import statsmodels.api as sm
 
+import coastlib.helper.profiler
 import coastlib.math.derivatives
+import coastlib.plotting.downsample
+import coastlib.plotting.hover
 import coastlib.stats.distributions
+import coastlib.stats.kernels
+import coastlib.stats.nonstationary
+
+
+# Plotting positions (alpha, beta) - cdf = (rank - alpha) / (n + 1 - alpha - beta)
+# https://matplotlib.org/mpl-probscale/tutorial/closer_look_at_plot_pos.html
+plotting_positions = {
+    'ECDF': (0, 1),
+    'Hazen': (0.5, 0.5),
+    'Weibull': (0, 0),
+    'Laplace': (-1, -1),
+    'Tukey': (1 / 3, 1 / 3),
+    'Blom': (3 / 8, 3 / 8),
+    'Median': (0.3175, 0.3175),
+    'Cunnane': (0.4, 0.4),
+    'Gringorten': (0.44, 0.44),
+    'Gumbel': (1, 1)
+}
+
+
+# Default memory budget in bytes for arrays of return values sampled for many return periods
+# (MCMC and Monte Carlo samples x return periods). Return periods are processed in chunks within this budget.
+memory_budget = 2 ** 27
 
 
 # Helper function used to handle quantiles of empty arrays
@@ -38,6 +65,134 @@ def empty_quantile(array, *args, **kwargs):
         return np.nan
 
 
+def independent_peaks(times, values, r, extremes_type='high'):
+    """
+    Finds independent peaks - values which are the largest (smallest if <extremes_type='low'>)
+    within +/- <r> of their own time. Of equal peaks closer than <r> to each other only the first one is kept.
+    Used to select independent events without a threshold (e.g. for the r-largest order statistics method).
+
+    Parameters
+    ----------
+    times : np.ndarray
+        Sorted array of times as integer nanoseconds (e.g. pd.DatetimeIndex.values.view('int64')).
+    values : np.ndarray
+        Array of values.
+    r : int or float
+        Minimum distance between independent events in nanoseconds.
+    extremes_type : str, optional
+        'high' finds maxima, 'low' finds minima (default='high').
+
+    Returns
+    -------
+    np.ndarray
+        Integer indexes of peaks within <times> and <values>.
+    """
+
+    if len(times) == 0:
+        return np.array([], dtype=np.int64)
+
+    if extremes_type == 'high':
+        signed_values = np.asarray(values, dtype=np.float64)
+    else:
+        signed_values = -np.asarray(values, dtype=np.float64)
+
+    # Moving maxima over [t-r, t] and [t, t+r] (latter as backward window over reversed time)
+    window = pd.Timedelta(int(r), unit='ns')
+    backward = pd.Series(
+        signed_values, index=pd.to_datetime(times)
+    ).rolling(window, closed='both').max().values
+    forward = pd.Series(
+        signed_values[::-1], index=pd.to_datetime(times[-1] - times[::-1])
+    ).rolling(window, closed='both').max().values[::-1]
+    peaks = np.flatnonzero((signed_values >= backward) & (signed_values >= forward))
+
+    # Drop repeated equal peaks within <r> of each other
+    duplicate = np.zeros(len(peaks), dtype=bool)
+    duplicate[1:] = (np.diff(times[peaks]) <= r) & (np.diff(signed_values[peaks]) == 0)
+    return peaks[~duplicate]
+
+
+def extremal_index(positions, method='intervals', r=None):
+    """
+    Estimates the extremal index (reciprocal of mean cluster size in the limit) from positions of exceedances.
+    https://doi.org/10.1111/1467-9868.00401 (Ferro and Segers, 2003)
+
+    Parameters
+    ----------
+    positions : np.ndarray
+        Sorted array of exceedance positions as integers - sample numbers for the 'intervals' method
+        (inter-exceedance times are measured in sampling intervals) or any time units for the 'runs' method.
+    method : str, optional
+        Estimator (default='intervals'):
+            'intervals' - intervals estimator of Ferro and Segers, uses inter-exceedance times only
+            'runs' - ratio of number of clusters (identified with the runs method) to number of exceedances
+    r : int or float, optional
+        Minimum distance between clusters in units of <positions>. Required for the 'runs' method.
+
+    Returns
+    -------
+    float
+        Extremal index estimate in (0, 1].
+    """
+
+    if len(positions) < 2:
+        return 1.
+    intervals = np.diff(positions).astype(np.float64)
+
+    if method == 'intervals':
+        if intervals.max() <= 2:
+            theta = 2 * np.sum(intervals) ** 2 / (len(intervals) * np.sum(intervals ** 2))
+        else:
+            theta = 2 * np.sum(intervals - 1) ** 2 / (len(intervals) * np.sum((intervals - 1) * (intervals - 2)))
+    elif method == 'runs':
+        if r is None:
+            raise ValueError('<r> must be provided for the runs method')
+        theta = (np.sum(intervals > r) + 1) / len(positions)
+    else:
+        raise ValueError(f'Method {method} not recognized')
+
+    return min(1., theta)
+
+
+def scipy_fit(distribution_name, data, scipy_fit_options):
+    """
+    Fits scipy distribution with <distribution_name> to <data>.
+    Defined at module level to be usable by process-based executors.
+
+    Parameters
+    ----------
+    distribution_name : str
+        Scipy distribution name (see https://docs.scipy.org/doc/scipy/reference/stats.html).
+    data : np.ndarray
+        Data to which the distribution is fitted.
+    scipy_fit_options : dict
+        Special scipy fit options like <fc>, <loc>, or <floc>.
+
+    Returns
+    -------
+    tuple or None
+        Fit parameters, None if fit failed.
+    """
+
+    try:
+        return getattr(scipy.stats, distribution_name).fit(data, **scipy_fit_options)
+    except Exception:
+        return None
+
+
+# Calendar strata used by the stratified EVA (month number -> stratum label)
+calendar_strata = {
+    'month': {
+        1: 'Jan', 2: 'Feb', 3: 'Mar', 4: 'Apr', 5: 'May', 6: 'Jun',
+        7: 'Jul', 8: 'Aug', 9: 'Sep', 10: 'Oct', 11: 'Nov', 12: 'Dec'
+    },
+    'season': {
+        12: 'DJF', 1: 'DJF', 2: 'DJF', 3: 'MAM', 4: 'MAM', 5: 'MAM',
+        6: 'JJA', 7: 'JJA', 8: 'JJA', 9: 'SON', 10: 'SON', 11: 'SON'
+    }
+}
+
+
 class EVA:
     """
     Initializes the EVA class instance by taking a <dataframe> with values in <column> to analyze.
@@ -70,10 +225,15 @@ class EVA:
         number of blocks of <block_size> in <dataframe>. Set to None to calculate number of blocks
         as "(last_date - first_date) / block_size". Default is 24 hours.
         It is also used in Block Maxima extreme value extraction method to get boundaries of blocks.
+    profiler : bool or coastlib.helper.Profiler, optional
+        If True or a Profiler object, records wall time, number of calls and, optionally, peak memory
+        of the main EVA methods in <self.timings> (default=None, no profiling).
 
     Public Attributes
     -----------------
     self.__init__()
+        self.profiler : coastlib.helper.Profiler
+        self.timings : dict
         self.dataframe : pd.DataFrame
         self.column : str
         self.block_size : float
@@ -89,6 +249,7 @@ class EVA:
         self.extremes : pd.DataFrame
         self.extremes_rate : float
         self.plotting_position : str
+        self.extremal_index : float
 
     self.fit()
         self.distribution_name : str
@@ -99,6 +260,15 @@ class EVA:
         self.mcmc_chain : np.ndarray
         self.fixed_parameters : np.ndarray
 
+    self.fit_many()
+        self.fit_candidates : dict
+
+    self.fit_stratified()
+        self.strata : dict
+
+    self.fit_nonstationary()
+        self.nonstationary_fit : dict
+
     self.generate_results()
         self.results : pd.DataFrame
 
@@ -106,23 +276,37 @@ class EVA:
     ------------------
     self.__init__()
         self.__status : dict
+        self.__threshold_fits : dict
+
+    self.get_extremes()
+        self.__extremes_blocks : np.ndarray
+        self.__extremes_ranks : np.ndarray
 
     Public Methods
     --------------
     self.to_pickle
     self.read_pickle
     self.get_extremes
+    self.get_plotting_positions
     self.plot_extremes
     self.plot_mean_residual_life
     self.plot_parameter_stability
+    self.select_threshold
+    self.get_extremal_index
     self.test_extremes
     self.fit
+    self.fit_many
+    self.select_fit
+    self.fit_stratified
+    self.fit_nonstationary
+    self.nonstationary_return_value
     self.plot_trace
     self.plot_corner
     self.plot_posterior
     self.return_value
     self.confidence_interval
     self.generate_results
+    self.generate_catalogue
     self.plot_summary
     self.pdf
     self.cdf
@@ -134,10 +318,15 @@ class EVA:
     Private Methods
     ---------------
     self.__init__
+    self.__initialize
     self.__get_blocks
     self.__update
     self.__repr__
     self.__get_return_period
+    self.__get_plotting_positions
+    self.__get_r_largest
+    self.__get_covariates
+    self.__map_fits
     self.__run_mcmc
     self._kernel_fit_parameters
     self.__monte_carlo
@@ -145,7 +334,7 @@ class EVA:
     self.__get_property
     """
 
-    def __init__(self, dataframe, column=None, block_size=365.2425, gap_length=24):
+    def __init__(self, dataframe, column=None, block_size=365.2425, gap_length=24, profiler=None):
         """
         Initializes the EVA class instance by taking a <dataframe> with values in <column> to analyze.
         Calculates number of blocks with <block_size>, accounting for gaps if <gap_length> is given.
@@ -170,6 +359,25 @@ class EVA:
             number of blocks of <block_size> in <dataframe>. Set to None to calculate number of blocks
             as "(last_date - first_date) / block_size". Default is 24 hours.
             It is also used in Block Maxima extreme value extraction method to get boundaries of blocks.
+        profiler : bool or coastlib.helper.Profiler, optional
+            If True or a Profiler object, records wall time, number of calls and, if enabled in the Profiler,
+            peak memory of the main EVA methods in <self.timings> (default=None, no profiling).
+        """
+
+        # Stage-level profiling
+        if profiler is True:
+            profiler = coastlib.helper.profiler.Profiler()
+        elif profiler is False:
+            profiler = None
+        self.profiler = profiler
+        self.timings = None if self.profiler is None else self.profiler.timings
+
+        self.__initialize(dataframe=dataframe, column=column, block_size=block_size, gap_length=gap_length)
+
+    @coastlib.helper.profiler.profiled('__init__')
+    def __initialize(self, dataframe, column, block_size, gap_length):
+        """
+        Validates <dataframe> and initializes the EVA class instance attributes (see self.__init__).
         """
 
         # Ensure passed <dataframe> is a pd.Dataframe object or can be converted to one
@@ -223,20 +431,18 @@ class EVA:
         # Separate data into clusters using gap_length and plot each cluster independently
         # This way distant clusters are not connected on the plot
         if self.gap_length is not None:
-            cluster_values = [[self.dataframe[self.column].values.copy()[0]]]
-            cluster_indexes = [[self.dataframe.index.values.copy()[0]]]
-            for index, value in zip(self.dataframe.index, self.dataframe[self.column].values):
-                # New cluster encountered
-                if index - cluster_indexes[-1][-1] > np.timedelta64(pd.Timedelta(hours=self.gap_length)):
-                    cluster_values.append([value])
-                    cluster_indexes.append([index])
-                # Continuing within current cluster
-                else:
-                    cluster_values[-1].append(value)
-                    cluster_indexes[-1].append(index)
-            cluster_indexes = np.array(cluster_indexes)
-            cluster_values = np.array(cluster_values)
-            self.dataframe_declustered = np.array([cluster_indexes, cluster_values])
+            cluster_starts = coastlib.stats.kernels.segment_clusters(
+                times=self.dataframe.index.values.view('int64'), gap=pd.Timedelta(hours=self.gap_length).value
+            )
+            self.dataframe_declustered = np.empty((2, len(cluster_starts)), dtype=object)
+            for i, (index, value) in enumerate(
+                zip(
+                    np.split(self.dataframe.index.values, cluster_starts[1:]),
+                    np.split(self.dataframe[self.column].values, cluster_starts[1:])
+                )
+            ):
+                self.dataframe_declustered[0, i] = index
+                self.dataframe_declustered[1, i] = value
         else:
             self.dataframe_declustered = None
 
@@ -256,6 +462,9 @@ class EVA:
         self.extremes = None
         self.extremes_rate = None
         self.plotting_position = None
+        self.extremal_index = None
+        self.__extremes_blocks = None
+        self.__extremes_ranks = None
         # Extremes fit
         self.distribution_name = None
         self.fit_method = None
@@ -264,8 +473,14 @@ class EVA:
         self.sampler = None
         self.mcmc_chain = None
         self.fixed_parameters = None
+        # Candidate and stratified fits
+        self.fit_candidates = None
+        self.strata = None
+        self.nonstationary_fit = None
         # Results
         self.results = None
+        # Cache of GPD fits for automatic threshold selection, persists between extractions
+        self.__threshold_fits = {}
 
     def __get_blocks(self, gap_length):
         """
@@ -287,14 +502,12 @@ class EVA:
 
         # Calculate number of blocks with gaps accounted for
         if gap_length is not None:
-            timedelta = np.timedelta64(pd.Timedelta(hours=gap_length))
-            # Eliminate gaps in data by shifting all values upstream of the gap downstream by <total_shift>
-            new_index = self.dataframe.index.values.copy()
-            for i in np.arange(1, len(new_index)):
-                shift = new_index[i] - new_index[i-1]
-                if shift > timedelta:
-                    # Add 1/10 of gap_length to avoid duplicate dates
-                    new_index[i:] -= shift - np.timedelta64(pd.Timedelta(hours=gap_length/10))
+            # Eliminate gaps in data by shifting all values upstream of the gap downstream
+            # Leave 1/10 of gap_length to avoid duplicate dates
+            new_index = coastlib.stats.kernels.collapse_gaps(
+                times=self.dataframe.index.values.view('int64'),
+                gap=pd.Timedelta(hours=gap_length).value, shift=pd.Timedelta(hours=gap_length/10).value
+            )
             series_range = np.float64(new_index[-1] - new_index[0])
 
         # Calculate number of blocks with gaps not accounted for
@@ -318,6 +531,12 @@ class EVA:
             self.extremes = None
             self.extremes_rate = None
             self.plotting_position = None
+            self.extremal_index = None
+            self.__extremes_blocks = None
+            self.__extremes_ranks = None
+            self.fit_candidates = None
+            self.strata = None
+            self.nonstationary_fit = None
 
         if not self.__status['fit']:
             self.distribution_name = None
@@ -426,16 +645,20 @@ class EVA:
             file = pickle.load(f)
         return file
 
+    @coastlib.helper.profiler.profiled()
     def get_extremes(self, method='BM', plotting_position='Weibull', extremes_type='high', **kwargs):
         """
-        Extracts extreme values from <self.dataframe> <self.column> using the BM (Block Maxima)
-        or the POT (Peaks Over Threshold) methods. If method is POT, also declusters extreme values using
-        the runs method (aka minimum distance between independent events).
+        Extracts extreme values from <self.dataframe> <self.column> using the BM (Block Maxima),
+        the POT (Peaks Over Threshold), or the RL (r-Largest order statistics) methods.
+        If method is POT, also declusters extreme values using the runs method
+        (aka minimum distance between independent events).
+        If method is RL, extracts <r_largest> largest independent events within each block.
 
         Parameters
         ----------
         method : str, optional
-            Peak extraction method. 'POT' for Peaks Over Threshold and 'BM' for Block Maxima (default='BM').
+            Peak extraction method. 'POT' for Peaks Over Threshold, 'BM' for Block Maxima,
+            and 'RL' for r-Largest order statistics (default='BM').
         plotting_position : str, optional
             Plotting position (default='Weibull'). Has no effect on return value inference,
             affects only some goodness of fit statistics and locations of observed extremes on the
@@ -455,6 +678,18 @@ class EVA:
                     If True, sets threshold equal to smallest/largest exceedance.
                     This way Generalized Pareto Distribution location parameter is strictly 0.
                     Eliminates instabilities associated with estimating location (default=True).
+                extremal_index : float or str, optional
+                    If given, exceedances are not declustered - all exceedances are used in the fit
+                    and rate of extreme events is multiplied by the extremal index. Either a value in (0, 1]
+                    or name of the estimator: 'intervals' (Ferro and Segers) or 'runs' (uses <r>).
+                    <r> cannot be passed with other estimators (default=None, decluster using the runs method).
+            for method='RL'
+                r_largest : int, optional
+                    Number of largest (smallest, if <extremes_type='low'>) events extracted from each block.
+                    Blocks with fewer independent events contribute all of them (default=3).
+                r : float, optional
+                    Minimum distance in hours between events for them to be considered independent.
+                    An event is a value which is the largest (smallest) within +/- r hours (default=24).
 
         Returns
         -------
@@ -485,14 +720,12 @@ class EVA:
 
             # Generate new index with gaps eliminated
             if self.gap_length is not None:
-                gap_delta = np.timedelta64(pd.Timedelta(hours=self.gap_length))
-                # Eliminate gaps in data by shifting all values upstream of the gap downstream by <total_shift>
-                new_index = self.dataframe.index.values.copy()
-                for i in np.arange(1, len(new_index)):
-                    shift = new_index[i] - new_index[i-1]
-                    if shift > gap_delta:
-                        # Add 1/10 of gap_length to avoid duplicate dates
-                        new_index[i:] -= shift - np.timedelta64(pd.Timedelta(hours=self.gap_length/10))
+                # Eliminate gaps in data by shifting all values upstream of the gap downstream
+                # Leave 1/10 of gap_length to avoid duplicate dates
+                new_index = coastlib.stats.kernels.collapse_gaps(
+                    times=self.dataframe.index.values.view('int64'),
+                    gap=pd.Timedelta(hours=self.gap_length).value, shift=pd.Timedelta(hours=self.gap_length/10).value
+                ).view('datetime64[ns]')
             else:
                 new_index = self.dataframe.index.values.copy()
 
@@ -550,6 +783,9 @@ class EVA:
         elif method == 'POT':
 
             self.threshold = kwargs.pop('threshold')
+            extremal_index_method = kwargs.pop('extremal_index', None)
+            if extremal_index_method is not None and extremal_index_method != 'runs' and 'r' in kwargs:
+                raise ValueError('<r> cannot be used with <extremal_index> - exceedances are not declustered')
             r = kwargs.pop('r', 24)
             adjust_threshold = kwargs.pop('adjust_threshold', True)
             assert len(kwargs) == 0, f'unrecognized arguments passed in: {", ".join(kwargs.keys())}'
@@ -566,32 +802,27 @@ class EVA:
             else:
                 self.extremes = self.dataframe[self.dataframe[self.column] < self.threshold][self.column].to_frame()
 
+            # Estimate extremal index and keep all exceedances
+            if extremal_index_method is not None:
+                if isinstance(extremal_index_method, str):
+                    self.extremal_index = self.get_extremal_index(
+                        threshold=self.threshold, method=extremal_index_method,
+                        extremes_type=self.extremes_type, r=r
+                    )
+                elif 0 < extremal_index_method <= 1:
+                    self.extremal_index = extremal_index_method
+                else:
+                    raise ValueError(f'<extremal_index> must be in (0, 1], {extremal_index_method} was passed')
+
             # Decluster raw extremes using runs method
-            if r is not None:
-                r = np.timedelta64(pd.Timedelta(hours=r))
-                last_cluster_index = self.extremes.index.values.copy()[0]
-                peak_cluster_values = [self.extremes[self.column].values.copy()[0]]
-                peak_cluster_indexes = [self.extremes.index.values.copy()[0]]
-                for index, value in zip(self.extremes.index, self.extremes[self.column].values):
-                    # New cluster encountered
-                    if index - last_cluster_index > r:
-                        peak_cluster_values.append(value)
-                        peak_cluster_indexes.append(index)
-                    # Continuing within current cluster
-                    else:
-                        # Update cluster peak
-                        if self.extremes_type == 'high':
-                            if value > peak_cluster_values[-1]:
-                                peak_cluster_values[-1] = value
-                                peak_cluster_indexes[-1] = index
-                        else:
-                            if value < peak_cluster_values[-1]:
-                                peak_cluster_values[-1] = value
-                                peak_cluster_indexes[-1] = index
-                    # Index of previous cluster - lags behind <index> by 1
-                    last_cluster_index = index
+            elif r is not None:
+                peaks = coastlib.stats.kernels.decluster_runs(
+                    times=self.extremes.index.values.view('int64'), values=self.extremes[self.column].values,
+                    r=pd.Timedelta(hours=r).value, extremes_type=self.extremes_type
+                )
                 self.extremes = pd.DataFrame(
-                    data=peak_cluster_values, index=peak_cluster_indexes, columns=[self.column]
+                    data=self.extremes[self.column].values[peaks], index=self.extremes.index[peaks],
+                    columns=[self.column]
                 )
 
             # Update threshold to smallest/largest extreme value in order to fix the GPD location parameter at 0.
@@ -602,15 +833,89 @@ class EVA:
                 else:
                     self.threshold = self.extremes[self.column].values.max()
 
+        # r-Largest Order Statistics method
+        elif method == 'RL':
+
+            r_largest = kwargs.pop('r_largest', 3)
+            r = kwargs.pop('r', 24)
+            assert len(kwargs) == 0, f'unrecognized arguments passed in: {", ".join(kwargs.keys())}'
+            if not isinstance(r_largest, (int, np.integer)) or r_largest < 1:
+                raise ValueError(f'<r_largest> must be a positive integer, {r_largest} was passed')
+
+            # Set threshold to 0 for compatibility between BM and POT formulas
+            self.extremes_method = 'r-Largest Order Statistics'
+            self.threshold = 0
+
+            times = self.dataframe.index.values.view('int64')
+            values = self.dataframe[self.column].values
+
+            # Generate new index with gaps eliminated (same as in the Block Maxima method)
+            if self.gap_length is not None:
+                new_times = coastlib.stats.kernels.collapse_gaps(
+                    times=times, gap=pd.Timedelta(hours=self.gap_length).value,
+                    shift=pd.Timedelta(hours=self.gap_length/10).value
+                )
+            else:
+                new_times = times
+
+            # Assign each observation to a block of <self.block_size>, the last block includes the end of the record
+            block_delta = pd.Timedelta(days=self.block_size).value
+            self.number_of_blocks = max(1, int(np.ceil((new_times[-1] - new_times[0]) / block_delta)))
+            block_ids = np.minimum((new_times - new_times[0]) // block_delta, self.number_of_blocks - 1)
+            block_starts = np.searchsorted(
+                new_times, new_times[0] + np.arange(self.number_of_blocks) * block_delta, side='left'
+            )
+            self.block_boundaries = np.append(
+                self.dataframe.index.values[block_starts],
+                self.dataframe.index.values[block_starts[-1]] + np.timedelta64(block_delta, 'ns')
+            )
+
+            # Find independent events and arrange them in a (block, event) array padded with -inf
+            peaks = independent_peaks(
+                times=times, values=values, r=pd.Timedelta(hours=r).value, extremes_type=self.extremes_type
+            )
+            peak_blocks = block_ids[peaks]
+            peak_values = values[peaks] if self.extremes_type == 'high' else -values[peaks]
+            counts = np.bincount(peak_blocks, minlength=self.number_of_blocks)
+            positions = np.arange(len(peaks)) - np.repeat(np.cumsum(counts) - counts, counts)
+            block_values = np.full((self.number_of_blocks, counts.max()), -np.inf)
+            block_values[peak_blocks, positions] = peak_values
+            block_indexes = np.zeros(block_values.shape, dtype=np.int64)
+            block_indexes[peak_blocks, positions] = peaks
+
+            # Select <r_largest> events in each block using partial sort
+            k = min(r_largest, block_values.shape[1])
+            largest = np.argpartition(-block_values, k - 1, axis=1)[:, :k]
+            selected = np.take_along_axis(block_indexes, largest, axis=1)[
+                np.isfinite(np.take_along_axis(block_values, largest, axis=1))
+            ]
+            selected.sort()
+
+            self.extremes = pd.DataFrame(
+                data=values[selected], index=self.dataframe.index[selected], columns=[self.column]
+            )
+            self.__extremes_blocks = block_ids[selected]
+
         else:
             raise ValueError(f'Method {method} not recognized')
 
         self.extremes.index.name = self.dataframe.index.name
 
         # Calculate rate of extreme events (events/block)
-        self.extremes_rate = len(self.extremes) / self.number_of_blocks
+        if self.extremes_method == 'r-Largest Order Statistics':
+            # Distribution describes block maxima - one event per block with data
+            self.extremes_rate = len(np.unique(self.__extremes_blocks)) / self.number_of_blocks
+        elif self.extremal_index is not None:
+            # Rate of clusters of exceedances
+            self.extremes_rate = self.extremal_index * len(self.extremes) / self.number_of_blocks
+        else:
+            self.extremes_rate = len(self.extremes) / self.number_of_blocks
 
         # Assign ranks to data with duplicate values having average of ranks they would have individually
+        # Ranks are cached and reused for all plotting positions
+        self.__extremes_ranks = scipy.stats.rankdata(self.extremes[self.column].values, method='average')
+        if self.extremes_type == 'low':
+            self.__extremes_ranks = len(self.extremes) + 1 - self.__extremes_ranks
         self.plotting_position = plotting_position
         self.extremes['Return Period'] = self.__get_return_period(plotting_position=self.plotting_position)
 
@@ -624,7 +929,7 @@ class EVA:
 
     def __get_return_period(self, plotting_position, return_cdf=False):
         """
-        Assigns return periods to extracted extreme events and updates the <self.extremes> index.
+        Calculates return periods of extracted extreme events using cached ranks.
 
         Parameters
         ----------
@@ -636,42 +941,101 @@ class EVA:
             If True, returns cdf of extracted extremes (default=False).
         """
 
-        # Assign ranks to data with duplicate values having average of ranks they would have individually
-        if self.extremes_type == 'high':
-            ranks = scipy.stats.rankdata(self.extremes[self.column].values, method='average')
-        else:
-            ranks = len(self.extremes) + 1 - scipy.stats.rankdata(self.extremes[self.column].values, method='average')
-
-        # Calculate return periods using a specified plotting position
-        # https://matplotlib.org/mpl-probscale/tutorial/closer_look_at_plot_pos.html
-        plotting_positions = {
-            'ECDF': (0, 1),
-            'Hazen': (0.5, 0.5),
-            'Weibull': (0, 0),
-            'Laplace': (-1, -1),
-            'Tukey': (1 / 3, 1 / 3),
-            'Blom': (3 / 8, 3 / 8),
-            'Median': (0.3175, 0.3175),
-            'Cunnane': (0.4, 0.4),
-            'Gringorten': (0.44, 0.44),
-            'Gumbel': (1, 1)
-        }
         if plotting_position not in plotting_positions:
             raise ValueError(f'Plotting position {plotting_position} not recognized')
-        alpha, beta = plotting_positions[plotting_position][0], plotting_positions[plotting_position][1]
-        cdf = (ranks - alpha) / (len(self.extremes) + 1 - alpha - beta)
+        return self.__get_plotting_positions([plotting_position], return_cdf=return_cdf)[:, 0]
+
+    def __get_plotting_positions(self, names, return_cdf=False):
+        """
+        Calculates return periods (or cdf) of extracted extreme events for each plotting position in <names>.
+
+        Returns
+        -------
+        np.ndarray
+            Array of shape (number of extremes, number of plotting positions).
+        """
+
+        alpha, beta = np.array([plotting_positions[name] for name in names]).T
+        cdf = (self.__extremes_ranks[:, np.newaxis] - alpha) / (len(self.extremes) + 1 - alpha - beta)
         if return_cdf:
             return cdf
 
         # Survival function - aka upper tail probability or probability of exceedance
         sf = 1 - cdf
-        return 1 / sf / self.extremes_rate
+        if self.extremes_method == 'r-Largest Order Statistics':
+            # All extracted events are ranked together, not only block maxima
+            extremes_rate = len(self.extremes) / self.number_of_blocks
+        else:
+            extremes_rate = self.extremes_rate
+        # Return period is infinite for the largest extreme if its plotting position has sf=0 (e.g. ECDF)
+        with np.errstate(divide='ignore'):
+            return 1 / sf / extremes_rate
 
-    def plot_extremes(self):
+    @coastlib.helper.profiler.profiled()
+    def get_plotting_positions(self, return_cdf=False):
+        """
+        Calculates empirical return periods (or cdf) of extracted extreme events for all supported
+        plotting positions at once. Ranks are calculated once per extraction and reused.
+
+        Parameters
+        ----------
+        return_cdf : bool, optional
+            If True, returns cdf instead of return periods (default=False).
+
+        Returns
+        -------
+        pd.DataFrame
+            Table with extreme events in rows and plotting positions in columns.
+        """
+
+        if not self.__status['extremes']:
+            raise RuntimeError('Extreme values have not been extracted. Run self.get_extremes() first')
+
+        return pd.DataFrame(
+            data=self.__get_plotting_positions(list(plotting_positions.keys()), return_cdf=return_cdf),
+            index=self.extremes.index, columns=list(plotting_positions.keys())
+        )
+
+    def __get_r_largest(self):
+        """
+        Arranges exceedances extracted using the r-largest order statistics method in a 2D array
+        with one row per block with data. Rows with fewer than r values are padded with np.nan.
+        Exceedances are flipped around 0 if <self.extremes_type='low'>.
+
+        Returns
+        -------
+        np.ndarray
+            Array of shape (number of blocks with data, r).
+        """
+
+        exceedances = self.extremes[self.column].values - self.threshold
+        # Flip exceedances around 0
+        if self.extremes_type == 'low':
+            exceedances *= -1
+
+        rows = np.unique(self.__extremes_blocks, return_inverse=True)[1]
+        counts = np.bincount(rows)
+        positions = np.arange(len(rows)) - np.repeat(np.cumsum(counts) - counts, counts)
+        r_largest = np.full((len(counts), counts.max()), np.nan)
+        r_largest[rows, positions] = exceedances
+        return r_largest
+
+    @coastlib.helper.profiler.profiled()
+    def plot_extremes(self, decimate=None):
         """
         Plots extracted extreme values on top of <self.dataframe> <self.column> observed time series.
         Shows boundaries of blocks for the Block Maxima method and threshold level for the Peaks Over Threshold method.
 
+        Parameters
+        ----------
+        decimate : str, optional
+            Downsamples observed time series to the figure width in pixels before rendering
+            (each gap cluster gets its share of pixels). Extreme values are always kept.
+            Use for very long records, which otherwise take long to render.
+            'minmax' - keeps smallest and largest values within each pixel.
+            'lttb' - Largest-Triangle-Three-Buckets.
+            Default=None - all observations are plotted.
+
         Returns
         -------
         tuple(fig, ax)
@@ -688,15 +1052,25 @@ class EVA:
                 edgecolors='white', marker='s', facecolors='k', s=40, lw=1, zorder=15
             )
             if self.gap_length is None:
-                ax.plot(
-                    self.dataframe.index, self.dataframe[self.column],
-                    color='#3182bd', lw=.5, alpha=.8, zorder=5
-                )
+                clusters = [(self.dataframe.index.values, self.dataframe[self.column].values)]
             else:
-                for x, y in zip(self.dataframe_declustered[0], self.dataframe_declustered[1]):
-                    ax.plot(x, y, color='#3182bd', lw=.5, alpha=.8, zorder=5)
-
-            if self.extremes_method == 'Block Maxima':
+                clusters = zip(self.dataframe_declustered[0], self.dataframe_declustered[1])
+            if decimate is not None:
+                pixels = fig.get_figwidth() * fig.dpi
+                extreme_times = self.extremes.index.values
+                span = (self.dataframe.index.values[-1] - self.dataframe.index.values[0]).astype(np.float64)
+            for x, y in clusters:
+                if decimate is not None:
+                    x, y = np.asarray(x), np.asarray(y)
+                    # Keep positions of extreme values within this cluster
+                    positions = np.searchsorted(x, extreme_times).clip(max=len(x) - 1)
+                    keep = positions[x[positions] == extreme_times]
+                    n = int(np.ceil(pixels * (x[-1] - x[0]).astype(np.float64) / span)) if span > 0 else 1
+                    indexes = coastlib.plotting.downsample.decimate(x, y, n, method=decimate, keep=keep)
+                    x, y = x[indexes], y[indexes]
+                ax.plot(x, y, color='#3182bd', lw=.5, alpha=.8, zorder=5)
+
+            if self.extremes_method in ['Block Maxima', 'r-Largest Order Statistics']:
                 for _block in self.block_boundaries:
                     ax.axvline(_block, color='k', ls='--', lw=1, zorder=10)
             elif self.extremes_method == 'Peaks Over Threshold':
@@ -722,8 +1096,7 @@ class EVA:
             point.set_visible(False)
             annot.set_visible(False)
 
-            def update_annot(ind):
-                n = ind['ind'][0]
+            def update_annot(n):
                 pos = points.get_offsets()[n]
                 annot.xy = pos
                 point.set_offsets(pos)
@@ -735,27 +1108,13 @@ class EVA:
                 )
                 annot.set_text(text)
 
-            def hover(event):
-                vis = annot.get_visible()
-                if event.inaxes == ax:
-                    cont, ind = points.contains(event)
-                    if cont:
-                        update_annot(ind)
-                        annot.set_visible(True)
-                        point.set_visible(True)
-                        fig.canvas.draw_idle()
-                    else:
-                        if vis:
-                            annot.set_visible(False)
-                            point.set_visible(False)
-                            fig.canvas.draw_idle()
-
-            fig.canvas.mpl_connect('motion_notify_event', hover)
+            coastlib.plotting.hover.connect_hover(ax, points, update_annot, [annot, point])
 
             fig.tight_layout()
 
             return fig, ax
 
+    @coastlib.helper.profiler.profiled()
     def plot_mean_residual_life(self, thresholds=None, r=24, alpha=.95, extremes_type='high',
                                 adjust_threshold=True, limit=10, plot=True):
         """
@@ -876,6 +1235,7 @@ class EVA:
         else:
             return thresholds, residuals, confidence.T[0], confidence.T[1]
 
+    @coastlib.helper.profiler.profiled()
     def plot_parameter_stability(self, thresholds=None, r=24, alpha=.95, extremes_type='high',
                                  adjust_threshold=True, limit=10, plot=True, dx='1e-10', precision=100):
         """
@@ -904,12 +1264,10 @@ class EVA:
         plot : bool, optional
             Generates plot if True, returns data if False (default=True).
         dx : str, optional
-            String representing a float, which represents spacing at which partial derivatives
-            are estimated (default='1e-10').
+            String representing a float, absolute value of shape parameter below which
+            the exponential (shape=0) limit is used in the observed information matrix (default='1e-10').
         precision : int, optional
-            Precision of floating point calculations (see mpmath library documentation) (default=100).
-            Derivative estimated with low <precision> value may have
-            a significant error due to rounding and under-/overflow.
+            Not used - observed information matrix is calculated in closed form (default=100).
 
         Returns
         -------
@@ -971,40 +1329,28 @@ class EVA:
                 modified_scales.append(mod_scale_function(shape, scale))
 
                 if alpha is not None:
-                    with mpmath.workdps(precision):
-                        # Define modified log_likehood function
-                        def log_likelihood(*theta):
-                            return mpmath.fsum(
-                                [
-                                    mpmath.log(
-                                        coastlib.stats.distributions.genpareto.pdf(
-                                            x=_x, shape=theta[0], loc=0, scale=theta[1]
-                                        )
-                                    ) for _x in exceedances
-                                ]
-                            )
-
-                        # Calculate delta (gradient) of scalar_function
-                        if extremes_type == 'high':
-                            delta_scalar = np.array(
-                                [
-                                    [-true_thresholds[-1]],
-                                    [1]
-                                ]
-                            )
-                        else:
-                            delta_scalar = np.array(
-                                [
-                                    [true_thresholds[-1]],
-                                    [1]
-                                ]
-                            )
-
-                        # Calculate observed information matrix (negative hessian of log_likelihood)
-                        observed_information = -coastlib.math.derivatives.hessian(
-                            func=log_likelihood, n=2, coordinates=[shape, scale], dx=dx, precision=precision
-                            ).astype(np.float64)
-                        covariance = np.linalg.inv(observed_information)
+                    # Calculate delta (gradient) of scalar_function
+                    if extremes_type == 'high':
+                        delta_scalar = np.array(
+                            [
+                                [-true_thresholds[-1]],
+                                [1]
+                            ]
+                        )
+                    else:
+                        delta_scalar = np.array(
+                            [
+                                [true_thresholds[-1]],
+                                [1]
+                            ]
+                        )
+
+                    # Calculate observed information matrix (negative hessian of log_likelihood)
+                    # for shape and scale (location is fixed at 0)
+                    observed_information = coastlib.stats.distributions.genpareto.observed_information(
+                        exceedances, shape, 0, scale, dx=dx
+                    )[np.ix_([0, 2], [0, 2])]
+                    covariance = np.linalg.inv(observed_information)
 
                     # Estimate modified scale parameter confidence interval using delta method
                     variance = np.dot(
@@ -1090,6 +1436,251 @@ class EVA:
             else:
                 return thresholds, shapes, modified_scales, shapes_confidence, scales_confidence
 
+    @coastlib.helper.profiler.profiled()
+    def select_threshold(self, thresholds=None, r=24, extremes_type='high', adjust_threshold=True,
+                         limit=10, alpha=.05):
+        """
+        Automatically selects threshold for the POT method by evaluating a grid of thresholds.
+        Each threshold is scored by the distance of the mean residual life plot from linearity
+        above the threshold (weighted mean squared error of a weighted linear fit) and by stability
+        of the Generalized Pareto Distribution (GPD) shape parameter estimated for all higher thresholds.
+        Thresholds with a Kolmogorov-Smirnov (KS) score below <alpha> are not recommended.
+        KS score is the nominal KS test p-value of the GPD fitted to the same exceedances - it is optimistically
+        biased, is not adjusted for testing multiple thresholds and is used as a heuristic screen, not as a test.
+        Thresholds with fewer than 5 valid thresholds above them (below, if 'low') are not scored.
+        Exceedances are extracted once for the lowest threshold and declustered for each threshold
+        using the vectorized runs method. Clusters are not reused across thresholds, because clusters
+        of a lower threshold split into several clusters (peaks) of higher thresholds.
+        GPD fits are cached and reused by subsequent calls.
+        Doesn't modify the EVA class instance state (extracted extremes and fit are preserved).
+
+        Parameters
+        ----------
+        thresholds : array_like, optional
+            Array with threshold values which are evaluated.
+            Default .95 quantile to max for 'high' and min to .05 quantile for 'low', 100 values.
+        r : float, optional
+            Minimum distance in hours between events for them to be considered independent.
+            Used to decluster extreme values using the runs method (default=24).
+        extremes_type : str, optional
+            Specifies type of extremes extracted: 'high' yields max values, 'low' yields min values (defaul='high').
+            Use 'high' for extreme high values, use 'low' for extreme low values.
+        adjust_threshold : bool, optional
+            If True, sets threshold equal to smallest/largest exceedance.
+            This way Generalized Pareto Distribution location parameter is strictly 0.
+            Eliminates instabilities associated with estimating location (default=True).
+        limit : int, optional
+            Minimum number of exceedances (peaks) for which calculations are performed (default=10).
+        alpha : float, optional
+            Minimum KS score (nominal KS test p-value) of recommended thresholds (default=.05).
+
+        Returns
+        -------
+        tuple(threshold, diagnostics)
+            threshold : float
+                Recommended threshold. np.nan if no threshold satisfies the criteria.
+            diagnostics : pd.DataFrame
+                Table indexed by threshold with number of exceedances, mean residual, GPD shape,
+                modified scale, linearity and shape stability scores, KS score, and combined score.
+        """
+
+        if extremes_type not in ['high', 'low']:
+            raise ValueError(f'<extremes_type> must be high or low, {extremes_type} was passed')
+
+        values = self.dataframe[self.column].values
+        if thresholds is None:
+            if extremes_type == 'high':
+                thresholds = np.linspace(np.quantile(values, .95), values.max(), 100)
+            else:
+                thresholds = np.linspace(values.min(), np.quantile(values, .05), 100)
+
+        if np.isscalar(thresholds):
+            raise ValueError('Thresholds must be an array. A scalar was provided')
+
+        thresholds = np.sort(thresholds)
+        if extremes_type == 'high':
+            thresholds = thresholds[thresholds < values.max()]
+        else:
+            thresholds = thresholds[thresholds > values.min()]
+        if len(thresholds) == 0:
+            raise ValueError('No valid thresholds within the range of observed values were provided')
+
+        # Extract exceedances once for the least restrictive threshold
+        times = self.dataframe.index.values.view(np.int64)
+        if extremes_type == 'high':
+            mask = values > thresholds.min()
+        else:
+            mask = values < thresholds.max()
+        candidate_times, candidate_values = times[mask], values[mask]
+        if r is None:
+            r_delta = None
+        else:
+            r_delta = pd.Timedelta(hours=r).value
+
+        records = []
+        for u in thresholds:
+            # Decluster exceedances of the current threshold (clusters of lower thresholds may split)
+            if extremes_type == 'high':
+                mask = candidate_values > u
+            else:
+                mask = candidate_values < u
+            local_times, local_values = candidate_times[mask], candidate_values[mask]
+            if r_delta is not None:
+                peaks = coastlib.stats.kernels.decluster_runs(
+                    local_times, local_values, r_delta, extremes_type=extremes_type
+                )
+                local_values = local_values[peaks]
+            if len(local_values) == 0:
+                continue
+
+            if adjust_threshold:
+                if extremes_type == 'high':
+                    true_threshold = local_values.min()
+                else:
+                    true_threshold = local_values.max()
+            else:
+                true_threshold = u
+
+            # Skip fitting for too few exceedances (only fits are cached, <limit> is applied for each call)
+            if len(local_values) <= limit:
+                records.append(
+                    dict(
+                        threshold=true_threshold, exceedances=len(local_values),
+                        mean_residual=np.nan, mean_variance=np.nan, shape=np.nan, scale=np.nan, ks_score=np.nan
+                    )
+                )
+                continue
+
+            # Load fit from cache or fit GPD to exceedances
+            key = (r, extremes_type, adjust_threshold, true_threshold, len(local_values))
+            if key not in self.__threshold_fits:
+                exceedances = local_values - true_threshold
+                # Flip exceedances around 0
+                if extremes_type == 'low':
+                    exceedances *= -1
+                shape, loc, scale = scipy.stats.genpareto.fit(exceedances, floc=0)
+                # Nominal p-value - parameters are estimated from the tested exceedances
+                _, ks_score = scipy.stats.kstest(exceedances, 'genpareto', args=(shape, loc, scale))
+                self.__threshold_fits[key] = dict(
+                    exceedances=len(exceedances),
+                    mean_residual=exceedances.mean(),
+                    mean_variance=exceedances.var(ddof=1) / len(exceedances),
+                    shape=shape, scale=scale, ks_score=ks_score
+                )
+            records.append(dict(threshold=true_threshold, **self.__threshold_fits[key]))
+
+        # Remove non-unique values
+        diagnostics = pd.DataFrame(records).drop_duplicates(subset='threshold', keep='first')
+        diagnostics = diagnostics.sort_values('threshold').reset_index(drop=True)
+        if extremes_type == 'high':
+            diagnostics['modified_scale'] = diagnostics['scale'] - diagnostics['shape'] * diagnostics['threshold']
+        else:
+            diagnostics['modified_scale'] = diagnostics['scale'] + diagnostics['shape'] * diagnostics['threshold']
+
+        # Score each threshold using all valid thresholds above it (below it for 'low')
+        valid = ~np.isnan(diagnostics['mean_residual'].values) & (diagnostics['mean_variance'].values > 0)
+        u_values = diagnostics['threshold'].values
+        linearity, stability = np.full(len(diagnostics), np.nan), np.full(len(diagnostics), np.nan)
+        for i in range(len(diagnostics)):
+            if extremes_type == 'high':
+                subset = valid & (u_values >= u_values[i])
+            else:
+                subset = valid & (u_values <= u_values[i])
+            if not valid[i] or subset.sum() < 5:
+                continue
+            x = u_values[subset]
+            y = diagnostics['mean_residual'].values[subset]
+            weights = 1 / diagnostics['mean_variance'].values[subset]
+            # Weighted linear fit of the mean residual life (np.polyfit weights are applied to unsquared residuals)
+            coefficients = np.polyfit(x, y, 1, w=np.sqrt(weights))
+            linearity[i] = np.sum(weights * (y - np.polyval(coefficients, x)) ** 2) / np.sum(weights)
+            shapes = diagnostics['shape'].values[subset]
+            stability[i] = np.sqrt(np.mean((shapes - shapes.mean()) ** 2))
+        diagnostics['linearity'] = linearity
+        diagnostics['shape_stability'] = stability
+
+        # Combined score is the average rank of linearity and stability among thresholds passing the KS screen
+        eligible = ~np.isnan(linearity) & (diagnostics['ks_score'].values >= alpha)
+        score = np.full(len(diagnostics), np.nan)
+        if eligible.any():
+            score[eligible] = (
+                scipy.stats.rankdata(linearity[eligible]) + scipy.stats.rankdata(stability[eligible])
+            ) / 2
+            # Lowest score wins, ties are resolved in favor of more exceedances
+            recommended = diagnostics['threshold'].values[np.nanargmin(score) if extremes_type == 'high'
+                                                          else len(score) - 1 - np.nanargmin(score[::-1])]
+        else:
+            recommended = np.nan
+        diagnostics['score'] = score
+
+        diagnostics = diagnostics.set_index('threshold')[
+            [
+                'exceedances', 'mean_residual', 'shape', 'modified_scale',
+                'linearity', 'shape_stability', 'ks_score', 'score'
+            ]
+        ]
+        diagnostics.columns = [
+            'Exceedances', 'Mean Residual', 'Shape', 'Modified Scale',
+            'Linearity WMSE', 'Shape Stability', 'KS Score', 'Score'
+        ]
+        diagnostics.index.name = 'Threshold'
+
+        return recommended, diagnostics
+
+    @coastlib.helper.profiler.profiled()
+    def get_extremal_index(self, threshold, method='intervals', extremes_type='high', r=24):
+        """
+        Estimates extremal index of <self.dataframe> <self.column> for exceedances over <threshold>.
+        Extremal index is the reciprocal of the limiting mean cluster size, 1 for independent exceedances.
+        Does not change the state of the EVA class instance.
+
+        Parameters
+        ----------
+        threshold : float or array_like
+            Threshold value or array of threshold values.
+        method : str, optional
+            Estimator (default='intervals'):
+                'intervals' - intervals estimator of Ferro and Segers, inter-exceedance times are counted
+                    in observations (gaps in data are skipped)
+                'runs' - ratio of number of clusters identified with the runs method to number of exceedances
+        extremes_type : str, optional
+            Specifies type of extremes: 'high' for values above threshold, 'low' for values below (default='high').
+        r : float, optional
+            Minimum distance in hours between clusters. Used only by the 'runs' method (default=24).
+
+        Returns
+        -------
+        float or pd.Series
+            Extremal index for a scalar <threshold>, otherwise a series with extremal index for each threshold.
+        """
+
+        if extremes_type not in ['high', 'low']:
+            raise ValueError(f'<extremes_type> must be high or low, {extremes_type} was passed')
+
+        values = self.dataframe[self.column].values
+        if method == 'intervals':
+            positions = np.arange(len(values))
+            r = None
+        elif method == 'runs':
+            positions = self.dataframe.index.values.view('int64')
+            r = pd.Timedelta(hours=r).value
+        else:
+            raise ValueError(f'Method {method} not recognized')
+
+        def estimate(u):
+            if extremes_type == 'high':
+                return extremal_index(positions[values > u], method=method, r=r)
+            else:
+                return extremal_index(positions[values < u], method=method, r=r)
+
+        if np.isscalar(threshold):
+            return estimate(threshold)
+        return pd.Series(
+            data=[estimate(u) for u in threshold], index=pd.Index(threshold, name='Threshold'),
+            name='Extremal Index'
+        )
+
+    @coastlib.helper.profiler.profiled()
     def test_extremes(self, method, **kwargs):
         """
         Provides multiple methods to test independece of extracted extreme values.
@@ -1183,8 +1774,7 @@ class EVA:
                     point.set_visible(False)
                     annot.set_visible(False)
 
-                    def update_annot(ind):
-                        n = ind['ind'][0]
+                    def update_annot(n):
                         pos = points.get_offsets()[n]
                         annot.xy = pos
                         point.set_offsets(pos)
@@ -1194,22 +1784,7 @@ class EVA:
                         )
                         annot.set_text(text)
 
-                    def hover(event):
-                        vis = annot.get_visible()
-                        if event.inaxes == ax:
-                            cont, ind = points.contains(event)
-                            if cont:
-                                update_annot(ind)
-                                annot.set_visible(True)
-                                point.set_visible(True)
-                                fig.canvas.draw_idle()
-                            else:
-                                if vis:
-                                    annot.set_visible(False)
-                                    point.set_visible(False)
-                                    fig.canvas.draw_idle()
-
-                    fig.canvas.mpl_connect('motion_notify_event', hover)
+                    coastlib.plotting.hover.connect_hover(ax, points, update_annot, [annot, point])
 
                     fig.tight_layout()
 
@@ -1251,34 +1826,17 @@ class EVA:
                     point.set_visible(False)
                     annotation.set_visible(False)
 
-                    def update_annotation(ind):
-                        pos = points.get_offsets()[ind['ind'][0]]
+                    def update_annotation(n):
+                        pos = points.get_offsets()[n]
                         annotation.xy = pos
                         point.set_offsets(pos)
-                        text = "{}".format(" ".join(
-                            [
-                                f'{self.extremes.index[n]} : {ind["ind"][0]}\n'
-                                f'{self.extremes.index[n+lag]} : {ind["ind"][0]+lag}'
-                                for n in ind['ind']
-                            ]))
+                        text = str(
+                            f'{self.extremes.index[n]} : {n}\n'
+                            f'{self.extremes.index[n+lag]} : {n+lag}'
+                        )
                         annotation.set_text(text)
 
-                    def hover(event):
-                        vis = annotation.get_visible()
-                        if event.inaxes == ax:
-                            cont, ind = points.contains(event)
-                            if cont:
-                                update_annotation(ind)
-                                annotation.set_visible(True)
-                                point.set_visible(True)
-                                fig.canvas.draw_idle()
-                            else:
-                                if vis:
-                                    annotation.set_visible(False)
-                                    point.set_visible(False)
-                                    fig.canvas.draw_idle()
-
-                    fig.canvas.mpl_connect('motion_notify_event', hover)
+                    coastlib.plotting.hover.connect_hover(ax, points, update_annotation, [annotation, point])
 
                     fig.tight_layout()
 
@@ -1315,6 +1873,7 @@ class EVA:
         else:
             raise ValueError(f'Method {method} not recognized. Try: autocorrelation')
 
+    @coastlib.helper.profiler.profiled()
     def fit(self, distribution_name, fit_method='MLE', **kwargs):
         """
         Depending on fit method, either creates a tuple with maximum likelihood estimate (MLE)
@@ -1369,50 +1928,539 @@ class EVA:
         if not self.__status['extremes']:
             raise RuntimeError('Extreme values have not been extracted. Nothing to fit')
 
-        # Update internal status
-        self.__status = dict(
-            extremes=True,
-            fit=False,
-            results=False
+        # Update internal status
+        self.__status = dict(
+            extremes=True,
+            fit=False,
+            results=False
+        )
+        self.__update()
+
+        if self.extremes_method == 'r-Largest Order Statistics' and distribution_name != 'genextreme':
+            raise ValueError(
+                f'r-largest order statistics can be fitted only by genextreme, {distribution_name} was passed'
+            )
+
+        if fit_method == 'MLE':
+
+            if distribution_name == 'genpareto':
+                self.scipy_fit_options = kwargs.pop('scipy_fit_options', dict(floc=0))
+            else:
+                self.scipy_fit_options = kwargs.pop('scipy_fit_options', {})
+            assert len(kwargs) == 0, f'unrecognized arguments passed in: {", ".join(kwargs.keys())}'
+
+            # Create local distribution object
+            distribution_object = getattr(scipy.stats, distribution_name)
+
+            exceedances = self.extremes[self.column].values - self.threshold
+            # Flip exceedances around 0
+            if self.extremes_type == 'low':
+                exceedances *= -1
+
+            if self.extremes_method == 'r-Largest Order Statistics':
+                if self.scipy_fit_options != {}:
+                    raise ValueError(
+                        f'r-largest order statistics fit is implemented only for unbound parameters, '
+                        f'{self.scipy_fit_options} was passed'
+                    )
+                r_largest = self.__get_r_largest()
+
+                # Custom genextreme has negative shape in scipy
+                def negative_log_likelihood(theta):
+                    return -coastlib.stats.distributions.genextreme.r_largest_log_likelihood(
+                        r_largest, -theta[0], theta[1], theta[2]
+                    )
+
+                # Start from the block maxima fit
+                solution = scipy.optimize.minimize(
+                    negative_log_likelihood, x0=distribution_object.fit(np.nanmax(r_largest, axis=1)),
+                    method='Nelder-Mead', options=dict(xatol=1e-8, fatol=1e-8, maxiter=10000)
+                )
+                if not solution.success:
+                    raise RuntimeError(f'r-largest order statistics fit failed: {solution.message}')
+                self.fit_parameters = tuple(solution.x)
+            else:
+                self.fit_parameters = distribution_object.fit(exceedances, **self.scipy_fit_options)
+
+        elif fit_method == 'MCMC':
+
+            self.mcmc_chain = self.__run_mcmc(distribution_name, **kwargs)
+
+        else:
+            raise ValueError(f'Fit method {fit_method} not recognized')
+
+        # On successful fit assign the fit_ variables
+        self.fit_method = fit_method
+        self.distribution_name = distribution_name
+
+        # Update internal status
+        self.__status = dict(
+            extremes=True,
+            fit=True,
+            results=False
+        )
+        self.__update()
+
+    @coastlib.helper.profiler.profiled()
+    def fit_many(self, distribution_names, scipy_fit_options=None, rp=(10, 50, 100), executor=None, max_workers=None):
+        """
+        Fits multiple candidate distributions to the same extracted extreme values concurrently (MLE, scipy)
+        and ranks them by AIC. Fits are stored in <self.fit_candidates> and can be promoted to the active fit
+        without refitting using the self.select_fit() method. Doesn't modify the active fit.
+
+        Parameters
+        ----------
+        distribution_names : array_like
+            List of scipy distribution names (see https://docs.scipy.org/doc/scipy/reference/stats.html).
+        scipy_fit_options : dict, optional
+            Dictionary with special scipy fit options (like <fc>, <loc>, or <floc>) for each distribution name,
+            e.g. dict(genpareto=dict(floc=0), expon=dict(floc=0)).
+            By default is dict(floc=0) for GPD and no options for other distributions (same as in self.fit()).
+        rp : array_like, optional
+            Return periods for which return values are reported in the comparison table (default=(10, 50, 100)).
+        executor : concurrent.futures.Executor, optional
+            Executor used to run the fits (default=None). By default a ProcessPoolExecutor is created.
+            Pass a ThreadPoolExecutor in environments where process-based parallelism is not available.
+        max_workers : int, optional
+            Number of workers for the default executor (default=None, number of processors).
+
+        Returns
+        -------
+        pd.DataFrame
+            Comparison table indexed by distribution name, sorted by AIC (best fit first), with
+            number of estimated parameters, log-likelihood, AIC (order 2), KS statistic and p-value,
+            and return values for each return period in <rp>.
+        """
+
+        # Make sure extreme values have been extracted
+        if not self.__status['extremes']:
+            raise RuntimeError('Extreme values have not been extracted. Nothing to fit')
+        if self.extremes_method == 'r-Largest Order Statistics':
+            raise ValueError('Candidate fits are not available for the r-largest order statistics, use self.fit()')
+
+        if scipy_fit_options is None:
+            scipy_fit_options = {}
+        options = {}
+        for distribution_name in distribution_names:
+            if distribution_name == 'genpareto':
+                options[distribution_name] = scipy_fit_options.get(distribution_name, dict(floc=0))
+            else:
+                options[distribution_name] = scipy_fit_options.get(distribution_name, {})
+
+        exceedances = self.extremes[self.column].values - self.threshold
+        # Flip exceedances around 0
+        if self.extremes_type == 'low':
+            exceedances *= -1
+
+        # Fit all distributions to shared exceedances
+        fits = self.__map_fits(
+            distribution_names=distribution_names,
+            datasets=[exceedances] * len(distribution_names),
+            scipy_fit_options=[options[name] for name in distribution_names],
+            executor=executor, max_workers=max_workers
+        )
+
+        self.fit_candidates = {}
+        rp = np.atleast_1d(rp)
+        records = []
+        for distribution_name, fit_parameters in zip(distribution_names, fits):
+            distribution_object = getattr(scipy.stats, distribution_name)
+            # Number of estimated parameters (fixed parameters don't count)
+            k = distribution_object.numargs + 2 - len(
+                [key for key in options[distribution_name] if key.startswith('f')]
+            )
+            record = {'k': k}
+            if fit_parameters is None:
+                record.update({'log-likelihood': np.nan, 'AIC': np.nan, 'KS statistic': np.nan, 'KS p-value': np.nan})
+                record.update({f'Return Value {_rp:g}': np.nan for _rp in rp})
+            else:
+                self.fit_candidates[distribution_name] = dict(
+                    fit_parameters=fit_parameters,
+                    scipy_fit_options=options[distribution_name]
+                )
+                log_likelihood = np.sum(distribution_object.logpdf(exceedances, *fit_parameters))
+                aic = 2 * k - 2 * log_likelihood + (2 * k ** 2 + 2 * k) / (len(self.extremes) - k - 1)
+                ks, p = scipy.stats.kstest(rvs=exceedances, cdf=distribution_object.cdf, args=fit_parameters)
+                return_values = distribution_object.isf(1 / rp / self.extremes_rate, *fit_parameters)
+                if self.extremes_type == 'high':
+                    return_values = self.threshold + return_values
+                else:
+                    return_values = self.threshold - return_values
+                record.update({'log-likelihood': log_likelihood, 'AIC': aic, 'KS statistic': ks, 'KS p-value': p})
+                record.update({f'Return Value {_rp:g}': rv for _rp, rv in zip(rp, return_values)})
+            records.append(record)
+
+        comparison = pd.DataFrame(records, index=distribution_names).sort_values('AIC', na_position='last')
+        comparison.index.name = 'Distribution'
+        return comparison
+
+    @coastlib.helper.profiler.profiled()
+    def select_fit(self, distribution_name):
+        """
+        Promotes a candidate fit generated by the self.fit_many() method to the active MLE fit without refitting.
+
+        Parameters
+        ----------
+        distribution_name : str
+            Name of a successfully fitted candidate distribution in <self.fit_candidates>.
+        """
+
+        if self.fit_candidates is None:
+            raise RuntimeError('No candidate fits found. Run self.fit_many() method first')
+        if distribution_name not in self.fit_candidates:
+            raise ValueError(f'Distribution {distribution_name} not found in candidate fits.\n'
+                             f'Valid candidates are {list(self.fit_candidates.keys())}')
+
+        # Update internal status
+        self.__status = dict(
+            extremes=True,
+            fit=False,
+            results=False
+        )
+        self.__update()
+
+        self.scipy_fit_options = self.fit_candidates[distribution_name]['scipy_fit_options']
+        self.fit_parameters = self.fit_candidates[distribution_name]['fit_parameters']
+        self.fit_method = 'MLE'
+        self.distribution_name = distribution_name
+
+        # Update internal status
+        self.__status = dict(
+            extremes=True,
+            fit=True,
+            results=False
+        )
+        self.__update()
+
+    @coastlib.helper.profiler.profiled()
+    def fit_stratified(self, by='month', distribution_name='genpareto', scipy_fit_options=None,
+                       rp=(10, 50, 100), executor=None, max_workers=None):
+        """
+        Performs stratified (e.g. monthly or seasonal) extreme value analysis in one pass.
+        Extreme values extracted by the POT method are grouped by calendar stratum of their dates,
+        rate of extreme events for each stratum is calculated using effective duration of the stratum
+        (observed time within the stratum with gaps larger than <self.gap_length> excluded, expressed as number of
+        blocks of <self.block_size> the stratum spans), and distributions are fitted to each stratum concurrently.
+        Return values are interpreted per stratum, e.g. a 100-year January event is exceeded on average
+        once in 100 Januaries. Doesn't modify the active fit.
+
+        Parameters
+        ----------
+        by : str or dict, optional
+            Stratification: 'month' (default), 'season' (DJF, MAM, JJA, SON), or a dictionary
+            mapping month numbers (1 through 12) to stratum labels.
+        distribution_name : str, optional
+            Scipy distribution name (see https://docs.scipy.org/doc/scipy/reference/stats.html) (default='genpareto').
+        scipy_fit_options : dict, optional
+            Special scipy fit options like <fc>, <loc>, or <floc>.
+            For GPD scipy_fit_options=dict(floc=0) by default (fixed location parameter at 0).
+        rp : array_like, optional
+            Return periods for which return values are reported for each stratum (default=(10, 50, 100)).
+        executor : concurrent.futures.Executor, optional
+            Executor used to run the fits (default=None). By default a ProcessPoolExecutor is created.
+        max_workers : int, optional
+            Number of workers for the default executor (default=None, number of processors).
+
+        Returns
+        -------
+        pd.DataFrame
+            Table indexed by stratum with number of extreme values, effective number of blocks,
+            rate of extreme events, fit parameters, and return values for each return period in <rp>.
+            Data for each stratum is also stored in <self.strata>.
+        """
+
+        # Make sure extreme values have been extracted
+        if not self.__status['extremes']:
+            raise RuntimeError('Extreme values have not been extracted. Run self.get_extremes() first')
+        if self.extremes_method != 'Peaks Over Threshold':
+            raise ValueError(f'Stratified analysis requires extremes extracted using the POT method, '
+                             f'{self.extremes_method} was used')
+
+        if isinstance(by, str):
+            if by not in calendar_strata:
+                raise ValueError(f'<by> must be one of {list(calendar_strata.keys())} or a dictionary, {by} was passed')
+            strata_map = calendar_strata[by]
+        else:
+            strata_map = by
+        if sorted(strata_map.keys()) != list(range(1, 13)):
+            raise ValueError('Stratification must map each month number 1 through 12 to a stratum label')
+        labels = list(dict.fromkeys(strata_map[month] for month in range(1, 13)))
+        month_codes = np.array([labels.index(strata_map[month]) for month in range(1, 13)])
+
+        if scipy_fit_options is None:
+            if distribution_name == 'genpareto':
+                scipy_fit_options = dict(floc=0)
+            else:
+                scipy_fit_options = {}
+
+        # Observed time within each stratum, gaps larger than <self.gap_length> are excluded
+        codes = month_codes[self.dataframe.index.month.values - 1]
+        time_steps = np.diff(self.dataframe.index.values.view(np.int64)).astype(np.float64)
+        if self.gap_length is not None:
+            time_steps[time_steps > pd.Timedelta(hours=self.gap_length).value] = 0
+        observed = np.bincount(codes[:-1], weights=time_steps, minlength=len(labels)) / 1e9 / 60 / 60 / 24
+
+        # Fraction of calendar occupied by each stratum over the period of record
+        calendar = pd.date_range(self.dataframe.index[0].normalize(), self.dataframe.index[-1], freq='D')
+        fractions = np.bincount(
+            month_codes[calendar.month.values - 1], minlength=len(labels)
+        ) / len(calendar)
+
+        # Effective number of blocks for each stratum
+        with np.errstate(divide='ignore', invalid='ignore'):
+            effective_blocks = observed / self.block_size / fractions
+
+        exceedances = self.extremes[self.column].values - self.threshold
+        # Flip exceedances around 0
+        if self.extremes_type == 'low':
+            exceedances *= -1
+        extremes_codes = month_codes[self.extremes.index.month.values - 1]
+        datasets = [exceedances[extremes_codes == i] for i in range(len(labels))]
+
+        # Fit all strata concurrently
+        fits = self.__map_fits(
+            distribution_names=[distribution_name] * len(labels), datasets=datasets,
+            scipy_fit_options=[scipy_fit_options] * len(labels),
+            executor=executor, max_workers=max_workers
+        )
+
+        distribution_object = getattr(scipy.stats, distribution_name)
+        rp = np.atleast_1d(rp)
+        self.strata = {}
+        records = []
+        for i, label in enumerate(labels):
+            extremes_rate = len(datasets[i]) / effective_blocks[i] if effective_blocks[i] > 0 else np.nan
+            self.strata[label] = dict(
+                extremes=self.extremes[extremes_codes == i].copy(),
+                number_of_blocks=effective_blocks[i],
+                extremes_rate=extremes_rate,
+                fit_parameters=fits[i]
+            )
+            record = {'Extremes': len(datasets[i]), 'Effective Blocks': effective_blocks[i], 'Rate': extremes_rate}
+            if fits[i] is None or len(datasets[i]) == 0:
+                record.update({f'Parameter {j + 1}': np.nan for j in range(distribution_object.numargs + 2)})
+                record.update({f'Return Value {_rp:g}': np.nan for _rp in rp})
+            else:
+                record.update({f'Parameter {j + 1}': parameter for j, parameter in enumerate(fits[i])})
+                with np.errstate(divide='ignore', invalid='ignore'):
+                    return_values = distribution_object.isf(1 / rp / extremes_rate, *fits[i])
+                if self.extremes_type == 'high':
+                    return_values = self.threshold + return_values
+                else:
+                    return_values = self.threshold - return_values
+                record.update({f'Return Value {_rp:g}': rv for _rp, rv in zip(rp, return_values)})
+            records.append(record)
+
+        summary = pd.DataFrame(records, index=labels)
+        summary.index.name = 'Stratum'
+        return summary
+
+    def __get_covariates(self, times, covariates):
+        """
+        Evaluates covariates at given <times>. Covariate 'time' is always available and is equal to
+        time elapsed since the start of <self.dataframe> in units of <self.block_size>.
+
+        Parameters
+        ----------
+        times : pd.DatetimeIndex
+            Times at which covariates are evaluated.
+        covariates : pd.DataFrame or None
+            Time-indexed covariates, linearly interpolated at <times> (held constant beyond their range).
+
+        Returns
+        -------
+        pd.DataFrame
+            Covariate values with one row per time.
+        """
+
+        times = pd.DatetimeIndex(times)
+        table = pd.DataFrame(
+            data={'time': (times - self.dataframe.index[0]).total_seconds().values / 60 / 60 / 24 / self.block_size},
+            index=times
+        )
+        if covariates is not None:
+            for name in covariates.columns:
+                table[name] = np.interp(
+                    times.values.view('int64'), covariates.index.values.view('int64'), covariates[name].values
+                )
+        return table
+
+    @coastlib.helper.profiler.profiled()
+    def fit_nonstationary(self, distribution_name, covariates=None, loc=None, scale=None, shape=None, links=None):
+        """
+        Fits a non-stationary distribution with parameters being functions of covariates:
+        parameter = link(intercept + sum(coefficient_i * covariate_i)).
+        Uses a vectorized log-likelihood with analytic gradients (see coastlib.stats.nonstationary).
+        Results are stored in <self.nonstationary_fit>, stationary fit (<self.fit>) is not affected.
+        Shape parameter follows the coastlib.stats.distributions convention (positive shape is heavy-tailed).
+
+        Parameters
+        ----------
+        distribution_name : str
+            'genextreme' for Block Maxima, 'genpareto' for Peaks Over Threshold (location is fixed at 0).
+        covariates : pd.DataFrame or pd.Series, optional
+            Time-indexed covariates (e.g. annual mean sea level), linearly interpolated at times of extreme events.
+            Covariate 'time' (time since the start of record in blocks) is always available (default=None).
+        loc, scale, shape : list of str, optional
+            Names of covariates each parameter depends on. Parameters not depending on covariates are constant.
+            By default location (genextreme) or scale (genpareto) depends on 'time'.
+        links : dict, optional
+            Link function for each parameter - 'identity' or 'log' (default is 'log' for scale, 'identity' otherwise).
+
+        Returns
+        -------
+        pd.DataFrame
+            Table with coefficient estimates and standard errors.
+        """
+
+        # Make sure extreme values have been extracted
+        if not self.__status['extremes']:
+            raise RuntimeError('Extreme values have not been extracted. Nothing to fit')
+        if self.extremes_method == 'r-Largest Order Statistics':
+            raise ValueError('Non-stationary fit is not available for the r-largest order statistics')
+
+        if distribution_name == 'genextreme':
+            parameters = dict(
+                shape=list(shape or []), loc=['time'] if loc is None else list(loc), scale=list(scale or [])
+            )
+        elif distribution_name == 'genpareto':
+            if loc:
+                raise ValueError('Location of genpareto is fixed at 0 and cannot depend on covariates')
+            parameters = dict(shape=list(shape or []), scale=['time'] if scale is None else list(scale))
+        else:
+            raise ValueError(f'Non-stationary fit is not implemented for {distribution_name} distribution')
+        link_names = dict(shape='identity', loc='identity', scale='log')
+        link_names.update(links or {})
+        for name, link_name in link_names.items():
+            if link_name not in coastlib.stats.nonstationary.links:
+                raise ValueError(f'Link {link_name} for {name} not recognized')
+
+        if isinstance(covariates, pd.Series):
+            covariates = covariates.to_frame()
+        table = self.__get_covariates(self.extremes.index, covariates)
+        for name in sum(parameters.values(), []):
+            if name not in table.columns:
+                raise ValueError(f'Covariate {name} not found')
+
+        exceedances = self.extremes[self.column].values - self.threshold
+        # Flip exceedances around 0
+        if self.extremes_type == 'low':
+            exceedances *= -1
+
+        # Start from stationary fit with all slopes at 0
+        if distribution_name == 'genextreme':
+            c, stationary_loc, stationary_scale = scipy.stats.genextreme.fit(exceedances)
+            stationary = dict(shape=-c, loc=stationary_loc, scale=stationary_scale)
+        else:
+            c, _, stationary_scale = scipy.stats.genpareto.fit(exceedances, floc=0)
+            stationary = dict(shape=c, scale=stationary_scale)
+        designs, x0, index = [], [], []
+        for name, names in parameters.items():
+            designs.append(np.column_stack([np.ones(len(table))] + [table[_name].values for _name in names]))
+            if link_names[name] == 'log':
+                x0.append(np.log(stationary[name]))
+            else:
+                x0.append(stationary[name])
+            x0.extend([0] * len(names))
+            index.extend([(name, _name) for _name in ['intercept'] + names])
+
+        coefficients, covariance, log_likelihood = coastlib.stats.nonstationary.fit(
+            x=exceedances, distribution_name=distribution_name, designs=designs,
+            link_names=[link_names[name] for name in parameters], x0=np.array(x0, dtype=np.float64)
+        )
+
+        index = pd.MultiIndex.from_tuples(index, names=['Parameter', 'Covariate'])
+        self.nonstationary_fit = dict(
+            distribution_name=distribution_name,
+            parameters=parameters,
+            links={name: link_names[name] for name in parameters},
+            covariates=covariates,
+            coefficients=pd.Series(coefficients, index=index),
+            covariance=pd.DataFrame(covariance, index=index, columns=index),
+            log_likelihood=log_likelihood
+        )
+
+        return pd.DataFrame(
+            data={'Estimate': coefficients, 'Standard Error': np.sqrt(np.diag(covariance))}, index=index
         )
-        self.__update()
 
-        if fit_method == 'MLE':
+    def nonstationary_return_value(self, rp, reference, covariate_values=None):
+        """
+        Estimates return values of the non-stationary fit (<self.fit_nonstationary>)
+        with parameters evaluated at the <reference> time.
 
-            if distribution_name == 'genpareto':
-                self.scipy_fit_options = kwargs.pop('scipy_fit_options', dict(floc=0))
-            else:
-                self.scipy_fit_options = kwargs.pop('scipy_fit_options', {})
-            assert len(kwargs) == 0, f'unrecognized arguments passed in: {", ".join(kwargs.keys())}'
+        Parameters
+        ----------
+        rp : float or array_like
+            Return periods (1/rp represents probability of exceedance over self.block_size).
+        reference : int or datetime-like
+            Reference time. Integer is interpreted as a year and evaluated at its middle (July 2nd).
+        covariate_values : dict, optional
+            Covariate values overriding those interpolated at <reference> (e.g. projected mean sea level).
 
-            # Create local distribution object
-            distribution_object = getattr(scipy.stats, distribution_name)
+        Returns
+        -------
+        float or np.ndarray
+            Return values for given return periods.
+        """
 
-            exceedances = self.extremes[self.column].values - self.threshold
-            # Flip exceedances around 0
-            if self.extremes_type == 'low':
-                exceedances *= -1
+        if self.nonstationary_fit is None:
+            raise RuntimeError('Non-stationary fit has not been performed. Run self.fit_nonstationary() first')
 
-            self.fit_parameters = distribution_object.fit(exceedances, **self.scipy_fit_options)
+        if isinstance(reference, (int, np.integer)):
+            reference = pd.Timestamp(year=reference, month=7, day=2)
+        table = self.__get_covariates([pd.Timestamp(reference)], self.nonstationary_fit['covariates'])
+        for name, value in (covariate_values or {}).items():
+            table[name] = value
 
-        elif fit_method == 'MCMC':
+        coefficients = self.nonstationary_fit['coefficients']
+        values = {}
+        for name, names in self.nonstationary_fit['parameters'].items():
+            eta = coefficients[(name, 'intercept')] + sum(
+                coefficients[(name, _name)] * table[_name].values[0] for _name in names
+            )
+            values[name] = coastlib.stats.nonstationary.links[self.nonstationary_fit['links'][name]](eta)[0]
 
-            self.mcmc_chain = self.__run_mcmc(distribution_name, **kwargs)
+        q = 1 / np.array(rp, dtype=np.float64) / self.extremes_rate
+        if self.nonstationary_fit['distribution_name'] == 'genextreme':
+            return_values = scipy.stats.genextreme.isf(q, -values['shape'], values['loc'], values['scale'])
+        else:
+            return_values = scipy.stats.genpareto.isf(q, values['shape'], 0, values['scale'])
 
+        if self.extremes_type == 'high':
+            return self.threshold + return_values
         else:
-            raise ValueError(f'Fit method {fit_method} not recognized')
+            return self.threshold - return_values
 
-        # On successful fit assign the fit_ variables
-        self.fit_method = fit_method
-        self.distribution_name = distribution_name
+    @staticmethod
+    def __map_fits(distribution_names, datasets, scipy_fit_options, executor=None, max_workers=None):
+        """
+        Fits scipy distributions to datasets concurrently.
 
-        # Update internal status
-        self.__status = dict(
-            extremes=True,
-            fit=True,
-            results=False
-        )
-        self.__update()
+        Parameters
+        ----------
+        distribution_names : list
+            Scipy distribution name for each fit.
+        datasets : list
+            Data for each fit.
+        scipy_fit_options : list
+            Special scipy fit options for each fit.
+        executor : concurrent.futures.Executor, optional
+            Executor used to run the fits (default=None). By default a ProcessPoolExecutor is created.
+        max_workers : int, optional
+            Number of workers for the default executor (default=None, number of processors).
+
+        Returns
+        -------
+        list
+            Fit parameters for each fit (None for failed fits).
+        """
+
+        if executor is None:
+            with concurrent.futures.ProcessPoolExecutor(max_workers=max_workers) as local_executor:
+                return list(local_executor.map(scipy_fit, distribution_names, datasets, scipy_fit_options))
+        else:
+            return list(executor.map(scipy_fit, distribution_names, datasets, scipy_fit_options))
 
     def __run_mcmc(self, distribution_name, nsamples=1000, nwalkers=200, **kwargs):
         """
@@ -1562,6 +2610,15 @@ class EVA:
                             return np.sum(distribution_object.logpdf(exceedances, *theta))
                         else:
                             return -np.inf
+            elif distribution_name == 'genextreme' and self.extremes_method == 'r-Largest Order Statistics':
+                r_largest = self.__get_r_largest()
+
+                def log_likelihood(theta):
+                    shape, loc, scale = theta
+                    # Custom genextreme has negative shape in scipy
+                    return coastlib.stats.distributions.genextreme.r_largest_log_likelihood(
+                        r_largest, -shape, loc, scale
+                    )
             elif distribution_name == 'genextreme':
                 # https://en.wikipedia.org/wiki/Generalized_extreme_value_distribution
                 def log_likelihood(theta):
@@ -1619,25 +2676,7 @@ class EVA:
         # Fill in fixed parameter values
         sampler_chain = self._EVA__sampler.chain.copy()
         if self.fixed_parameters is not None:
-            fp = np.transpose(self.fixed_parameters)
-            ndim = sampler_chain.shape[-1] + len(self.fixed_parameters)
-            mcmc_chain = np.array(
-                [
-                    [
-                        [np.nan] * ndim for _ in range(sampler_chain.shape[1])
-                    ] for _ in range(sampler_chain.shape[0])
-                ]
-            )
-            for i in range(mcmc_chain.shape[0]):
-                for j in range(mcmc_chain.shape[1]):
-                    counter = 0
-                    for k in range(mcmc_chain.shape[2]):
-                        if k in fp[0]:
-                            mcmc_chain[i][j][k] = fp[1][fp[0] == k][0]
-                        else:
-                            mcmc_chain[i][j][k] = sampler_chain[i][j][counter]
-                            counter += 1
-            sampler_chain = np.array(mcmc_chain)
+            sampler_chain = coastlib.stats.kernels.insert_fixed_parameters(sampler_chain, self.fixed_parameters)
 
         return sampler_chain
 
@@ -1685,6 +2724,7 @@ class EVA:
 
         return np.array(parameters)
 
+    @coastlib.helper.profiler.profiled()
     def plot_trace(self, burn_in, true_theta=None, labels=None):
         """
         Plots traces for each parameter. Each trace plot shows all samples for each walker
@@ -1746,6 +2786,7 @@ class EVA:
             fig.tight_layout()
         return fig, axes
 
+    @coastlib.helper.profiler.profiled()
     def plot_corner(self, burn_in, bins=100, labels=None, figsize=(12, 12), **kwargs):
         """
         Generate corner plot showing the projections of a data set in a multi-dimensional space.
@@ -1785,6 +2826,7 @@ class EVA:
 
         return fig, ax
 
+    @coastlib.helper.profiler.profiled()
     def plot_posterior(self, rp, burn_in, alpha=.95, plot=True, kernel_steps=1000, bins=100):
         """
         Returns posterior distribution of return value for a specific return period.
@@ -1876,6 +2918,7 @@ class EVA:
         else:
             return return_values
 
+    @coastlib.helper.profiler.profiled()
     def return_value(self, rp, **kwargs):
         """
         Calculates return values for given return periods.
@@ -1910,6 +2953,7 @@ class EVA:
 
         return self.isf(1 / rp / self.extremes_rate, **kwargs)
 
+    @coastlib.helper.profiler.profiled()
     def confidence_interval(self, rp, alpha=.95, **kwargs):
         """
         Estimates confidence intervals for given return periods.
@@ -1924,6 +2968,9 @@ class EVA:
             if fit is MCMC
                 burn_in : int
                     Number of samples to discard. Samples, before the series converges, should be discarded.
+                memory_budget : int, optional
+                    Largest size in bytes of return values calculated for all samples at once
+                    (default=module-level <memory_budget>). Return periods are processed in chunks within it.
             if fit is MLE
                 method : str, optional
                     Confidence interval estimation method (default='Monte Carlo').
@@ -1947,14 +2994,17 @@ class EVA:
                     assume_normality : bool, optional
                         If True, assumes return values are normally distributed.
                         If False, estimates quantiles directly (default=False).
+                    memory_budget : int, optional
+                        Largest size in bytes of return values calculated for all simulations at once
+                        (default=module-level <memory_budget>). Return periods are processed in chunks within it.
                 if method is Delta
                     dx : str, optional
-                        String representing a float, which represents spacing at which partial derivatives
-                        are estimated (default='1e-10' for GPD and GEV, '1e-6' for others).
+                        String representing a float, which represents absolute value of shape parameter below
+                        which the shape=0 limit is used and spacing at which partial derivatives are estimated
+                        if <precision> is not None (default='1e-10').
                     precision : int, optional
-                        Precision of floating point calculations (see mpmath library documentation) (default=100).
-                        Derivative estimated with low <precision> value may have
-                        a significant error due to rounding and under-/overflow.
+                        Precision of floating point calculations (see mpmath library documentation)
+                        (default=None, partial derivatives are estimated in float64 using Richardson extrapolation).
 
         Returns
         -------
@@ -1985,43 +3035,16 @@ class EVA:
         elif self.fit_method == 'MCMC':
             burn_in = kwargs.pop('burn_in')
             alpha = kwargs.pop('alpha', .95)
+            memory_budget = kwargs.pop('memory_budget', None)
             assert len(kwargs) == 0, f'unrecognized arguments passed in: {", ".join(kwargs.keys())}'
 
-            distribution_object = getattr(scipy.stats, self.distribution_name)
-
-            # Calculate return values for each fit parameters sample
+            # Calculate return values for each fit parameters sample and their quantiles for each return period
             ndim = self.mcmc_chain.shape[-1]
             samples = self.mcmc_chain[:, burn_in:, :].reshape((-1, ndim))
-            if self.extremes_type == 'high':
-                return_values = np.array(
-                    [
-                        self.threshold + distribution_object.isf(
-                            1 / rp / self.extremes_rate, *theta
-                        ) for theta in samples
-                    ]
-                )
-            else:
-                return_values = np.array(
-                    [
-                        self.threshold - distribution_object.isf(
-                            1 / rp / self.extremes_rate, *theta
-                        ) for theta in samples
-                    ]
-                )
-
-            # Calculate quantiles for lower and upper confidence bounds for each return period
-            if np.isscalar(rp):
-                return (
-                    np.nanquantile(a=return_values.flatten(), q=(1 - alpha) / 2),
-                    np.nanquantile(a=return_values.flatten(), q=(1 + alpha) / 2)
-                )
-            else:
-                return np.array(
-                    [
-                        [np.nanquantile(a=row, q=(1 - alpha) / 2) for row in return_values.T],
-                        [np.nanquantile(a=row, q=(1 + alpha) / 2) for row in return_values.T]
-                    ]
-                )
+            return self.__sample_confidence_interval(
+                rp=rp, parameters=samples, rates=np.full(len(samples), self.extremes_rate),
+                alpha=alpha, memory_budget=memory_budget
+            )
 
         else:
             raise RuntimeError(f'Unknown fit_method {self.fit_method} encountered')
@@ -2051,6 +3074,9 @@ class EVA:
             assume_normality : bool, optional
                 If True, assumes return values are normally distributed.
                 If False, estimates quantiles directly (default=False).
+            memory_budget : int, optional
+                Largest size in bytes of return values calculated for all simulations at once
+                (default=module-level <memory_budget>).
 
         Returns
         -------
@@ -2062,10 +3088,18 @@ class EVA:
         sampling_method = kwargs.pop('sampling_method', 'constant')
         source = kwargs.pop('source', 'data')
         assume_normality = kwargs.pop('assume_normality', False)
+        memory_budget = kwargs.pop('memory_budget', None)
         # TODO - implement a discard rule (discard bad samples)
         # discard_rule = kwargs.pop('discard_rule', None)
         assert len(kwargs) == 0, f'unrecognized arguments passed in: {", ".join(kwargs.keys())}'
 
+        if self.extremes_method == 'r-Largest Order Statistics':
+            raise NotImplementedError(
+                'Monte Carlo method is not implemented for the r-largest order statistics, use the delta method'
+            )
+        # Rate of clusters is a fraction of rate of exceedances if exceedances were not declustered
+        extremal_index = 1 if self.extremal_index is None else self.extremal_index
+
         distribution_object = getattr(scipy.stats, self.distribution_name)
         exceedances = self.extremes[self.column].values - self.threshold
         if self.extremes_type == 'low':
@@ -2076,61 +3110,31 @@ class EVA:
 
             if sampling_method == 'constant':
                 sample_size = len(self.extremes)
-                return_values = []
-                while len(return_values) < k:
+                parameters, rates = [], []
+                while len(parameters) < k:
                     sample = np.random.choice(a=exceedances, size=sample_size, replace=True)
                     sample_fit_parameters = distribution_object.fit(sample, **self.scipy_fit_options)
-                    if self.extremes_type == 'high':
-                        return_values.append(
-                            self.threshold + distribution_object.isf(
-                                1 / rp / self.extremes_rate, *sample_fit_parameters
-                            )
-                        )
-                    else:
-                        return_values.append(
-                            self.threshold - distribution_object.isf(
-                                1 / rp / self.extremes_rate, *sample_fit_parameters
-                            )
-                        )
+                    parameters.append(sample_fit_parameters)
+                    rates.append(self.extremes_rate)
 
             elif sampling_method == 'poisson':
-                return_values = []
-                while len(return_values) < k:
-                    sample_size = scipy.stats.poisson.rvs(mu=len(self.extremes), loc=0, size=1)
-                    sample_rate = sample_size / self.number_of_blocks
+                parameters, rates = [], []
+                while len(parameters) < k:
+                    sample_size = scipy.stats.poisson.rvs(mu=len(self.extremes), loc=0, size=1)[0]
+                    sample_rate = extremal_index * sample_size / self.number_of_blocks
                     sample = np.random.choice(a=exceedances, size=sample_size, replace=True)
                     sample_fit_parameters = distribution_object.fit(sample, **self.scipy_fit_options)
-                    if self.extremes_type == 'high':
-                        return_values.append(
-                            self.threshold + distribution_object.isf(
-                                1 / rp / sample_rate, *sample_fit_parameters
-                            )
-                        )
-                    else:
-                        return_values.append(
-                            self.threshold - distribution_object.isf(
-                                1 / rp / sample_rate, *sample_fit_parameters
-                            )
-                        )
+                    parameters.append(sample_fit_parameters)
+                    rates.append(sample_rate)
 
             elif sampling_method == 'jacknife':
-                sample_rate = (len(self.extremes) - 1) / self.number_of_blocks
-                return_values = []
+                sample_rate = extremal_index * (len(self.extremes) - 1) / self.number_of_blocks
+                parameters, rates = [], []
                 for i in range(len(self.extremes)):
                     sample = np.delete(arr=exceedances, obj=i)
                     sample_fit_parameters = distribution_object.fit(sample, **self.scipy_fit_options)
-                    if self.extremes_type == 'high':
-                        return_values.append(
-                            self.threshold + distribution_object.isf(
-                                1 / rp / sample_rate, *sample_fit_parameters
-                            )
-                        )
-                    else:
-                        return_values.append(
-                            self.threshold - distribution_object.isf(
-                                1 / rp / sample_rate, *sample_fit_parameters
-                            )
-                        )
+                    parameters.append(sample_fit_parameters)
+                    rates.append(sample_rate)
 
             else:
                 raise ValueError(f'for <source=data> the sampling method must be <constant>, <poisson>, or <jacknife>,'
@@ -2141,42 +3145,22 @@ class EVA:
 
             if sampling_method == 'constant':
                 sample_size = len(self.extremes)
-                return_values = []
-                while len(return_values) < k:
+                parameters, rates = [], []
+                while len(parameters) < k:
                     sample = distribution_object.rvs(*self.fit_parameters, size=sample_size)
                     sample_fit_parameters = distribution_object.fit(sample, **self.scipy_fit_options)
-                    if self.extremes_type == 'high':
-                        return_values.append(
-                            self.threshold + distribution_object.isf(
-                                1 / rp / self.extremes_rate, *sample_fit_parameters
-                            )
-                        )
-                    else:
-                        return_values.append(
-                            self.threshold - distribution_object.isf(
-                                1 / rp / self.extremes_rate, *sample_fit_parameters
-                            )
-                        )
+                    parameters.append(sample_fit_parameters)
+                    rates.append(self.extremes_rate)
 
             elif sampling_method == 'poisson':
-                return_values = []
-                while len(return_values) < k:
-                    sample_size = scipy.stats.poisson.rvs(mu=len(self.extremes), loc=0, size=1)
-                    sample_rate = sample_size / self.number_of_blocks
+                parameters, rates = [], []
+                while len(parameters) < k:
+                    sample_size = scipy.stats.poisson.rvs(mu=len(self.extremes), loc=0, size=1)[0]
+                    sample_rate = extremal_index * sample_size / self.number_of_blocks
                     sample = distribution_object.rvs(*self.fit_parameters, size=sample_size)
                     sample_fit_parameters = distribution_object.fit(sample, **self.scipy_fit_options)
-                    if self.extremes_type == 'high':
-                        return_values.append(
-                            self.threshold + distribution_object.isf(
-                                1 / rp / sample_rate, *sample_fit_parameters
-                            )
-                        )
-                    else:
-                        return_values.append(
-                            self.threshold - distribution_object.isf(
-                                1 / rp / sample_rate, *sample_fit_parameters
-                            )
-                        )
+                    parameters.append(sample_fit_parameters)
+                    rates.append(sample_rate)
 
             else:
                 raise ValueError(f'for <source=parametric> the sampling method must be <constant> or <poisson>,'
@@ -2185,35 +3169,70 @@ class EVA:
         else:
             raise ValueError(f'source must be either <data> or <parametric>, <{source}> was passed')
 
-        # Estimate confidence bounds for sampled return values
-        return_values = np.array(return_values)
-        if np.isscalar(rp):
-            if assume_normality:
-                return scipy.stats.norm.interval(
-                    alpha=alpha, loc=np.nanmean(return_values), scale=np.nanstd(return_values, ddof=1)
-                )
+        # Estimate confidence bounds for return values of sampled parameters
+        return self.__sample_confidence_interval(
+            rp=rp, parameters=np.array(parameters), rates=np.array(rates, dtype=np.float64),
+            alpha=alpha, assume_normality=assume_normality, memory_budget=memory_budget
+        )
+
+    def __sample_confidence_interval(self, rp, parameters, rates, alpha=.95, assume_normality=False,
+                                     memory_budget=None):
+        """
+        Estimates confidence intervals of return values from samples of distribution parameters.
+        Return periods are processed in chunks so that the array of sampled return values
+        for a chunk doesn't exceed <memory_budget>.
+
+        Parameters
+        ----------
+        rp : float or array_like
+            Return periods (1/rp represents probability of exceedance over self.block_size).
+        parameters : np.ndarray
+            Array of shape (number of samples, number of distribution parameters).
+        rates : np.ndarray
+            Extremes rate for each sample.
+        alpha : float, optional
+            Confidence interval bounds (default=.95).
+        assume_normality : bool, optional
+            If True, assumes return values are normally distributed.
+            If False, estimates quantiles directly (default=False).
+        memory_budget : int, optional
+            Largest size in bytes of sampled return values for a chunk of return periods
+            (default=None, module-level <memory_budget>). Scipy allocates a few temporary arrays of this size.
+
+        Returns
+        -------
+        tuple or np.ndarray
+            Tuple with confidence bounds (lower, upper) if <rp> is scalar,
+            array of shape (2, len(rp)) otherwise.
+        """
+
+        if memory_budget is None:
+            memory_budget = globals()['memory_budget']
+        distribution_object = getattr(scipy.stats, self.distribution_name)
+        return_periods = np.atleast_1d(np.asarray(rp, dtype=np.float64))
+        bounds = np.full((2, len(return_periods)), np.nan)
+
+        chunk_size = max(1, int(memory_budget // (8 * max(len(parameters), 1))))
+        for start in range(0, len(return_periods), chunk_size):
+            chunk = slice(start, start + chunk_size)
+            exceedances = distribution_object.isf(
+                1 / return_periods[np.newaxis, chunk] / rates[:, np.newaxis],
+                *[parameter[:, np.newaxis] for parameter in parameters.T]
+            )
+            if self.extremes_type == 'high':
+                return_values = self.threshold + exceedances
             else:
-                return (
-                    np.nanquantile(a=return_values.flatten(), q=(1 - alpha) / 2),
-                    np.nanquantile(a=return_values.flatten(), q=(1 + alpha) / 2)
-                )
-        else:
+                return_values = self.threshold - exceedances
             if assume_normality:
-                locations = np.array([np.nanmean(row) for row in return_values.T])
-                scales = np.array([np.nanstd(row, ddof=1) for row in return_values.T])
-                return np.transpose(
-                    [
-                        scipy.stats.norm.interval(alpha=alpha, loc=loc, scale=scale)
-                        for loc, scale in zip(locations, scales)
-                    ]
+                bounds[:, chunk] = scipy.stats.norm.interval(
+                    alpha, loc=np.nanmean(return_values, axis=0), scale=np.nanstd(return_values, axis=0, ddof=1)
                 )
             else:
-                return np.array(
-                    [
-                        [np.nanquantile(a=row, q=(1 - alpha) / 2) for row in return_values.T],
-                        [np.nanquantile(a=row, q=(1 + alpha) / 2) for row in return_values.T]
-                    ]
-                )
+                bounds[:, chunk] = np.nanquantile(return_values, q=[(1 - alpha) / 2, (1 + alpha) / 2], axis=0)
+
+        if np.isscalar(rp):
+            return bounds[0, 0], bounds[1, 0]
+        return bounds
 
     def __delta(self, rp, alpha=.95, **kwargs):
         """
@@ -2227,12 +3246,14 @@ class EVA:
             Confidence interval bounds (default=.95).
         kwargs
             dx : str, optional
-                String representing a float, which represents spacing at which partial derivatives
-                are estimated (default='1e-10').
+                String representing a float, which represents absolute value of shape parameter below which
+                the shape=0 limit is used and spacing at which partial derivatives are estimated
+                if <precision> is not None (default='1e-10').
             precision : int, optional
-                Precision of floating point calculations (see mpmath library documentation) (default=100).
-                Derivative estimated with low <precision> value may have
-                a significant error due to rounding and under-/overflow.
+                Precision of floating point calculations (see mpmath library documentation) (default=None).
+                By default, partial derivatives of return values are estimated in float64
+                using Richardson extrapolation (see coastlib.math.derivatives.richardson).
+                If not None, central differences with spacing <dx> are evaluated using mpmath with <precision>.
 
         Returns
         -------
@@ -2241,7 +3262,9 @@ class EVA:
         """
 
         dx = kwargs.pop('dx', '1e-10')
-        precision = kwargs.pop('precision', 100)
+        precision = kwargs.pop('precision', None)
+        # Return values are evaluated using mpmath only if their derivatives are estimated using mpmath
+        backend = 'numpy' if precision is None else 'mpmath'
         assert len(kwargs) == 0, f'unrecognized arguments passed in: {", ".join(kwargs.keys())}'
 
         # Make sure fit method was executed and fit data was generated
@@ -2276,103 +3299,34 @@ class EVA:
                     f'{self.scipy_fit_options} does not satisfy this criteria'
                 )
 
-            with mpmath.workdps(precision):
-                # Define modified log_likehood function (only shape and scale, location is fixed)
-                def log_likelihood(*theta):
-                    return mpmath.fsum(
-                        [
-                            mpmath.log(
-                                coastlib.stats.distributions.genpareto.pdf(
-                                    x=x, shape=theta[0], loc=fit_parameters[1], scale=theta[1]
-                                )
-                            ) for x in exceedances
-                        ]
-                    )
-
-                # Calculate covariance matrix of shape and scale
-                observed_information = -coastlib.math.derivatives.hessian(
-                    func=log_likelihood, n=2, dx=dx, precision=precision,
-                    coordinates=(fit_parameters[0], fit_parameters[2])
-                ).astype(np.float64)
-                covariance = np.linalg.inv(observed_information)
-
-                # Modify covariance matrix to include uncertainty in threshold exceedance probability
-                modified_covariance = np.zeros((3, 3))
-                modified_covariance[1:, 1:] = covariance
-                # Probability of exceeding threshold for all observations
-                eta_0 = len(self.extremes) / len(self.dataframe)
-                # Number of observations per year
-                ny = len(self.dataframe) / self.number_of_blocks
-                modified_covariance[0][0] = eta_0 * (1 - eta_0) / len(self.dataframe)
-
-            if np.isscalar(rp):
-                # Define scalar function as a function which takes arbitrary fit parameters and returns return values
-                def scalar_function(eta, *theta):
-                    q = 1 / (rp * ny * eta)
-                    if q <= 0 or q >= 1:
-                        return np.nan
-                    if self.extremes_type == 'high':
-                        return self.threshold + distribution_object.isf(
-                            q=q, shape=theta[0], loc=fit_parameters[1], scale=theta[1]
-                        )
-                    else:
-                        return self.threshold - distribution_object.isf(
-                            q=q, shape=theta[0], loc=fit_parameters[1], scale=theta[1]
-                        )
-
-                delta_scalar = coastlib.math.derivatives.gradient(
-                    func=scalar_function, n=3, dx=dx, precision=precision,
-                    coordinates=(eta_0, fit_parameters[0], fit_parameters[2])
-                )
-
-                loc = np.float64(
-                    scalar_function(eta_0, fit_parameters[0], fit_parameters[2])
+            # Probability of exceeding threshold for all observations
+            eta_0 = len(self.extremes) / len(self.dataframe)
+            # Number of observations per year (of independent observations if exceedances were not declustered)
+            ny = len(self.dataframe) / self.number_of_blocks
+            if self.extremal_index is not None:
+                ny *= self.extremal_index
+
+            # Modify information matrix of shape and scale (location is fixed)
+            # to include uncertainty in threshold exceedance probability
+            information_matrix = np.zeros((3, 3))
+            information_matrix[1:, 1:] = distribution_object.observed_information(
+                exceedances, *fit_parameters, dx=dx
+            )[np.ix_([0, 2], [0, 2])]
+            information_matrix[0][0] = len(self.dataframe) / (eta_0 * (1 - eta_0))
+            theta_0 = np.array([eta_0, fit_parameters[0], fit_parameters[2]])
+
+            # Define scalar function as a function which takes return periods and arbitrary fit parameters
+            # and returns return values
+            def scalar_function(_rp, eta, *theta):
+                q = 1 / (_rp * ny * eta)
+                q = np.where((q > 0) & (q < 1), q, np.nan)
+                return_values = distribution_object.isf(
+                    q=q, shape=theta[0], loc=fit_parameters[1], scale=theta[1], backend=backend
                 )
-                variance = np.dot(
-                    np.dot(delta_scalar.T, modified_covariance), delta_scalar
-                ).flatten().astype(np.float64)[0]
-
-                return scipy.stats.norm.interval(alpha=alpha, loc=loc, scale=np.sqrt(variance))
-
-            else:
-                locs, variances = [], []
-                for _rp in rp:
-                    # Define scalar function as a function which takes arbitrary fit parameters
-                    # and returns return values
-                    def scalar_function(eta, *theta):
-                        q = 1 / (_rp * ny * eta)
-                        if q <= 0 or q >= 1:
-                            return np.nan
-                        if self.extremes_type == 'high':
-                            return self.threshold + distribution_object.isf(
-                                q=q, shape=theta[0], loc=fit_parameters[1], scale=theta[1]
-                            )
-                        else:
-                            return self.threshold - distribution_object.isf(
-                                q=q, shape=theta[0], loc=fit_parameters[1], scale=theta[1]
-                            )
-
-                    delta_scalar = coastlib.math.derivatives.gradient(
-                        func=scalar_function, n=3, dx=dx, precision=precision,
-                        coordinates=(eta_0, fit_parameters[0], fit_parameters[2]),
-                    )
-
-                    locs.append(
-                        np.float64(
-                            scalar_function(eta_0, fit_parameters[0], fit_parameters[2])
-                        )
-                    )
-                    variances.append(
-                        np.dot(
-                            np.dot(delta_scalar.T, modified_covariance), delta_scalar
-                        ).flatten().astype(np.float64)[0]
-                    )
-                return np.array(
-                    [
-                        scipy.stats.norm.interval(alpha=alpha, loc=loc, scale=np.sqrt(variance))
-                        for loc, variance in zip(locs, variances)
-                    ]
-                ).T
+                if self.extremes_type == 'high':
+                    return self.threshold + return_values
+                else:
+                    return self.threshold - return_values
 
         # Generalized Extreme Distribtuion
         elif self.distribution_name == 'genextreme':
@@ -2384,69 +3338,46 @@ class EVA:
                 )
 
             # Calculate observed information matrix (negative hessian of log_likelihood)
-            observed_information = distribution_object.observed_information(
-                exceedances, *fit_parameters, dx=dx, precision=precision
-            ).astype(np.float64)
-
-            if np.isscalar(rp):
-                # Define scalar function as a function which takes arbitrary fit parameters and returns return values
-                def scalar_function(*theta):
-                    q = 1 / rp / self.extremes_rate
-                    if q <= 0 or q >= 1:
-                        return np.nan
-                    if self.extremes_type == 'high':
-                        return self.threshold + distribution_object.isf(q, *theta)
-                    else:
-                        return self.threshold - distribution_object.isf(q, *theta)
-
-                # Calculate delta (gradient) of scalar_function
-                delta_scalar = coastlib.math.derivatives.gradient(
-                    func=scalar_function, n=len(fit_parameters),
-                    coordinates=fit_parameters, dx=dx, precision=precision
-                ).astype(np.float64)
-
-                # Calculate location and scale (gaussian mean and sigma)
-                loc = np.float64(scalar_function(*fit_parameters))
-                variance = np.dot(
-                    np.dot(delta_scalar.T, np.linalg.inv(observed_information)), delta_scalar
-                ).flatten()[0]
+            if self.extremes_method == 'r-Largest Order Statistics':
+                r_largest = self.__get_r_largest()
 
-                return scipy.stats.norm.interval(alpha=alpha, loc=loc, scale=np.sqrt(variance))
+                def log_likelihood(*theta):
+                    return distribution_object.r_largest_log_likelihood(r_largest, *theta)
 
+                # Likelihood is evaluated in float64 - spacing is set accordingly
+                information_matrix = -coastlib.math.derivatives.hessian(
+                    func=log_likelihood, n=3, coordinates=fit_parameters, dx='1e-5', precision=None
+                ).astype(np.float64)
             else:
-                locs, variances = [], []
-                for _rp in rp:
-                    # Define scalar function as a function which takes arbitrary fit parameters
-                    # and returns return values
-                    def scalar_function(*theta):
-                        q = 1 / _rp / self.extremes_rate
-                        if q <= 0 or q >= 1:
-                            return np.nan
-                        if self.extremes_type == 'high':
-                            return self.threshold + distribution_object.isf(q, *theta)
-                        else:
-                            return self.threshold - distribution_object.isf(q, *theta)
+                information_matrix = distribution_object.observed_information(
+                    exceedances, *fit_parameters, dx=dx, precision=precision
+                ).astype(np.float64)
+            theta_0 = fit_parameters
 
-                    # Calculate delta (gradient) of scalar_function
-                    delta_scalar = coastlib.math.derivatives.gradient(
-                        func=scalar_function, n=len(fit_parameters),
-                        coordinates=fit_parameters, dx=dx, precision=precision
-                    ).astype(np.float64)
-
-                    # Calculate location and scale (gaussian mean and sigma)
-                    locs.append(np.float64(scalar_function(*fit_parameters)))
-                    variances.append(
-                        np.dot(
-                            np.dot(delta_scalar.T, np.linalg.inv(observed_information)), delta_scalar
-                        ).flatten()[0]
-                    )
-                return np.array(
-                    [
-                        scipy.stats.norm.interval(alpha=alpha, loc=loc, scale=np.sqrt(variance))
-                        for loc, variance in zip(locs, variances)
-                    ]
-                ).T
+            # Define scalar function as a function which takes return periods and arbitrary fit parameters
+            # and returns return values
+            def scalar_function(_rp, *theta):
+                q = 1 / _rp / self.extremes_rate
+                q = np.where((q > 0) & (q < 1), q, np.nan)
+                if self.extremes_type == 'high':
+                    return self.threshold + distribution_object.isf(q, *theta, backend=backend)
+                else:
+                    return self.threshold - distribution_object.isf(q, *theta, backend=backend)
+
+        # Return values for all return periods are differentiated at once
+        if precision is None:
+            # Initial spacing is relative to parameter values (e.g. small threshold exceedance probability)
+            return coastlib.math.derivatives.delta_confidence(
+                x=rp, scalar_function=scalar_function, likelihood_function=None, theta=theta_0, alpha=alpha,
+                dx=1e-2 * np.where(theta_0 == 0, 1, np.minimum(np.abs(theta_0), 1)),
+                information_matrix=information_matrix, method='richardson', vectorized=True
+            )
+        return coastlib.math.derivatives.delta_confidence(
+            x=rp, scalar_function=scalar_function, likelihood_function=None, theta=theta_0, alpha=alpha,
+            dx=dx, precision=precision, information_matrix=information_matrix, vectorized=True
+        )
 
+    @coastlib.helper.profiler.profiled()
     def generate_results(self, rp=None, alpha=.95, **kwargs):
         """
         Generates a self.results dataframe with return values and, optionally, confidence intervals.
@@ -2461,6 +3392,11 @@ class EVA:
         alpha : float, optional
             Confidence interval bounds (default=.95). Doesn't estimate confidence intervals if None.
         kwargs
+            memory_budget : int, optional
+                Largest size in bytes of return values calculated for all MCMC samples or Monte Carlo simulations
+                at once (default=None, module-level <memory_budget>). Return periods are processed in chunks within it,
+                which makes dense grids of return periods feasible. Passed to <rv_kwargs> (MCMC only)
+                and <ci_kwargs> (except for the Delta method) unless they set it themselves.
             if fit is MCMC:
                 rv_kwargs : dict
                     burn_in : int
@@ -2508,12 +3444,12 @@ class EVA:
                             If False, estimates quantiles directly (default=False).
                     if method is Delta
                         dx : str, optional
-                            String representing a float, which represents spacing at which partial derivatives
-                            are estimated (default='1e-10' for GPD and GEV, '1e-6' for others).
+                            String representing a float, which represents absolute value of shape parameter below
+                            which the shape=0 limit is used and spacing at which partial derivatives are estimated
+                            if <precision> is not None (default='1e-10').
                         precision : int, optional
-                            Precision of floating point calculations (see mpmath library documentation) (default=100).
-                            Derivative estimated with low <precision> value may have
-                            a significant error due to rounding and under-/overflow.
+                            Precision of floating point calculations (see mpmath library documentation)
+                            (default=None, partial derivatives are estimated in float64 using Richardson extrapolation).
 
         Returns
         -------
@@ -2552,23 +3488,26 @@ class EVA:
         else:
             rv_kwargs = kwargs.pop('rv_kwargs')
             ci_kwargs = kwargs.pop('ci_kwargs')
+        memory_budget = kwargs.pop('memory_budget', None)
         assert len(kwargs) == 0, f'unrecognized arguments passed in: {", ".join(kwargs.keys())}'
 
-        return_values = self.return_value(rp, **rv_kwargs)
+        if memory_budget is not None:
+            if self.fit_method == 'MCMC':
+                rv_kwargs = dict(rv_kwargs, memory_budget=rv_kwargs.get('memory_budget', memory_budget))
+            if ci_kwargs.get('method', 'Monte Carlo') != 'Delta':
+                ci_kwargs = dict(ci_kwargs, memory_budget=ci_kwargs.get('memory_budget', memory_budget))
 
-        self.results = pd.DataFrame(
-            data=return_values, index=rp, columns=['Return Value']
-        )
+        # Preallocate results and fill them column by column
+        columns = ['Return Value']
+        if alpha is not None:
+            columns.extend([f'{alpha*100:.0f}% CI Lower', f'{alpha*100:.0f}% CI Upper'])
+        self.results = pd.DataFrame(data=np.full((len(rp), len(columns)), np.nan), index=rp, columns=columns)
         self.results.index.name = 'Return Period'
 
+        self.results.iloc[:, 0] = self.return_value(rp, **rv_kwargs)
+
         if alpha is not None:
-            ci_lower, ci_upper = self.confidence_interval(rp=rp, alpha=alpha, **ci_kwargs)
-            if np.isscalar(ci_lower):
-                ci_lower, ci_upper = np.array([ci_lower]), np.array([ci_upper])
-            else:
-                ci_lower, ci_upper = np.array(ci_lower), np.array(ci_upper)
-            self.results[f'{alpha*100:.0f}% CI Lower'] = ci_lower
-            self.results[f'{alpha*100:.0f}% CI Upper'] = ci_upper
+            self.results.iloc[:, 1:] = np.transpose(self.confidence_interval(rp=rp, alpha=alpha, **ci_kwargs))
 
         # Remove bad values from the results
         if self.extremes_type == 'high':
@@ -2585,6 +3524,150 @@ class EVA:
         )
         self.__update()
 
+    @coastlib.helper.profiler.profiled()
+    def generate_catalogue(self, years, chunk_size=1000, path=None, uncertainty=None, random_state=None, **kwargs):
+        """
+        Generates a synthetic catalogue of extreme events from the fitted distribution.
+        Number of events in each year (block of <self.block_size>) is Poisson-distributed with mean
+        <self.extremes_rate> for the peaks over threshold method and is exactly one (block maximum)
+        for the block maxima method. Event magnitudes are sampled from the fitted distribution
+        by inverse transform sampling.
+        All event counts and magnitudes within a chunk of years are sampled at once.
+
+        Parameters
+        ----------
+        years : int
+            Number of years (blocks of <self.block_size>) to simulate.
+        chunk_size : int, optional
+            Number of years simulated at once (default=1000).
+        path : str, optional
+            Path to a Parquet file (e.g. catalogue.parquet). If given, chunks are streamed
+            to this file as they are generated (requires pyarrow). By default (None) returns the catalogue.
+        uncertainty : str, optional
+            Propagates parameter uncertainty by drawing a parameter set for each simulated year from:
+                'mcmc' - samples of posterior distribution of parameters (MCMC fit only)
+                'bootstrap' - fits to extreme values resampled with replacement
+                    (with <self.scipy_fit_options> or parameters fixed by the MCMC fit)
+            By default (None) uses fit parameters (parameter mode for MCMC).
+        random_state : int or np.random.Generator, optional
+            Seed or random number generator (default=None).
+        kwargs
+            if fit is MCMC
+                burn_in : int
+                    Number of samples to discard. Samples, before the series converges, should be discarded.
+                kernel_steps : int, optional
+                    Number of bins (kernel support points) to determine parameter mode (default=1000).
+                    Only if <uncertainty> is None.
+            if uncertainty is bootstrap
+                k : int, optional
+                    Number of bootstrap parameter sets (default=100).
+
+        Returns
+        -------
+        pd.DataFrame or str
+            Catalogue with year number (starting at 0), index of parameter set used for the year,
+            and event magnitude <self.column> in columns. Returns <path> instead if <path> is given.
+        """
+
+        # Make sure fit method was executed and fit data was generated
+        if not self.__status['fit']:
+            raise ValueError('No fit information found. Run self.fit() method first')
+
+        if self.extremes_method == 'r-Largest Order Statistics':
+            raise NotImplementedError('Catalogue generation is not implemented for the r-largest order statistics')
+
+        if self.fit_method == 'MCMC':
+            burn_in = kwargs.pop('burn_in')
+            kernel_steps = kwargs.pop('kernel_steps', 1000)
+        else:
+            burn_in, kernel_steps = None, None
+        k = kwargs.pop('k', 100)
+        assert len(kwargs) == 0, f'unrecognized arguments passed in: {", ".join(kwargs.keys())}'
+
+        random_state = np.random.default_rng(random_state)
+        distribution_object = getattr(scipy.stats, self.distribution_name)
+
+        # Get parameter sets of shape (number of sets, number of parameters)
+        if uncertainty is None:
+            if self.fit_method == 'MLE':
+                parameter_sets = np.array([self.fit_parameters])
+            else:
+                parameter_sets = np.array([self._kernel_fit_parameters(burn_in=burn_in, kernel_steps=kernel_steps)])
+        elif uncertainty == 'mcmc':
+            if self.fit_method != 'MCMC':
+                raise ValueError('MCMC uncertainty requires the MCMC fit method')
+            parameter_sets = self.mcmc_chain[:, burn_in:, :].reshape((-1, self.mcmc_chain.shape[-1]))
+        elif uncertainty == 'bootstrap':
+            exceedances = self.extremes[self.column].values - self.threshold
+            if self.extremes_type == 'low':
+                exceedances *= -1
+            if self.fit_method == 'MLE':
+                scipy_fit_options = self.scipy_fit_options
+            else:
+                # Hold parameters fixed by the MCMC fit (e.g. GPD location) fixed in bootstrap fits
+                names = [f'f{i}' for i in range(distribution_object.numargs)] + ['floc', 'fscale']
+                scipy_fit_options = {names[index]: value for index, value in (self.fixed_parameters or [])}
+            parameter_sets = np.array(
+                [
+                    distribution_object.fit(
+                        random_state.choice(exceedances, size=len(exceedances), replace=True),
+                        **scipy_fit_options
+                    ) for _ in range(int(k))
+                ]
+            )
+        else:
+            raise ValueError(f'Uncertainty {uncertainty} not recognized')
+
+        if path is not None:
+            try:
+                import pyarrow
+                import pyarrow.parquet
+            except ImportError:
+                raise ImportError('pyarrow is required to write catalogues to Parquet files')
+        writer = None
+        chunks = []
+        try:
+            for start in range(0, int(years), int(chunk_size)):
+                n_years = min(int(chunk_size), int(years) - start)
+
+                # Sample number of events and parameter set for each year (one annual maximum for block maxima)
+                if self.extremes_method == 'Block Maxima':
+                    counts = np.ones(n_years, dtype=int)
+                else:
+                    counts = random_state.poisson(lam=self.extremes_rate, size=n_years)
+                year_sets = random_state.integers(len(parameter_sets), size=n_years)
+                event_years = np.repeat(np.arange(start, start + n_years), counts)
+                event_sets = np.repeat(year_sets, counts)
+
+                # Sample magnitudes of all events by inverse transform sampling
+                probabilities = random_state.random(len(event_years))
+                if len(parameter_sets) == 1:
+                    exceedances = distribution_object.ppf(probabilities, *parameter_sets[0])
+                else:
+                    exceedances = distribution_object.ppf(probabilities, *parameter_sets[event_sets].T)
+                if self.extremes_type == 'high':
+                    values = self.threshold + exceedances
+                else:
+                    values = self.threshold - exceedances
+
+                chunk = pd.DataFrame(
+                    data={'Year': event_years, 'Parameter Set': event_sets, self.column: values}
+                )
+                if path is None:
+                    chunks.append(chunk)
+                else:
+                    table = pyarrow.Table.from_pandas(chunk, preserve_index=False)
+                    if writer is None:
+                        writer = pyarrow.parquet.ParquetWriter(path, table.schema)
+                    writer.write_table(table)
+        finally:
+            if writer is not None:
+                writer.close()
+
+        if path is not None:
+            return path
+        return pd.concat(chunks, ignore_index=True)
+
     def pdf(self, x, **kwargs):
         """
         Estimates probability density at value <x> using the fitted distribution.
@@ -2756,6 +3839,9 @@ class EVA:
                 quantile : float, optional
                     Quantile for 'value quantile' method (default=.5, aka median).
                     Must be in the range (0, 1].
+                memory_budget : int, optional
+                    Largest size in bytes of property values calculated for all samples at once
+                    (default=module-level <memory_budget>). Only for 'value mode' and 'value quantile' methods.
 
         Returns
         -------
@@ -2788,6 +3874,7 @@ class EVA:
                 quantile = kwargs.pop('quantile', .5)
             else:
                 quantile = None
+            memory_budget = kwargs.pop('memory_budget', globals()['memory_budget'])
             assert len(kwargs) == 0, f'unrecognized arguments passed in: {", ".join(kwargs.keys())}'
 
             # Estimate mode of each parameter as peaks of gaussian kernel.
@@ -2796,64 +3883,51 @@ class EVA:
                 parameters = self._kernel_fit_parameters(burn_in=burn_in, kernel_steps=kernel_steps)
                 return property_function(x, *parameters)
 
+            if estimate_method == 'value quantile':
+                if np.isscalar(quantile):
+                    if quantile <= 0 or quantile > 1:
+                        raise ValueError(f'Quantile must be in range (0,1], quantile={quantile} was passed')
+                else:
+                    raise ValueError(f'Quantile must be scalar, {type(quantile)} was passed')
+
             # Load samples
             ndim = self.mcmc_chain.shape[-1]
             samples = self.mcmc_chain[:, burn_in:, :].reshape((-1, ndim))
 
-            property_samples = np.array([property_function(x, *_theta) for _theta in samples])
+            # Calculate property for all samples in self.mcmc_chain in chunks of <x> within <memory_budget>
+            x_values = np.atleast_1d(x)
+            estimates = np.full(len(x_values), np.nan)
+            chunk_size = max(1, int(memory_budget // (8 * len(samples))))
+            for start in range(0, len(x_values), chunk_size):
+                chunk = slice(start, start + chunk_size)
+                property_samples = property_function(
+                    x_values[np.newaxis, chunk], *[parameter[:, np.newaxis] for parameter in samples.T]
+                )
 
-            # Estimate property function as mode of distribution of property value
-            # for all samples in self.mcmc_chain as peaks of gaussian kernel.
-            if estimate_method == 'value mode':
-                if np.isscalar(x):
-                    if np.all(np.isnan(property_samples)):
-                        return np.nan
-                    else:
-                        ps_filtered = property_samples[~np.isnan(property_samples)]
-                        if np.all(ps_filtered == ps_filtered[0]):
-                            return np.nan
-                        else:
+                # Estimate property function as mode of distribution of property value
+                # for all samples in self.mcmc_chain as peaks of gaussian kernel.
+                if estimate_method == 'value mode':
+                    for i, ps in enumerate(property_samples.T, start=start):
+                        ps_filtered = ps[~np.isnan(ps)]
+                        if len(ps_filtered) > 0 and not np.all(ps_filtered == ps_filtered[0]):
                             kernel = scipy.stats.gaussian_kde(ps_filtered)
                             support = np.linspace(ps_filtered.min(), ps_filtered.max(), kernel_steps)
                             density = kernel.evaluate(support)
-                            return support[density.argmax()]
-                else:
-                    estimates = []
-                    for ps in property_samples.T:
-                        if np.all(np.isnan(ps)):
-                            estimates.append(np.nan)
-                        else:
-                            ps_filtered = ps[~np.isnan(ps)]
-                            if np.all(ps_filtered == ps_filtered[0]):
-                                estimates.append(np.nan)
-                            else:
-                                kernel = scipy.stats.gaussian_kde(ps_filtered)
-                                support = np.linspace(ps_filtered.min(), ps_filtered.max(), kernel_steps)
-                                density = kernel.evaluate(support)
-                                estimates.append(support[density.argmax()])
-                    return np.array(estimates)
-
-            # Estimate property function as quantile of distribution of property value
-            # for all samples in self.mcmc_chain.
-            elif estimate_method == 'value quantile':
-                if np.isscalar(quantile):
-                    if quantile <= 0 or quantile > 1:
-                        raise ValueError(f'Quantile must be in range (0,1], quantile={quantile} was passed')
-                else:
-                    raise ValueError(f'Quantile must be scalar, {type(quantile)} was passed')
+                            estimates[i] = support[density.argmax()]
 
-                if np.isscalar(x):
-                    return np.nanquantile(a=property_samples, q=quantile)
+                # Estimate property function as quantile of distribution of property value
+                # for all samples in self.mcmc_chain.
                 else:
-                    return np.array(
-                        [
-                            np.nanquantile(a=row, q=quantile) for row in property_samples.T
-                        ]
-                    )
+                    estimates[chunk] = np.nanquantile(a=property_samples, q=quantile, axis=0)
+
+            if np.isscalar(x):
+                return estimates[0]
+            return estimates
 
         else:
             raise RuntimeError(f'Unknown fit_method {self.fit_method} encountered')
 
+    @coastlib.helper.profiler.profiled()
     def plot_summary(self, support=None, bins=10, plotting_position='Weibull', **kwargs):
         """
         Plots projected return values, pdf, and cdf values against observed.
@@ -2963,8 +4037,7 @@ class EVA:
             point.set_visible(False)
             annot.set_visible(False)
 
-            def update_annot(ind):
-                n = ind['ind'][0]
+            def update_annot(n):
                 pos = points.get_offsets()[n]
                 annot.xy = pos
                 point.set_offsets(pos)
@@ -2975,22 +4048,7 @@ class EVA:
                 )
                 annot.set_text(text)
 
-            def hover(event):
-                vis = annot.get_visible()
-                if event.inaxes == ax1:
-                    cont, ind = points.contains(event)
-                    if cont:
-                        update_annot(ind)
-                        annot.set_visible(True)
-                        point.set_visible(True)
-                        fig.canvas.draw_idle()
-                    else:
-                        if vis:
-                            annot.set_visible(False)
-                            point.set_visible(False)
-                            fig.canvas.draw_idle()
-
-            fig.canvas.mpl_connect('motion_notify_event', hover)
+            coastlib.plotting.hover.connect_hover(ax1, points, update_annot, [annot, point])
 
             # Plot PDF
             ax2.set_ylabel('Probability density')
@@ -3054,6 +4112,7 @@ class EVA:
 
             return fig, ax1, ax2, ax3
 
+    @coastlib.helper.profiler.profiled()
     def plot_qq(self, k, plot=True, plotting_position='Weibull', quantiles=True, **kwargs):
         """
         Plots theoretical quantiles (probabilites) agains observed quantiles (probabilites).
@@ -3161,8 +4220,7 @@ class EVA:
                     point.set_visible(False)
                     annot.set_visible(False)
 
-                    def update_annot(ind):
-                        n = ind['ind'][0]
+                    def update_annot(n):
                         pos = points.get_offsets()[n]
                         annot.xy = pos
                         point.set_offsets(pos)
@@ -3173,22 +4231,7 @@ class EVA:
                         )
                         annot.set_text(text)
 
-                    def hover(event):
-                        vis = annot.get_visible()
-                        if event.inaxes == ax:
-                            cont, ind = points.contains(event)
-                            if cont:
-                                update_annot(ind)
-                                annot.set_visible(True)
-                                point.set_visible(True)
-                                fig.canvas.draw_idle()
-                            else:
-                                if vis:
-                                    annot.set_visible(False)
-                                    point.set_visible(False)
-                                    fig.canvas.draw_idle()
-
-                    fig.canvas.mpl_connect('motion_notify_event', hover)
+                    coastlib.plotting.hover.connect_hover(ax, points, update_annot, [annot, point])
 
                     fig.tight_layout()
 
@@ -3228,8 +4271,7 @@ class EVA:
                     point.set_visible(False)
                     annot.set_visible(False)
 
-                    def update_annot(ind):
-                        n = ind['ind'][0]
+                    def update_annot(n):
                         pos = points.get_offsets()[n]
                         annot.xy = pos
                         point.set_offsets(pos)
@@ -3240,22 +4282,7 @@ class EVA:
                         )
                         annot.set_text(text)
 
-                    def hover(event):
-                        vis = annot.get_visible()
-                        if event.inaxes == ax:
-                            cont, ind = points.contains(event)
-                            if cont:
-                                update_annot(ind)
-                                annot.set_visible(True)
-                                point.set_visible(True)
-                                fig.canvas.draw_idle()
-                            else:
-                                if vis:
-                                    annot.set_visible(False)
-                                    point.set_visible(False)
-                                    fig.canvas.draw_idle()
-
-                    fig.canvas.mpl_connect('motion_notify_event', hover)
+                    coastlib.plotting.hover.connect_hover(ax, points, update_annot, [annot, point])
 
                     fig.tight_layout()
 
@@ -3273,6 +4300,7 @@ class EVA:
                     (r, p)
                 )
 
+    @coastlib.helper.profiler.profiled()
     def goodness_of_fit(self, method, **kwargs):
         """
         Calculates various goodness-of-fit statistics for selected model.
@@ -3296,6 +4324,8 @@ class EVA:
                     Calculates theoretical counts for given quantile ranges and compares to theoretical.
                     If p<0.05 => reject Null hypothesis with p-level of confidence.
                     see https://docs.scipy.org/doc/scipy/reference/generated/scipy.stats.chisquare.html
+            For the r-largest order statistics, log-likelihood and AIC use the r-largest likelihood,
+            while KS and chi-square tests use only block maxima (first order statistics of each block).
         kwargs
             if fit is MCMC
                 burn_in : int
@@ -3346,9 +4376,22 @@ class EVA:
         if self.extremes_type == 'low':
             exceedances *= -1
 
-        log_likelihood = np.sum(
-            distribution_object.logpdf(exceedances, *fit_parameters)
-        )
+        if self.extremes_method == 'r-Largest Order Statistics':
+            r_largest = self.__get_r_largest()
+            log_likelihood = coastlib.stats.distributions.genextreme.r_largest_log_likelihood(
+                r_largest, -fit_parameters[0], fit_parameters[1], fit_parameters[2]
+            )
+            # Fitted distribution is the distribution of block maxima (first order statistics)
+            exceedances = np.nanmax(r_largest, axis=1)
+            if self.extremes_type == 'high':
+                values = self.threshold + exceedances
+            else:
+                values = self.threshold - exceedances
+        else:
+            log_likelihood = np.sum(
+                distribution_object.logpdf(exceedances, *fit_parameters)
+            )
+            values = self.extremes[self.column].values
 
         if method == 'log-likelihood':
             assert len(kwargs) == 0, f'unrecognized arguments passed in: {", ".join(kwargs.keys())}'
@@ -3373,10 +4416,6 @@ class EVA:
             alternative = kwargs.pop('alternative', 'two-sided')
             assert len(kwargs) == 0, f'unrecognized arguments passed in: {", ".join(kwargs.keys())}'
 
-            exceedances = self.extremes[self.column].values - self.threshold
-            if self.extremes_type == 'low':
-                exceedances *= -1
-
             ks, p = scipy.stats.kstest(
                 rvs=exceedances, cdf=distribution_object.cdf, args=fit_parameters,
                 alternative=alternative, mode=mode
@@ -3390,34 +4429,17 @@ class EVA:
             chi_quantile_ranges = [1 / chi_quantiles * (i + 1) for i in np.arange(-1, chi_quantiles)]
             observed_counts, expected_counts = [], []
             for i in range(chi_quantiles):
-                bot = np.nanquantile(
-                    self.extremes[self.column].values,
-                    chi_quantile_ranges[i]
-                )
-                top = np.nanquantile(
-                    self.extremes[self.column].values,
-                    chi_quantile_ranges[i + 1]
-                )
+                bot = np.nanquantile(values, chi_quantile_ranges[i])
+                top = np.nanquantile(values, chi_quantile_ranges[i + 1])
                 if i + 1 == chi_quantiles:
-                    observed_counts.append(
-                        len(
-                            self.extremes[
-                                (self.extremes[self.column] >= bot)
-                                & (self.extremes[self.column] <= top)
-                            ]
-                        )
-                    )
+                    observed_counts.append(np.sum((values >= bot) & (values <= top)))
                 else:
-                    observed_counts.append(
-                        len(
-                            self.extremes[
-                                (self.extremes[self.column] >= bot)
-                                & (self.extremes[self.column] < top)
-                            ]
-                        )
-                    )
+                    observed_counts.append(np.sum((values >= bot) & (values < top)))
+                # Outer bins are open-ended for expected counts to add up to the number of observations
                 expected_counts.append(
-                    len(self.extremes) * (self.cdf(top) - self.cdf(bot))
+                    len(values) * np.abs(
+                        self.cdf(np.inf if i + 1 == chi_quantiles else top) - self.cdf(-np.inf if i == 0 else bot)
+                    )
                 )
             if min(observed_counts) <= 5 or min(expected_counts) <= 5:
                 raise ValueError(f'Too few observations in observed counts {min(observed_counts)} '
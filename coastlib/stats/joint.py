@@ -0,0 +1,519 @@
+# coastlib, a coastal engineering Python library
+# Copyright (C), 2019 Georgii Bocharov
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+import numpy as np
+import pandas as pd
+import scipy.optimize
+import scipy.special
+import scipy.stats
+
+
+# Gauss-Legendre nodes and weights on [-1, 1] used to integrate the bivariate normal cdf
+_legendre_nodes, _legendre_weights = np.polynomial.legendre.leggauss(50)
+
+
+class Gaussian:
+    """
+    Gaussian (normal) copula with correlation parameter theta in (-1, 1).
+    """
+
+    bounds = (-.99, .99)
+
+    @staticmethod
+    def cdf(u, v, theta):
+        # Bivariate normal cdf - Phi(h)Phi(k) + 1/(2pi) * integral from 0 to arcsin(theta) (Drezner & Wesolowsky)
+        h = np.clip(scipy.special.ndtri(u), -38, 38)[..., np.newaxis]
+        k = np.clip(scipy.special.ndtri(v), -38, 38)[..., np.newaxis]
+        upper = np.arcsin(theta)
+        angles = upper / 2 * (_legendre_nodes + 1)
+        integrand = np.exp(-(h ** 2 + k ** 2 - 2 * h * k * np.sin(angles)) / (2 * np.cos(angles) ** 2))
+        integral = upper / 2 * np.sum(_legendre_weights * integrand, axis=-1)
+        return scipy.special.ndtr(h[..., 0]) * scipy.special.ndtr(k[..., 0]) + integral / (2 * np.pi)
+
+    @staticmethod
+    def log_density(u, v, theta):
+        x, y = scipy.special.ndtri(u), scipy.special.ndtri(v)
+        return (
+            -np.log(1 - theta ** 2) / 2 -
+            (theta ** 2 * (x ** 2 + y ** 2) - 2 * theta * x * y) / (2 * (1 - theta ** 2))
+        )
+
+    @staticmethod
+    def sample(size, theta, random_state):
+        x, e = random_state.standard_normal(size), random_state.standard_normal(size)
+        y = theta * x + np.sqrt(1 - theta ** 2) * e
+        return scipy.special.ndtr(x), scipy.special.ndtr(y)
+
+
+class Clayton:
+    """
+    Clayton copula with parameter theta > 0 (lower tail dependence).
+    """
+
+    bounds = (1e-6, 50)
+
+    @staticmethod
+    def cdf(u, v, theta):
+        return (u ** -theta + v ** -theta - 1) ** (-1 / theta)
+
+    @staticmethod
+    def log_density(u, v, theta):
+        return (
+            np.log(1 + theta) - (1 + theta) * (np.log(u) + np.log(v)) -
+            (2 + 1 / theta) * np.log(u ** -theta + v ** -theta - 1)
+        )
+
+    @staticmethod
+    def sample(size, theta, random_state):
+        # Conditional inverse method
+        u, w = random_state.random(size), random_state.random(size)
+        v = (u ** -theta * (w ** (-theta / (1 + theta)) - 1) + 1) ** (-1 / theta)
+        return u, v
+
+
+class Gumbel:
+    """
+    Gumbel (Gumbel-Hougaard) copula with parameter theta >= 1 (upper tail dependence).
+    """
+
+    bounds = (1, 50)
+
+    @staticmethod
+    def cdf(u, v, theta):
+        return np.exp(-((-np.log(u)) ** theta + (-np.log(v)) ** theta) ** (1 / theta))
+
+    @staticmethod
+    def log_density(u, v, theta):
+        x, y = -np.log(u), -np.log(v)
+        a = (x ** theta + y ** theta) ** (1 / theta)
+        return (
+            -a + x + y + (theta - 1) * (np.log(x) + np.log(y)) +
+            (1 - 2 * theta) * np.log(a) + np.log(a + theta - 1)
+        )
+
+    @staticmethod
+    def sample(size, theta, random_state):
+        # Marshall-Olkin method with a positive stable variable (Kanter's representation)
+        alpha = 1 / theta
+        angle, w = random_state.uniform(0, np.pi, size), random_state.exponential(size=size)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            stable = (
+                np.sin(alpha * angle) / np.sin(angle) ** (1 / alpha) *
+                (np.sin((1 - alpha) * angle) / w) ** ((1 - alpha) / alpha)
+            )
+        stable = np.where(alpha == 1, 1, stable)
+        e1, e2 = random_state.exponential(size=size), random_state.exponential(size=size)
+        return np.exp(-(e1 / stable) ** alpha), np.exp(-(e2 / stable) ** alpha)
+
+
+class Frank:
+    """
+    Frank copula with parameter theta != 0 (no tail dependence).
+    """
+
+    bounds = (-50, 50)
+
+    @staticmethod
+    def cdf(u, v, theta):
+        if abs(theta) < 1e-8:
+            return u * v
+        return -np.log1p(np.expm1(-theta * u) * np.expm1(-theta * v) / np.expm1(-theta)) / theta
+
+    @staticmethod
+    def log_density(u, v, theta):
+        if abs(theta) < 1e-8:
+            return np.zeros(np.broadcast(u, v).shape)
+        a = np.expm1(-theta)
+        return (
+            np.log(-theta * a) - theta * (u + v) -
+            2 * np.log(np.abs(a + np.expm1(-theta * u) * np.expm1(-theta * v)))
+        )
+
+    @staticmethod
+    def sample(size, theta, random_state):
+        # Conditional inverse method
+        u, w = random_state.random(size), random_state.random(size)
+        if abs(theta) < 1e-8:
+            return u, w
+        v = -np.log1p(w * np.expm1(-theta) / (w + (1 - w) * np.exp(-theta * u))) / theta
+        return u, v
+
+
+copulas = {
+    'gaussian': Gaussian,
+    'clayton': Clayton,
+    'gumbel': Gumbel,
+    'frank': Frank
+}
+
+
+def match_events(times_1, times_2, window):
+    """
+    Pairs events in two sorted time series - each event in <times_1> is paired with the nearest event
+    in <times_2> within +/- <window>. Each event is paired at most once (closest pairs are kept).
+
+    Parameters
+    ----------
+    times_1, times_2 : np.ndarray
+        Sorted arrays of event times as integers (e.g. pd.DatetimeIndex.values.view('int64')).
+    window : int
+        Largest time difference between paired events in units of <times_1> and <times_2>.
+
+    Returns
+    -------
+    tuple(np.ndarray, np.ndarray)
+        Integer indexes of paired events within <times_1> and <times_2>, sorted by <times_1>.
+    """
+
+    times_1, times_2 = np.asarray(times_1, dtype=np.int64), np.asarray(times_2, dtype=np.int64)
+    if len(times_1) == 0 or len(times_2) == 0:
+        return np.array([], dtype=np.int64), np.array([], dtype=np.int64)
+
+    # Nearest event is either the first event at or after each time, or the one before it
+    after = np.searchsorted(times_2, times_1).clip(max=len(times_2) - 1)
+    before = (after - 1).clip(min=0)
+    lag_after, lag_before = np.abs(times_2[after] - times_1), np.abs(times_2[before] - times_1)
+    nearest = np.where(lag_before <= lag_after, before, after)
+    lags = np.minimum(lag_before, lag_after)
+
+    indexes_1 = np.flatnonzero(lags <= window)
+    indexes_2, lags = nearest[indexes_1], lags[indexes_1]
+
+    # Keep the closest pair for each event in <times_2>
+    order = np.lexsort((lags, indexes_2))
+    first = np.ones(len(order), dtype=bool)
+    first[1:] = np.diff(indexes_2[order]) != 0
+    keep = np.sort(order[first])
+    return indexes_1[keep], indexes_2[keep]
+
+
+def fit_copula(u, v, copula_name):
+    """
+    Estimates copula parameter by maximizing log-likelihood of pseudo-observations <u> and <v>.
+
+    Parameters
+    ----------
+    u, v : np.ndarray
+        Pseudo-observations (marginal probabilities) in the range (0, 1).
+    copula_name : str
+        Copula name - 'gaussian', 'clayton', 'gumbel', or 'frank'.
+
+    Returns
+    -------
+    tuple(float, float)
+        Copula parameter and log-likelihood.
+    """
+
+    if copula_name not in copulas:
+        raise ValueError(f'Copula {copula_name} not recognized')
+    copula = copulas[copula_name]
+
+    def objective(theta):
+        with np.errstate(all='ignore'):
+            value = np.sum(copula.log_density(u, v, theta))
+        return -value if np.isfinite(value) else np.inf
+
+    solution = scipy.optimize.minimize_scalar(
+        objective, bounds=copula.bounds, method='bounded', options=dict(xatol=1e-8)
+    )
+    return solution.x, -solution.fun
+
+
+class JointEVA:
+    """
+    Joint extreme value analysis of two variables (e.g. storm surge and wave height).
+    Pairs concurrent extreme events extracted by two EVA instances, models their dependence using a copula
+    fitted to pseudo-observations, and uses distributions fitted by each EVA instance as marginals.
+    Joint probabilities refer to events being more extreme than given values
+    (larger for extremes_type='high', smaller for extremes_type='low').
+
+    Public Attributes
+    -----------------
+    self.__init__()
+        self.eva_1 : coastlib.stats.extreme.EVA
+        self.eva_2 : coastlib.stats.extreme.EVA
+        self.window : float
+        self.pairs : pd.DataFrame
+        self.pairs_rate : float
+        self.marginal_kwargs : tuple
+
+    self.fit()
+        self.copula_name : str
+        self.copula_parameter : float
+        self.copula_fits : pd.DataFrame
+
+    Public Methods
+    --------------
+    self.fit
+    self.cdf
+    self.exceedance_probability
+    self.return_period
+    self.get_contours
+    self.sample
+
+    Private Methods
+    ---------------
+    self.__marginal_probability
+    """
+
+    def __init__(self, eva_1, eva_2, window=24, **kwargs):
+        """
+        Pairs extreme events of <eva_1> and <eva_2> which occur within <window> hours of each other.
+
+        Parameters
+        ----------
+        eva_1, eva_2 : coastlib.stats.extreme.EVA
+            EVA instances with extracted and fitted extreme values.
+        window : float, optional
+            Largest time difference in hours between concurrent events (default=24).
+        kwargs
+            marginal_kwargs : tuple of dict, optional
+                Keyword arguments passed to cdf and ppf methods of <eva_1> and <eva_2>
+                (e.g. burn_in for MCMC fits) (default=({}, {})).
+        """
+
+        self.marginal_kwargs = kwargs.pop('marginal_kwargs', ({}, {}))
+        assert len(kwargs) == 0, f'unrecognized arguments passed in: {", ".join(kwargs.keys())}'
+
+        for eva in [eva_1, eva_2]:
+            if eva.fit_method is None:
+                raise ValueError('No fit information found. Run fit() method of both EVA instances first')
+            if eva.extremes_method == 'r-Largest Order Statistics':
+                raise ValueError('Joint analysis is not implemented for the r-largest order statistics')
+        self.eva_1, self.eva_2 = eva_1, eva_2
+        self.window = window
+
+        indexes_1, indexes_2 = match_events(
+            times_1=eva_1.extremes.index.values.view('int64'),
+            times_2=eva_2.extremes.index.values.view('int64'),
+            window=pd.Timedelta(hours=window).value
+        )
+        columns = [eva_1.column, eva_2.column]
+        if columns[0] == columns[1]:
+            columns = [f'{columns[0]} 1', f'{columns[1]} 2']
+        self.pairs = pd.DataFrame(
+            data={
+                columns[0]: eva_1.extremes[eva_1.column].values[indexes_1],
+                columns[1]: eva_2.extremes[eva_2.column].values[indexes_2],
+                'Lag': eva_2.extremes.index[indexes_2] - eva_1.extremes.index[indexes_1]
+            },
+            index=eva_1.extremes.index[indexes_1]
+        )
+        # Number of joint events per block of <eva_1.block_size>
+        self.pairs_rate = len(self.pairs) / eva_1.number_of_blocks
+
+        self.copula_name = None
+        self.copula_parameter = None
+        self.copula_fits = None
+
+    def __repr__(self):
+        return str(
+            f'{" "*31}Joint Extreme Value Analysis\n'
+            f'{"="*90}\n'
+            f'Number of pairs{len(self.pairs):>30}      Window{self.window:>30}\n'
+            f'Pairs rate{self.pairs_rate:>35.3f}      Copula{str(self.copula_name):>30}\n'
+            f'{"="*90}'
+        )
+
+    def fit(self, copula_name='auto'):
+        """
+        Fits a copula to pseudo-observations (ranks) of paired events by maximizing log-likelihood.
+
+        Parameters
+        ----------
+        copula_name : str, optional
+            'gaussian', 'clayton', 'gumbel', 'frank', or 'auto' (default) - fits all copulas
+            and selects the one with the smallest Akaike Information Criterion (AIC).
+
+        Returns
+        -------
+        pd.DataFrame
+            Table with parameter, log-likelihood and AIC of each fitted copula.
+        """
+
+        if len(self.pairs) < 3:
+            raise RuntimeError(f'Too few pairs ({len(self.pairs)}) to fit a copula. Increase window')
+
+        # Pseudo-observations - ranks in the direction of extremes
+        u, v = [
+            scipy.stats.rankdata(
+                values if eva.extremes_type == 'high' else -values, method='average'
+            ) / (len(values) + 1)
+            for eva, values in zip([self.eva_1, self.eva_2], self.pairs.values[:, :2].astype(np.float64).T)
+        ]
+
+        names = list(copulas.keys()) if copula_name == 'auto' else [copula_name]
+        fits = np.array([fit_copula(u, v, name) for name in names])
+        self.copula_fits = pd.DataFrame(
+            data={'Parameter': fits[:, 0], 'Log-Likelihood': fits[:, 1], 'AIC': 2 - 2 * fits[:, 1]},
+            index=pd.Index(names, name='Copula')
+        )
+        self.copula_name = self.copula_fits['AIC'].idxmin()
+        self.copula_parameter = self.copula_fits.loc[self.copula_name, 'Parameter']
+        return self.copula_fits
+
+    def __marginal_probability(self, x, y):
+        # Probabilities of events being less extreme than <x> and <y>
+        if self.copula_name is None:
+            raise ValueError('No copula found. Run self.fit() method first')
+        # EVA.cdf is the probability of being less extreme for both high and low extremes
+        u = np.clip(self.eva_1.cdf(np.asarray(x, dtype=np.float64), **self.marginal_kwargs[0]), 1e-300, 1)
+        v = np.clip(self.eva_2.cdf(np.asarray(y, dtype=np.float64), **self.marginal_kwargs[1]), 1e-300, 1)
+        return u, v
+
+    def cdf(self, x, y):
+        """
+        Calculates probability of a joint event being less extreme than both <x> and <y>.
+        Arguments are broadcast against each other (e.g. x[:, np.newaxis], y[np.newaxis, :] gives a grid).
+
+        Parameters
+        ----------
+        x, y : float or array_like
+            Values of the first and second variables.
+
+        Returns
+        -------
+        float or np.ndarray
+        """
+
+        u, v = self.__marginal_probability(x, y)
+        return copulas[self.copula_name].cdf(u, v, self.copula_parameter)
+
+    def exceedance_probability(self, x, y, kind='and'):
+        """
+        Calculates probability of a joint event being more extreme than <x> and/or <y>.
+
+        Parameters
+        ----------
+        x, y : float or array_like
+            Values of the first and second variables, broadcast against each other.
+        kind : str, optional
+            'and' (default) - both variables are more extreme
+            'or' - at least one variable is more extreme
+
+        Returns
+        -------
+        float or np.ndarray
+        """
+
+        u, v = self.__marginal_probability(x, y)
+        c = copulas[self.copula_name].cdf(u, v, self.copula_parameter)
+        if kind == 'and':
+            return np.clip(1 - u - v + c, 0, 1)
+        elif kind == 'or':
+            return np.clip(1 - c, 0, 1)
+        else:
+            raise ValueError(f'Kind {kind} not recognized')
+
+    def return_period(self, x, y, kind='and'):
+        """
+        Calculates joint return period (in blocks of <self.eva_1.block_size>) of events more extreme
+        than <x> and/or <y>.
+
+        Parameters
+        ----------
+        x, y : float or array_like
+            Values of the first and second variables, broadcast against each other.
+        kind : str, optional
+            'and' (default) or 'or', see <self.exceedance_probability>.
+
+        Returns
+        -------
+        float or np.ndarray
+        """
+
+        with np.errstate(divide='ignore'):
+            return 1 / self.pairs_rate / self.exceedance_probability(x, y, kind=kind)
+
+    def get_contours(self, rp, kind='and', resolution=500):
+        """
+        Calculates joint return period contours on a dense grid of values.
+        Joint return period increases monotonically with the second variable, so each contour is
+        found by interpolating along the second variable for every value of the first variable.
+
+        Parameters
+        ----------
+        rp : float or array_like
+            Return periods of contours.
+        kind : str, optional
+            'and' (default) or 'or', see <self.exceedance_probability>.
+        resolution : int, optional
+            Number of grid points along each variable (default=500).
+
+        Returns
+        -------
+        pd.DataFrame
+            Table with values of the second variable in columns (one per return period)
+            for values of the first variable in index. Values are np.nan where contour doesn't exist.
+        """
+
+        rp = np.atleast_1d(np.asarray(rp, dtype=np.float64))
+
+        # Grids span from the least extreme paired event to marginal value with the largest return period
+        grids = []
+        for eva, values, kwargs in zip(
+                [self.eva_1, self.eva_2], self.pairs.values[:, :2].astype(np.float64).T, self.marginal_kwargs
+        ):
+            least_extreme = values.min() if eva.extremes_type == 'high' else values.max()
+            grids.append(np.linspace(least_extreme, eva.ppf(1 - 1 / self.pairs_rate / rp.max(), **kwargs), resolution))
+        x, y = grids
+
+        # Return periods on the grid, shape (len(x), len(y))
+        log_rp = np.log(self.return_period(x[:, np.newaxis], y[np.newaxis, :], kind=kind))
+        log_rp = np.maximum.accumulate(np.nan_to_num(log_rp, nan=-np.inf), axis=1)
+
+        contours = np.full((len(x), len(rp)), np.nan)
+        rows = np.arange(len(x))
+        for i, level in enumerate(np.log(rp)):
+            # Index of the first grid point along y above the contour level
+            upper = np.sum(log_rp < level, axis=1)
+            valid = (upper > 0) & (upper < len(y))
+            upper, lower = upper[valid], upper[valid] - 1
+            r0, r1 = log_rp[rows[valid], lower], log_rp[rows[valid], upper]
+            with np.errstate(invalid='ignore', divide='ignore'):
+                weight = np.where(np.isfinite(r0) & (r1 > r0), (level - r0) / (r1 - r0), 1)
+            contours[valid, i] = y[lower] + weight * (y[upper] - y[lower])
+
+        columns = pd.Index(rp, name='Return Period')
+        return pd.DataFrame(data=contours, index=pd.Index(x, name=self.pairs.columns[0]), columns=columns)
+
+    def sample(self, size, random_state=None):
+        """
+        Samples joint events from the fitted copula and marginal distributions.
+
+        Parameters
+        ----------
+        size : int
+            Number of events.
+        random_state : int or np.random.Generator, optional
+            Seed or random number generator (default=None).
+
+        Returns
+        -------
+        pd.DataFrame
+            Table with sampled values of both variables.
+        """
+
+        if self.copula_name is None:
+            raise ValueError('No copula found. Run self.fit() method first')
+        random_state = np.random.default_rng(random_state)
+        u, v = copulas[self.copula_name].sample(int(size), self.copula_parameter, random_state)
+        return pd.DataFrame(
+            data={
+                self.pairs.columns[0]: self.eva_1.ppf(u, **self.marginal_kwargs[0]),
+                self.pairs.columns[1]: self.eva_2.ppf(v, **self.marginal_kwargs[1])
+            }
+        )
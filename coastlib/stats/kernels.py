@@ -0,0 +1,276 @@
+# coastlib, a coastal engineering Python library
+# Copyright (C), 2019 Georgii Bocharov
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+"""
+Kernels for sequential operations used by the EVA class. Each kernel has two implementations:
+    'numba' - sequential loops, compiled with numba if it is installed (interpreted otherwise)
+    'numpy' - vectorized numpy equivalents
+Active backend is stored in <backend> - 'numba' if numba is installed, 'numpy' otherwise.
+Use <set_backend> to change it.
+"""
+
+import numpy as np
+
+try:
+    import numba
+except ImportError:
+    numba = None
+
+
+numba_available = numba is not None
+backend = 'numba' if numba_available else 'numpy'
+
+
+def set_backend(name):
+    """
+    Sets active backend used by kernels called without explicit <backend>.
+
+    Parameters
+    ----------
+    name : str
+        'numba' or 'numpy'.
+    """
+
+    global backend
+    if name not in ['numba', 'numpy']:
+        raise ValueError(f'Backend {name} not recognized')
+    if name == 'numba' and not numba_available:
+        raise ImportError('numba is not installed')
+    backend = name
+
+
+def jit(function):
+    """
+    Compiles <function> with numba if it is installed, returns <function> unchanged otherwise.
+    """
+
+    if numba_available:
+        return numba.njit(cache=True)(function)
+    return function
+
+
+@jit
+def _decluster_runs_loop(times, values, r, high):
+    peaks = np.empty(len(times), dtype=np.int64)
+    n = 0
+    for i in range(len(times)):
+        # New cluster encountered
+        if i == 0 or times[i] - times[i - 1] > r:
+            peaks[n] = i
+            n += 1
+        # Update cluster peak
+        elif (high and values[i] > values[peaks[n - 1]]) or (not high and values[i] < values[peaks[n - 1]]):
+            peaks[n - 1] = i
+    return peaks[:n]
+
+
+def _decluster_runs_numpy(times, values, r, high):
+    # Cluster boundaries are where distance between consecutive exceedances exceeds <r>
+    new_cluster = np.empty(len(times), dtype=bool)
+    new_cluster[0] = True
+    new_cluster[1:] = np.diff(times) > r
+    cluster_ids = np.cumsum(new_cluster)
+
+    # Sort by cluster, then by value (largest first), then by position (earliest first)
+    if high:
+        order = np.lexsort((np.arange(len(values)), -values, cluster_ids))
+    else:
+        order = np.lexsort((np.arange(len(values)), values, cluster_ids))
+    first_in_cluster = np.empty(len(order), dtype=bool)
+    first_in_cluster[0] = True
+    first_in_cluster[1:] = np.diff(cluster_ids[order]) != 0
+    return order[first_in_cluster]
+
+
+def decluster_runs(times, values, r, extremes_type='high', backend=None):
+    """
+    Declusters exceedances using the runs method (aka minimum distance between independent events).
+    Exceedances separated by more than <r> belong to different clusters, and only the cluster peak is kept.
+    Cluster peak is the first occurrence of the cluster maximum.
+
+    Parameters
+    ----------
+    times : np.ndarray
+        Sorted array of exceedance times as integers (e.g. pd.DatetimeIndex.values.view('int64')).
+    values : np.ndarray
+        Array of exceedance values.
+    r : int or float
+        Minimum distance between independent events in units of <times>.
+        Integer distances exceed a non-integer <r> if they exceed its floor, <r> is rounded down for both backends.
+    extremes_type : str, optional
+        'high' keeps cluster maxima, 'low' keeps cluster minima (default='high').
+    backend : str, optional
+        'numba' or 'numpy' (default=None, uses active backend).
+
+    Returns
+    -------
+    np.ndarray
+        Integer indexes of cluster peaks within <times> and <values>.
+    """
+
+    if len(times) == 0:
+        return np.array([], dtype=np.int64)
+    times = np.ascontiguousarray(times, dtype=np.int64)
+    values = np.ascontiguousarray(values, dtype=np.float64)
+    r = np.int64(np.floor(r))
+    if (backend or globals()['backend']) == 'numba':
+        return _decluster_runs_loop(times, values, r, extremes_type == 'high')
+    return _decluster_runs_numpy(times, values, r, extremes_type == 'high')
+
+
+@jit
+def _collapse_gaps_loop(times, gap, shift):
+    new_times = times.copy()
+    total_shift = 0
+    for i in range(1, len(times)):
+        step = times[i] - times[i - 1]
+        if step > gap:
+            total_shift += step - shift
+        new_times[i] = times[i] - total_shift
+    return new_times
+
+
+def _collapse_gaps_numpy(times, gap, shift):
+    steps = np.diff(times)
+    shifts = np.where(steps > gap, steps - shift, 0)
+    return times - np.concatenate((np.zeros(1, dtype=times.dtype), np.cumsum(shifts)))
+
+
+def collapse_gaps(times, gap, shift, backend=None):
+    """
+    Eliminates gaps in time series by shifting all values upstream of each gap larger than <gap>
+    downstream so that the gap becomes equal to <shift>.
+
+    Parameters
+    ----------
+    times : np.ndarray
+        Sorted array of times as integers (e.g. pd.DatetimeIndex.values.view('int64')).
+    gap : int
+        Gap length in units of <times>.
+    shift : int
+        Length of collapsed gaps in units of <times> (non-zero to avoid duplicate times).
+    backend : str, optional
+        'numba' or 'numpy' (default=None, uses active backend).
+
+    Returns
+    -------
+    np.ndarray
+        Array of new times.
+    """
+
+    times = np.ascontiguousarray(times, dtype=np.int64)
+    if (backend or globals()['backend']) == 'numba':
+        return _collapse_gaps_loop(times, np.int64(gap), np.int64(shift))
+    return _collapse_gaps_numpy(times, gap, shift)
+
+
+@jit
+def _segment_clusters_loop(times, gap):
+    starts = np.empty(len(times), dtype=np.int64)
+    starts[0] = 0
+    n = 1
+    for i in range(1, len(times)):
+        if times[i] - times[i - 1] > gap:
+            starts[n] = i
+            n += 1
+    return starts[:n]
+
+
+def _segment_clusters_numpy(times, gap):
+    return np.concatenate((np.zeros(1, dtype=np.int64), np.flatnonzero(np.diff(times) > gap) + 1))
+
+
+def segment_clusters(times, gap, backend=None):
+    """
+    Splits time series into clusters separated by gaps larger than <gap>.
+
+    Parameters
+    ----------
+    times : np.ndarray
+        Sorted array of times as integers (e.g. pd.DatetimeIndex.values.view('int64')).
+    gap : int
+        Gap length in units of <times>.
+    backend : str, optional
+        'numba' or 'numpy' (default=None, uses active backend).
+
+    Returns
+    -------
+    np.ndarray
+        Integer indexes of first element of each cluster.
+    """
+
+    if len(times) == 0:
+        return np.array([], dtype=np.int64)
+    times = np.ascontiguousarray(times, dtype=np.int64)
+    if (backend or globals()['backend']) == 'numba':
+        return _segment_clusters_loop(times, np.int64(gap))
+    return _segment_clusters_numpy(times, gap)
+
+
+@jit
+def _insert_fixed_parameters_loop(chain, fixed_indexes, fixed_values):
+    ndim = chain.shape[2] + len(fixed_indexes)
+    full_chain = np.empty((chain.shape[0], chain.shape[1], ndim))
+    for i in range(chain.shape[0]):
+        for j in range(chain.shape[1]):
+            counter = 0
+            fixed_counter = 0
+            for k in range(ndim):
+                if fixed_counter < len(fixed_indexes) and fixed_indexes[fixed_counter] == k:
+                    full_chain[i, j, k] = fixed_values[fixed_counter]
+                    fixed_counter += 1
+                else:
+                    full_chain[i, j, k] = chain[i, j, counter]
+                    counter += 1
+    return full_chain
+
+
+def _insert_fixed_parameters_numpy(chain, fixed_indexes, fixed_values):
+    ndim = chain.shape[2] + len(fixed_indexes)
+    full_chain = np.empty((chain.shape[0], chain.shape[1], ndim))
+    free = np.ones(ndim, dtype=bool)
+    free[fixed_indexes] = False
+    full_chain[:, :, free] = chain
+    full_chain[:, :, fixed_indexes] = fixed_values
+    return full_chain
+
+
+def insert_fixed_parameters(chain, fixed_parameters, backend=None):
+    """
+    Inserts fixed parameter values into MCMC sampler chain.
+
+    Parameters
+    ----------
+    chain : np.ndarray
+        Sampler chain of shape (nwalkers, nsamples, number of free parameters).
+    fixed_parameters : array_like
+        An array with tuples with index of parameter being fixed "i" and parameter value "v" [(i, v),...]
+        sorted in ascending order by "i".
+    backend : str, optional
+        'numba' or 'numpy' (default=None, uses active backend).
+
+    Returns
+    -------
+    np.ndarray
+        Chain of shape (nwalkers, nsamples, number of parameters).
+    """
+
+    chain = np.ascontiguousarray(chain, dtype=np.float64)
+    fixed_indexes = np.array([fp[0] for fp in fixed_parameters], dtype=np.int64)
+    fixed_values = np.array([fp[1] for fp in fixed_parameters], dtype=np.float64)
+    if (backend or globals()['backend']) == 'numba':
+        return _insert_fixed_parameters_loop(chain, fixed_indexes, fixed_values)
+    return _insert_fixed_parameters_numpy(chain, fixed_indexes, fixed_values)
@@ -0,0 +1,253 @@
+# coastlib, a coastal engineering Python library
+# Copyright (C), 2019 Georgii Bocharov
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+import numpy as np
+import scipy.optimize
+
+
+# Absolute value of shape parameter below which the shape=0 (Gumbel/Exponential) limit is used
+shape_tolerance = 1e-6
+
+# Link functions - parameter = inverse_link(linear predictor), returns parameter and its derivative
+links = {
+    'identity': lambda eta: (eta, np.ones_like(eta)),
+    'log': lambda eta: (np.exp(eta), np.exp(eta))
+}
+
+
+def genextreme_log_density(x, shape, loc, scale):
+    """
+    Calculates GEV log-density and its partial derivatives by each parameter for each observation.
+    All arguments are arrays of equal length (or scalars) - parameters may vary between observations.
+    Shape parameter has sign opposite to that of scipy (positive shape is heavy-tailed).
+
+    Parameters
+    ----------
+    x : np.ndarray
+    shape : np.ndarray
+    loc : np.ndarray
+    scale : np.ndarray
+
+    Returns
+    -------
+    tuple of np.ndarray
+        (log-density, d/d shape, d/d loc, d/d scale). Log-density is -np.inf outside of the support.
+    """
+
+    x, shape, loc, scale = np.broadcast_arrays(
+        *[np.asarray(_v, dtype=np.float64) for _v in [x, shape, loc, scale]]
+    )
+    z = (x - loc) / scale
+    gumbel = np.abs(shape) < shape_tolerance
+    safe_shape = np.where(gumbel, 1, shape)
+    t = 1 + safe_shape * z
+    valid = (scale > 0) & (gumbel | (t > 0))
+    t = np.where(valid, t, 1)
+
+    with np.errstate(over='ignore', invalid='ignore'):
+        log_t = np.log(t)
+        # t ** (-1 / shape) and its shape=0 limit exp(-z)
+        tau = np.where(gumbel, np.exp(-z), np.exp(-log_t / safe_shape))
+        log_density = np.where(gumbel, -z, -(1 + 1 / safe_shape) * log_t) - np.log(np.where(valid, scale, 1)) - tau
+
+        # Derivative of log-density by z (location and scale derivatives follow from it)
+        d_z = np.where(gumbel, tau - 1, tau / t - (1 + safe_shape) / t)
+        d_loc = -d_z / scale
+        d_scale = (-1 - z * d_z) / scale
+        d_shape = np.where(
+            gumbel,
+            (1 - tau) * z ** 2 / 2 - z,
+            (1 - tau) * (log_t / safe_shape ** 2 - z / (safe_shape * t)) - z / t
+        )
+
+    log_density = np.where(valid, log_density, -np.inf)
+    return log_density, d_shape, d_loc, d_scale
+
+
+def genpareto_log_density(x, shape, scale):
+    """
+    Calculates GPD (location=0) log-density and its partial derivatives by shape and scale for each observation.
+    All arguments are arrays of equal length (or scalars) - parameters may vary between observations.
+    Shape parameter has the same sign as in scipy.
+
+    Parameters
+    ----------
+    x : np.ndarray
+        Exceedances over threshold.
+    shape : np.ndarray
+    scale : np.ndarray
+
+    Returns
+    -------
+    tuple of np.ndarray
+        (log-density, d/d shape, d/d scale). Log-density is -np.inf outside of the support.
+    """
+
+    x, shape, scale = np.broadcast_arrays(*[np.asarray(_v, dtype=np.float64) for _v in [x, shape, scale]])
+    z = x / scale
+    exponential = np.abs(shape) < shape_tolerance
+    safe_shape = np.where(exponential, 1, shape)
+    t = 1 + safe_shape * z
+    valid = (scale > 0) & (z >= 0) & (exponential | (t > 0))
+    t = np.where(valid, t, 1)
+
+    log_t = np.log(t)
+    log_density = np.where(exponential, -z, -(1 + 1 / safe_shape) * log_t) - np.log(np.where(valid, scale, 1))
+    d_scale = np.where(exponential, z - 1, (1 + safe_shape) * z / t - 1) / scale
+    d_shape = np.where(
+        exponential,
+        z ** 2 / 2 - z,
+        log_t / safe_shape ** 2 - (1 + 1 / safe_shape) * z / t
+    )
+
+    log_density = np.where(valid, log_density, -np.inf)
+    return log_density, d_shape, d_scale
+
+
+def get_parameters(coefficients, designs, link_names):
+    """
+    Calculates distribution parameters for each observation from regression coefficients.
+
+    Parameters
+    ----------
+    coefficients : np.ndarray
+        Concatenated coefficients for each parameter (intercept first).
+    designs : list of np.ndarray
+        Design matrices of shape (number of observations, number of coefficients) for each parameter.
+    link_names : list of str
+        Link function names for each parameter ('identity' or 'log').
+
+    Returns
+    -------
+    tuple(list, list)
+        Parameter values and derivatives of parameters by their linear predictors.
+    """
+
+    parameters, derivatives = [], []
+    start = 0
+    for design, link_name in zip(designs, link_names):
+        parameter, derivative = links[link_name](design @ coefficients[start:start + design.shape[1]])
+        parameters.append(parameter)
+        derivatives.append(derivative)
+        start += design.shape[1]
+    return parameters, derivatives
+
+
+def log_likelihood(coefficients, x, distribution_name, designs, link_names):
+    """
+    Calculates log-likelihood of a non-stationary GEV or GPD model and its analytic gradient
+    by regression coefficients.
+
+    Parameters
+    ----------
+    coefficients : np.ndarray
+        Concatenated coefficients for each parameter (intercept first).
+    x : np.ndarray
+        Observations (exceedances for GPD).
+    distribution_name : str
+        'genextreme' (parameters shape, loc, scale) or 'genpareto' (parameters shape, scale).
+    designs : list of np.ndarray
+        Design matrices for each parameter.
+    link_names : list of str
+        Link function names for each parameter.
+
+    Returns
+    -------
+    tuple(float, np.ndarray)
+        Log-likelihood and its gradient. Log-likelihood is -np.inf outside of the support.
+    """
+
+    parameters, derivatives = get_parameters(coefficients, designs, link_names)
+    if distribution_name == 'genextreme':
+        log_density, *partials = genextreme_log_density(x, *parameters)
+    elif distribution_name == 'genpareto':
+        log_density, *partials = genpareto_log_density(x, *parameters)
+    else:
+        raise ValueError(f'Non-stationary fit is not implemented for {distribution_name} distribution')
+
+    if not np.all(np.isfinite(log_density)):
+        return -np.inf, np.zeros(len(coefficients))
+
+    # Chain rule - d(log-likelihood)/d(coefficient) = sum(d(log-density)/d(parameter) * d(parameter)/d(coefficient))
+    gradient = np.concatenate(
+        [design.T @ (partial * derivative) for design, partial, derivative in zip(designs, partials, derivatives)]
+    )
+    return np.sum(log_density), gradient
+
+
+def fit(x, distribution_name, designs, link_names, x0):
+    """
+    Estimates coefficients of a non-stationary GEV or GPD model by maximizing log-likelihood.
+    Columns of design matrices (except for the first, intercept, column) are standardized during optimization.
+
+    Parameters
+    ----------
+    x : np.ndarray
+        Observations (exceedances for GPD).
+    distribution_name : str
+        'genextreme' or 'genpareto'.
+    designs : list of np.ndarray
+        Design matrices for each parameter with intercept in the first column.
+    link_names : list of str
+        Link function names for each parameter.
+    x0 : np.ndarray
+        Starting coefficients.
+
+    Returns
+    -------
+    tuple(np.ndarray, np.ndarray, float)
+        Coefficients, their covariance matrix (inverse of observed information), and log-likelihood.
+    """
+
+    # Standardize covariates - coefficients = transform @ standardized coefficients
+    transform = np.zeros((len(x0), len(x0)))
+    standardized_designs = []
+    start = 0
+    for design in designs:
+        size = design.shape[1]
+        means, stds = design[:, 1:].mean(axis=0), design[:, 1:].std(axis=0)
+        stds[stds == 0] = 1
+        standardized_designs.append(np.column_stack([design[:, 0], (design[:, 1:] - means) / stds]))
+        block = np.eye(size)
+        block[0, 1:] = -means / stds
+        block[1:, 1:] /= stds[:, None]
+        transform[start:start + size, start:start + size] = block
+        start += size
+    x0 = np.linalg.solve(transform, x0)
+
+    def objective(coefficients):
+        value, gradient = log_likelihood(coefficients, x, distribution_name, standardized_designs, link_names)
+        if not np.isfinite(value):
+            return np.inf, np.zeros(len(coefficients))
+        return -value, -gradient
+
+    solution = scipy.optimize.minimize(objective, x0=x0, jac=True, method='BFGS', options=dict(gtol=1e-8))
+    if not np.isfinite(solution.fun):
+        raise RuntimeError(f'Non-stationary fit failed: {solution.message}')
+
+    # Observed information - central differences of analytic gradient
+    steps = 1e-6 * np.maximum(1, np.abs(solution.x))
+    information = np.array(
+        [
+            (objective(solution.x + np.eye(len(steps))[i] * steps[i])[1] -
+             objective(solution.x - np.eye(len(steps))[i] * steps[i])[1]) / (2 * steps[i])
+            for i in range(len(steps))
+        ]
+    )
+    information = (information + information.T) / 2
+    covariance = transform @ np.linalg.inv(information) @ transform.T
+
+    return transform @ solution.x, covariance, -solution.fun
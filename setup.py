@@ -17,7 +17,7 @@ setup(
     url='https://github.com/georgebv/coastlib',
     license='GPLv3',
     keywords='coastal ocean marine engineering',
-    packages=find_packages(),
+    packages=find_packages(exclude=['benchmarks', 'benchmarks.*']),
     include_package_data=True,
     classifiers=[
         'Programming Language :: Python :: 3.7',
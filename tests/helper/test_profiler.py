@@ -0,0 +1,56 @@
+from coastlib.helper.profiler import Profiler, profiled
+import pickle
+import pytest
+
+
+class Dummy:
+
+    def __init__(self, profiler=None):
+        self.profiler = profiler
+
+    @profiled()
+    def outer(self):
+        return self.inner() + [0] * 10000
+
+    @profiled('custom')
+    def inner(self):
+        return [0] * 1000
+
+
+def test_profiler():
+    calls = []
+    profiler = Profiler(memory=True, hook=lambda *args: calls.append(args))
+    dummy = Dummy(profiler)
+    for _ in range(2):
+        dummy.outer()
+    assert profiler.timings['outer']['calls'] == 2
+    assert profiler.timings['custom']['calls'] == 2
+    assert profiler.timings['outer']['wall_time'] >= profiler.timings['custom']['wall_time']
+    assert profiler.timings['outer']['peak_memory'] >= profiler.timings['custom']['peak_memory'] > 0
+    assert [call[0] for call in calls] == ['custom', 'outer', 'custom', 'outer']
+    assert list(profiler.to_dataframe().index) == ['custom', 'outer']
+
+    # Hooks are not pickled
+    assert pickle.loads(pickle.dumps(profiler)).hook is None
+    profiler.reset()
+    assert len(profiler.timings) == 0
+
+
+def test_profiler_disabled():
+    dummy = Dummy()
+    assert len(dummy.outer()) == 11000
+
+
+def test_profiler_exception():
+    profiler = Profiler(memory=True)
+
+    class Failing(Dummy):
+        @profiled()
+        def fail(self):
+            raise ValueError
+
+    with pytest.raises(ValueError):
+        Failing(profiler).fail()
+    assert profiler.timings['fail']['calls'] == 1
+    Failing(profiler).outer()
+    assert profiler.timings['outer']['calls'] == 1
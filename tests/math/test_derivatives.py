@@ -0,0 +1,212 @@
+import concurrent.futures
+import functools
+
+import coastlib.math.derivatives
+import mpmath
+import numpy as np
+import pytest
+
+
+def analytical_derivatives(x, y, z):
+    value = np.sin(x) * y ** 2 * np.exp(z)
+    gradient = np.array([[np.cos(x) * y ** 2 * np.exp(z)], [2 * np.sin(x) * y * np.exp(z)], [value]])
+    hessian = np.array(
+        [
+            [-value, 2 * np.cos(x) * y * np.exp(z), gradient[0, 0]],
+            [2 * np.cos(x) * y * np.exp(z), 2 * np.sin(x) * np.exp(z), gradient[1, 0]],
+            [gradient[0, 0], gradient[1, 0], value]
+        ]
+    )
+    return gradient, hessian
+
+
+def mpmath_function(x, y, z):
+    return mpmath.sin(x) * y ** 2 * mpmath.exp(z)
+
+
+def test_stencils():
+    stencils = coastlib.math.derivatives.stencils(2)
+    assert sorted(stencils.keys()) == [(0,), (0, 0), (0, 1), (1,), (1, 1)]
+    assert sorted(stencils[(0, 0)]) == [((-2, 0), 1), ((0, 0), -1), ((0, 0), -1), ((2, 0), 1)]
+    assert sorted(stencils[(0, 1)]) == [((-1, -1), 1), ((-1, 1), -1), ((1, -1), -1), ((1, 1), 1)]
+    assert list(coastlib.math.derivatives.stencils(3, orders=(1,)).keys()) == [(0,), (1,), (2,)]
+
+
+def test_finite_differences():
+    coordinates = [1, 2, .3]
+    analytical_gradient, analytical_hessian = analytical_derivatives(*coordinates)
+    evaluations = []
+
+    def function(x, y, z):
+        evaluations.append((x, y, z))
+        return mpmath.sin(x) * y ** 2 * mpmath.exp(z)
+
+    gradient, hessian = coastlib.math.derivatives.finite_differences(
+        function, 3, coordinates, dx='1e-10', precision=100
+    )
+    assert np.allclose(gradient.astype(np.float64), analytical_gradient, rtol=1e-10)
+    assert np.allclose(hessian.astype(np.float64), analytical_hessian, rtol=1e-10)
+    # Each unique stencil point is evaluated once - 6 gradient points, 7 diagonal and 12 off-diagonal Hessian points
+    assert len(evaluations) == 25
+    assert len(set(evaluations)) == 25
+
+    # Memoized estimates are equal to those of nested partial derivative functions
+    nested_hessian = np.array(
+        [
+            [
+                coastlib.math.derivatives.partial_derivative(
+                    coastlib.math.derivatives.partial_derivative(function, i, dx='1e-10'), j,
+                    coordinates=coordinates, dx='1e-10'
+                )
+                for j in range(3)
+            ]
+            for i in range(3)
+        ]
+    )
+    assert np.allclose(hessian.astype(np.float64), nested_hessian.astype(np.float64), rtol=1e-20)
+
+    float_gradient, float_hessian = coastlib.math.derivatives.finite_differences(
+        lambda x, y, z: np.sin(x) * y ** 2 * np.exp(z), 3, coordinates, dx='1e-4', precision=None
+    )
+    assert float_hessian.dtype == np.float64
+    assert np.allclose(float_gradient, analytical_gradient, rtol=1e-6)
+    assert np.allclose(float_hessian, analytical_hessian, rtol=1e-6)
+
+    with pytest.raises(ValueError):
+        coastlib.math.derivatives.finite_differences(function, 3, coordinates, orders=(3,))
+    with pytest.raises(ValueError):
+        coastlib.math.derivatives.finite_differences(function, 3, coordinates[:2])
+
+
+def test_gradient_hessian():
+    coordinates = [1, 2, .3]
+    analytical_gradient, analytical_hessian = analytical_derivatives(*coordinates)
+
+    def function(x, y, z):
+        return mpmath.sin(x) * y ** 2 * mpmath.exp(z)
+
+    gradient = coastlib.math.derivatives.gradient(function, 3, coordinates, dx='1e-10')
+    hessian = coastlib.math.derivatives.hessian(function, 3, coordinates, dx='1e-10')
+    assert gradient.shape == (3, 1) and hessian.shape == (3, 3)
+    assert np.allclose(gradient.astype(np.float64), analytical_gradient, rtol=1e-10)
+    assert np.allclose(hessian.astype(np.float64), analytical_hessian, rtol=1e-10)
+
+    # Without coordinates partial derivative functions are returned
+    functions = coastlib.math.derivatives.hessian(function, 3, dx='1e-10')
+    with mpmath.workdps(100):
+        value = functions[0, 1](*[mpmath.mpf(str(coordinate)) for coordinate in coordinates])
+    assert np.isclose(float(value), analytical_hessian[0, 1], rtol=1e-10)
+
+
+def test_evaluation_modes():
+    coordinates = [1, 2, .3]
+    analytical_gradient, analytical_hessian = analytical_derivatives(*coordinates)
+    calls = []
+
+    def vectorized_function(points):
+        calls.append(points.shape)
+        return np.sin(points[:, 0]) * points[:, 1] ** 2 * np.exp(points[:, 2])
+
+    gradient, hessian = coastlib.math.derivatives.finite_differences(
+        vectorized_function, 3, coordinates, dx='1e-4', precision=None, vectorized=True
+    )
+    assert calls == [(25, 3)]
+    assert np.allclose(gradient, analytical_gradient, rtol=1e-6)
+    assert np.allclose(hessian, analytical_hessian, rtol=1e-6)
+    assert np.allclose(
+        coastlib.math.derivatives.hessian(
+            vectorized_function, 3, coordinates, dx='1e-4', precision=None, vectorized=True
+        ),
+        hessian
+    )
+
+    serial = coastlib.math.derivatives.finite_differences(mpmath_function, 3, coordinates, dx='1e-10')
+    for executor_class in [concurrent.futures.ThreadPoolExecutor, concurrent.futures.ProcessPoolExecutor]:
+        with executor_class(max_workers=2) as executor:
+            concurrent_estimates = coastlib.math.derivatives.finite_differences(
+                mpmath_function, 3, coordinates, dx='1e-10', executor=executor
+            )
+            assert np.allclose(
+                coastlib.math.derivatives.gradient(mpmath_function, 3, coordinates, dx='1e-10', executor=executor)
+                .astype(np.float64), analytical_gradient, rtol=1e-10
+            )
+        for estimate, serial_estimate in zip(concurrent_estimates, serial):
+            assert np.array_equal(estimate, serial_estimate)
+
+    with pytest.raises(ValueError):
+        with concurrent.futures.ThreadPoolExecutor() as executor:
+            coastlib.math.derivatives.finite_differences(
+                vectorized_function, 3, coordinates, vectorized=True, executor=executor
+            )
+
+
+def test_richardson():
+    coordinates = [1, 2, .3]
+    analytical_gradient, analytical_hessian = analytical_derivatives(*coordinates)
+    (gradient, hessian), (gradient_error, hessian_error) = coastlib.math.derivatives.richardson(
+        lambda x, y, z: np.sin(x) * y ** 2 * np.exp(z), 3, coordinates
+    )
+    assert gradient.shape == (3, 1) and hessian.shape == (3, 3)
+    assert np.allclose(gradient, analytical_gradient, rtol=1e-11)
+    assert np.allclose(hessian, analytical_hessian, rtol=1e-9)
+    # Error estimates bound the actual error (up to float64 rounding error, which is not estimated)
+    assert np.all(np.abs(gradient - analytical_gradient) <= gradient_error + 1e-12)
+    assert np.all(np.abs(hessian - analytical_hessian) <= hessian_error + 1e-10)
+
+    # Spacing may be set for each argument, fixed spacing central differences are less accurate
+    (relative_gradient,), _ = coastlib.math.derivatives.richardson(
+        lambda x, y, z: np.sin(x) * y ** 2 * np.exp(z), 3, coordinates, orders=(1,), dx=['1e-3', '1e-2', '1e-2']
+    )
+    assert np.allclose(relative_gradient, analytical_gradient, rtol=1e-11)
+    central_gradient = coastlib.math.derivatives.gradient(
+        lambda x, y, z: np.sin(x) * y ** 2 * np.exp(z), 3, coordinates, dx='1e-6', precision=None
+    )
+    assert np.max(np.abs(central_gradient - analytical_gradient)) > np.max(np.abs(gradient - analytical_gradient))
+
+    with pytest.raises(ValueError):
+        coastlib.math.derivatives.richardson(mpmath_function, 3, coordinates, levels=1)
+    with pytest.raises(ValueError):
+        coastlib.math.derivatives.richardson(mpmath_function, 3, coordinates[:2])
+
+
+def normal_log_likelihood(mu, sigma, data):
+    return -len(data) * mpmath.log(sigma) - sum((_data - mu) ** 2 for _data in data) / (2 * sigma ** 2)
+
+
+def normal_quantile(x, mu, sigma):
+    return mu + x * sigma
+
+
+def test_delta_confidence():
+    np.random.seed(0)
+    data = np.random.normal(5, 2, 200)
+    theta = np.array([data.mean(), data.std()])
+    x = np.array([-1, 0, 1.5, 3])
+    log_likelihood = functools.partial(normal_log_likelihood, data=data)
+
+    # Variance of quantile estimate for the normal distribution
+    scale = theta[1] * np.sqrt(1 / len(data) + x ** 2 / (2 * len(data)))
+    analytical = theta[0] + x * theta[1] + np.array([[-1], [1]]) * 1.959963984540054 * scale
+    with concurrent.futures.ThreadPoolExecutor(2) as thread_executor, \
+            concurrent.futures.ProcessPoolExecutor(2) as process_executor:
+        for options in [
+            dict(),
+            dict(vectorized=True, executor=thread_executor),
+            dict(executor=process_executor),
+            dict(method='richardson', information_matrix=np.diag([1, 2]) * len(data) / theta[1] ** 2),
+        ]:
+            intervals = coastlib.math.derivatives.delta_confidence(
+                x=x, scalar_function=normal_quantile, likelihood_function=log_likelihood, theta=theta, **options
+            )
+            assert intervals.shape == (2, 4)
+            assert np.allclose(intervals, analytical, rtol=1e-10)
+
+    # Scalar <x> is passed to <scalar_function>
+    assert np.allclose(
+        coastlib.math.derivatives.delta_confidence(
+            x=1.5, scalar_function=normal_quantile, likelihood_function=log_likelihood, theta=theta
+        ),
+        analytical[:, 2], rtol=1e-10
+    )
+    with pytest.raises(ValueError):
+        coastlib.math.derivatives.delta_confidence(x, normal_quantile, log_likelihood, theta, method='forward')
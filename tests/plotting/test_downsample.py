@@ -0,0 +1,55 @@
+from coastlib.plotting.downsample import decimate, minmax_downsample, lttb_downsample
+import numpy as np
+import pandas as pd
+import pytest
+
+
+@pytest.fixture
+def series():
+    np.random.seed(0)
+    x = pd.date_range('2000-01-01', periods=100000, freq='6min').values
+    y = np.cumsum(np.random.normal(size=len(x)))
+    return x, y
+
+
+def test_minmax_downsample(series):
+    x, y = series
+    indexes = minmax_downsample(x, y, n_bins=500)
+    assert len(indexes) <= 1002
+    assert np.all(np.diff(indexes) > 0)
+    assert indexes[0] == 0 and indexes[-1] == len(x) - 1
+    assert np.argmax(y) in indexes and np.argmin(y) in indexes
+
+    # Each bin keeps its extremes
+    bins = np.array_split(np.arange(len(x)), 10)
+    for _bin in bins[:-1]:
+        assert _bin[np.argmax(y[_bin])] in minmax_downsample(x, y, n_bins=10)
+
+    np.testing.assert_equal(minmax_downsample(x[:50], y[:50], n_bins=500), np.arange(50))
+
+
+def test_lttb_downsample(series):
+    x, y = series
+    indexes = lttb_downsample(x, y, n_out=500)
+    assert len(indexes) == 500
+    assert np.all(np.diff(indexes) > 0)
+    assert indexes[0] == 0 and indexes[-1] == len(x) - 1
+
+    # A spike is always selected
+    y = np.zeros(1000)
+    y[777] = 10
+    assert 777 in lttb_downsample(np.arange(1000), y, n_out=20)
+
+    with pytest.raises(ValueError):
+        lttb_downsample(x, y, n_out=2)
+
+
+def test_decimate(series):
+    x, y = series
+    keep = np.array([12345, 54321])
+    for method in ['minmax', 'lttb']:
+        indexes = decimate(x, y, 300, method=method, keep=keep)
+        assert np.all(np.isin(keep, indexes))
+        assert len(indexes) < len(x) / 100
+    with pytest.raises(ValueError):
+        decimate(x, y, 300, method='random')
@@ -0,0 +1,50 @@
+from coastlib.plotting.hover import connect_hover
+import matplotlib.pyplot as plt
+from matplotlib.backend_bases import MouseEvent
+import numpy as np
+
+
+plt.ioff()
+
+
+def move(fig, x, y):
+    event = MouseEvent('motion_notify_event', fig.canvas, x, y)
+    fig.canvas.callbacks.process('motion_notify_event', event)
+
+
+def test_hover():
+    np.random.seed(0)
+    x, y = np.random.random(5000), np.random.random(5000)
+    fig, ax = plt.subplots()
+    points = ax.scatter(x, y, s=40)
+    annot = ax.annotate('', xy=(0, 0))
+    annot.set_visible(False)
+    hovered = []
+
+    def update(n):
+        hovered.append(n)
+        annot.set_text(f'{n}')
+
+    hover = connect_hover(ax, points, update, [annot])
+    fig.canvas.draw()
+
+    # Cursor over a point
+    display = ax.transData.transform((x[123], y[123]))
+    move(fig, *display)
+    assert hover.current is not None and annot.get_visible()
+    assert np.hypot(*(ax.transData.transform((x[hover.current], y[hover.current])) - display)) <= hover.radius
+
+    # Same point again does not trigger update
+    move(fig, *display)
+    assert len(hovered) == 1
+
+    # Tree is rebuilt after zoom - point is found at its new display position
+    ax.set_xlim(x[123] - .01, x[123] + .01)
+    ax.set_ylim(y[123] - .01, y[123] + .01)
+    move(fig, *ax.transData.transform((x[123], y[123])))
+    assert hover.current == 123
+
+    # Cursor away from all points
+    move(fig, *ax.transData.transform((x[123] + .009, y[123] + .009)))
+    assert hover.current is None and not annot.get_visible()
+    plt.close(fig)
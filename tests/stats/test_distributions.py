@@ -0,0 +1,194 @@
+import coastlib.math.derivatives
+from coastlib.stats.distributions import genextreme, genpareto
+import numpy as np
+import pytest
+import scipy.stats
+
+
+def test_r_largest_log_likelihood():
+    np.random.seed(0)
+    data = scipy.stats.genextreme.rvs(-.1, loc=5, scale=2, size=(50, 3))
+    data[::7, 2] = np.nan
+    # With one value per block the r-largest likelihood reduces to the GEV likelihood
+    for shape in [-.1, 0, .1]:
+        assert np.isclose(
+            genextreme.r_largest_log_likelihood(data[:, :1], shape, 5, 2),
+            np.sum(scipy.stats.genextreme.logpdf(data[:, 0], -shape, 5, 2))
+        )
+    assert np.isfinite(genextreme.r_largest_log_likelihood(data, .1, 5, 2))
+    assert genextreme.r_largest_log_likelihood(data, .1, 5, -2) == -np.inf
+    assert genextreme.r_largest_log_likelihood(data, -1, 5, .1) == -np.inf
+
+
+def test_backends():
+    x = np.array([-1, 0, .5, 2, 5, 20])
+    q = np.array([1e-6, .01, .5, .99, 1 - 1e-6])
+    for distribution, scipy_distribution, sign in [
+        (genextreme, scipy.stats.genextreme, -1), (genpareto, scipy.stats.genpareto, 1)
+    ]:
+        for shape in [-.2, 0, 1e-12, .3]:
+            parameters = (shape, -.5, 1.5)
+            scipy_parameters = (sign * shape, -.5, 1.5)
+            support = np.isfinite(scipy_distribution.logpdf(x, *scipy_parameters))
+            for method in ['pdf', 'cdf']:
+                numpy_values = getattr(distribution, method)(x, *parameters)
+                assert np.allclose(
+                    numpy_values[support], getattr(scipy_distribution, method)(x[support], *scipy_parameters)
+                )
+                assert np.all(np.isnan(numpy_values[~support]))
+                assert np.isclose(
+                    getattr(distribution, method)(x[support][-1], *parameters), numpy_values[support][-1],
+                    rtol=1e-15
+                )
+            if not np.all(support):
+                assert distribution.log_likelihood(x, *parameters) == -np.inf
+
+            # mpmath backend of genpareto divides by shape
+            if shape == 0:
+                continue
+            for method, values in [('pdf', x[support]), ('cdf', x[support]), ('ppf', q), ('isf', q)]:
+                assert np.allclose(
+                    getattr(distribution, method)(values, *parameters),
+                    np.float64(getattr(distribution, method)(values, *parameters, backend='mpmath')),
+                    rtol=1e-9, atol=0
+                )
+            assert np.isclose(
+                distribution.log_likelihood(x[support], *parameters),
+                np.float64(distribution.log_likelihood(x[support], *parameters, backend='mpmath')),
+                rtol=1e-12
+            )
+
+    # Small upper tail probabilities are not lost to rounding of 1 - q
+    assert np.isclose(genextreme.isf(1e-20, 0, 0, 1), -np.log(1e-20))
+    with pytest.raises(ValueError):
+        genextreme.ppf(1, .1, 0, 1)
+    with pytest.raises(ValueError):
+        genpareto.isf(1, .1, 0, 1)
+    with pytest.raises(ValueError):
+        genpareto.pdf(x, .1, 0, 1, backend='fortran')
+
+
+def test_adaptive_backend():
+    # Values next to the upper end of the support lose precision in float64
+    x = np.array([1, 2, 5 - 1e-9, 5 - 1e-12])
+    for distribution in [genextreme, genpareto]:
+        exact = np.float64(distribution.pdf(x, -.2, 0, 1, backend='mpmath'))
+        assert not np.allclose(distribution.pdf(x, -.2, 0, 1), exact, rtol=1e-9, atol=0)
+        assert np.allclose(distribution.pdf(x, -.2, 0, 1, backend='adaptive'), exact, rtol=1e-14, atol=0)
+        assert np.isclose(
+            distribution.log_likelihood(x, -.2, 0, 1, backend='adaptive'),
+            np.float64(distribution.log_likelihood(x, -.2, 0, 1, backend='mpmath')),
+            rtol=1e-14
+        )
+        q = np.array([1e-20, 1e-3, .5])
+        assert np.allclose(
+            distribution.isf(q, .1, 0, 1, backend='adaptive'),
+            np.float64(distribution.isf(q, .1, 0, 1, backend='mpmath')),
+            rtol=1e-14
+        )
+        assert isinstance(distribution.cdf(1., .1, 0, 1, backend='adaptive'), np.float64)
+
+
+def test_support():
+    x = np.array([-5, -1, 0, 5, 15])
+    original = x.copy()
+    assert np.array_equal(genextreme.in_support(x, .5, 0, 1), [False, True, True, True, True])
+    assert np.array_equal(genextreme.in_support(x, -.5, 0, 1), [True, True, True, False, False])
+    assert np.array_equal(genpareto.in_support(x, -.2, 0, 1), [False, False, True, True, False])
+    assert genpareto.in_support(1, 0, 0, 1) and not genpareto.in_support(-1, 0, 0, 1)
+    assert np.array_equal(np.isnan(genextreme.check_support(x, .5, 0, 1)), [True, False, False, False, False])
+    for distribution in [genextreme, genpareto]:
+        for backend in ['numpy', 'mpmath', 'adaptive']:
+            values = np.float64(distribution.pdf(x, -.2, 0, 1, backend=backend))
+            assert np.array_equal(np.isnan(values), ~distribution.in_support(x, -.2, 0, 1))
+            assert np.isnan(np.float64(distribution.cdf(15, -.2, 0, 1, backend=backend)))
+        # Caller data is not modified
+        assert np.array_equal(x, original)
+    with pytest.raises(ValueError):
+        genextreme.in_support(x, .5, 0, -1)
+
+
+def test_log_likelihood_derivatives():
+    np.random.seed(0)
+    for distribution, scipy_distribution, sign, loc in [
+        (genextreme, scipy.stats.genextreme, -1, 3), (genpareto, scipy.stats.genpareto, 1, 0)
+    ]:
+        data = scipy_distribution.rvs(sign * .1, loc=loc, scale=2, size=100)
+        for shape in [.1, -.05, 1e-3, 1e-7]:
+            parameters = (shape, loc - .1, 2)
+
+            def log_likelihood(*theta):
+                return distribution.log_likelihood(data, *theta, backend='mpmath')
+
+            assert np.allclose(
+                distribution.log_likelihood_gradient(data, *parameters),
+                coastlib.math.derivatives.gradient(
+                    log_likelihood, 3, parameters, dx='1e-20', precision=50
+                ).astype(np.float64).flatten(),
+                rtol=1e-10
+            )
+            assert np.allclose(
+                distribution.observed_information(data, *parameters),
+                distribution.observed_information(
+                    data, *parameters, dx='1e-15', precision=50, backend='mpmath'
+                ).astype(np.float64),
+                rtol=1e-10
+            )
+
+        # Shape=0 limit is continuous with the shape != 0 values
+        for method in [distribution.log_likelihood_gradient, distribution.log_likelihood_hessian]:
+            assert np.allclose(method(data, 0, loc - .1, 2), method(data, 1e-8, loc - .1, 2), rtol=1e-6, atol=1e-5)
+        assert np.all(np.isnan(distribution.log_likelihood_hessian(data, -1, loc - .1, 2)))
+
+
+def test_parameter_broadcasting():
+    q = np.array([1e-3, .1, .5, .9])
+    x = np.array([.1, 1, 3, 8])
+    # Parameter ensemble of shape (4, 1), shape=1e-11 lies within dx of the shape=0 limit
+    shape, loc, scale = np.array([[-.3, 1e-11, 1e-8, .2], [0, .5, .1, 1], [1, 2, .5, 1.5]])[:, :, None]
+    for distribution in [genextreme, genpareto]:
+        for backend in ['numpy', 'adaptive', 'mpmath']:
+            for method, values in [('ppf', q), ('isf', q), ('pdf', x), ('cdf', x), ('log_likelihood', x)]:
+                function = getattr(distribution, method)
+                ensemble = np.asarray(function(values, shape, loc, scale, backend=backend), dtype=np.float64)
+                assert ensemble.shape == ((4,) if method == 'log_likelihood' else (4, 4))
+                for i in range(4):
+                    assert np.allclose(
+                        ensemble[i], np.asarray(
+                            function(values, shape[i, 0], loc[i, 0], scale[i, 0], backend=backend), dtype=np.float64
+                        ),
+                        equal_nan=True
+                    )
+
+        for method in [distribution.log_likelihood_gradient, distribution.observed_information]:
+            ensemble = method(x, shape, loc, scale)
+            assert ensemble.shape[-1] == 4
+            for i in range(4):
+                assert np.allclose(ensemble[..., i], method(x, shape[i, 0], loc[i, 0], scale[i, 0]), equal_nan=True)
+
+        with pytest.raises(ValueError):
+            distribution.isf(q, shape, loc, scale - 1)
+        with pytest.raises(NotImplementedError):
+            distribution.observed_information(x, shape, loc, scale, backend='mpmath')
+
+
+def test_rvs(monkeypatch):
+    global_state = np.random.get_state()[1].copy()
+    for distribution, scipy_distribution, sign in [
+        (genextreme, scipy.stats.genextreme, -1), (genpareto, scipy.stats.genpareto, 1)
+    ]:
+        sample = distribution.rvs(.2, 1, 2, size=10000, random_state=0)
+        assert scipy.stats.kstest(sample, scipy_distribution(sign * .2, 1, 2).cdf).pvalue > .01
+        assert np.array_equal(sample, distribution.rvs(.2, 1, 2, size=10000, random_state=np.random.default_rng(0)))
+
+        # Chunked generation draws the same values
+        monkeypatch.setattr('coastlib.stats.distributions.rvs_chunk_size', 7)
+        assert np.array_equal(sample[:100], distribution.rvs(.2, 1, 2, size=100, random_state=0))
+        monkeypatch.undo()
+
+        # Size is broadcast against parameters
+        assert distribution.rvs(np.array([[-.1], [0], [.1]]), 1, 2, size=(3, 5), random_state=0).shape == (3, 5)
+        assert np.allclose(
+            distribution.rvs(.2, 1, 2, size=5, random_state=0, backend='mpmath').astype(np.float64), sample[:5]
+        )
+    assert np.array_equal(global_state, np.random.get_state()[1])
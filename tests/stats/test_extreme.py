@@ -0,0 +1,312 @@
+import concurrent.futures
+import warnings
+from coastlib.stats.extreme import EVA, extremal_index
+from coastlib.stats.kernels import decluster_runs
+import numpy as np
+import pandas as pd
+import pytest
+import scipy.stats
+
+
+@pytest.fixture
+def hourly_series():
+    index = pd.date_range('2000-01-01', periods=24 * 365 * 4, freq='H')
+    np.random.seed(0)
+    series = pd.Series(np.random.gumbel(size=len(index)), index=index, name='Water Level')
+    # Introduce a 90-day gap
+    return series.drop(series.index[24 * 100:24 * 190])
+
+
+def test_decluster_runs_matches_get_extremes(hourly_series):
+    eva = EVA(hourly_series)
+    values = hourly_series.values
+    times = hourly_series.index.values.view(np.int64)
+    for extremes_type, threshold in [('high', 4), ('low', -1)]:
+        eva.get_extremes(method='POT', threshold=threshold, r=24, extremes_type=extremes_type)
+        if extremes_type == 'high':
+            mask = values > threshold
+        else:
+            mask = values < threshold
+        peaks = decluster_runs(times[mask], values[mask], pd.Timedelta(hours=24).value, extremes_type)
+        assert np.array_equal(values[mask][peaks], eva.extremes['Water Level'].values)
+        assert np.array_equal(times[mask][peaks], eva.extremes.index.values.view(np.int64))
+
+
+def test_select_threshold(hourly_series):
+    eva = EVA(hourly_series)
+    eva.get_extremes(method='BM')
+    threshold, diagnostics = eva.select_threshold(thresholds=np.linspace(3, 6, 30), r=24)
+    assert threshold in diagnostics.index
+    assert diagnostics.loc[threshold, 'KS Score'] >= .05
+    assert np.all(np.diff(diagnostics.index.values) > 0)
+    # State of the EVA object is preserved
+    assert eva.extremes_method == 'Block Maxima'
+
+    # Second call is served from cache and yields identical diagnostics
+    threshold_cached, diagnostics_cached = eva.select_threshold(thresholds=np.linspace(3, 6, 30), r=24)
+    assert threshold_cached == threshold
+    pd.testing.assert_frame_equal(diagnostics, diagnostics_cached)
+
+    # Minimum number of exceedances is applied to cached fits
+    _, diagnostics_limited = eva.select_threshold(thresholds=np.linspace(3, 6, 30), r=24, limit=100)
+    assert np.array_equal(
+        np.isnan(diagnostics_limited['Shape'].values), diagnostics_limited['Exceedances'].values <= 100
+    )
+    assert np.array_equal(
+        diagnostics_limited['Shape'].dropna().values,
+        diagnostics.loc[diagnostics['Exceedances'] > 100, 'Shape'].values
+    )
+    assert np.isnan(diagnostics_limited['Shape'].values).any()
+    # Thresholds not fitted under a larger <limit> are fitted under a smaller one
+    _, diagnostics_default = eva.select_threshold(thresholds=np.linspace(3, 6, 30), r=24)
+    pd.testing.assert_frame_equal(diagnostics, diagnostics_default)
+
+
+def test_fit_many(hourly_series):
+    eva = EVA(hourly_series)
+    eva.get_extremes(method='POT', threshold=4, r=24)
+    with concurrent.futures.ThreadPoolExecutor(max_workers=2) as executor:
+        comparison = eva.fit_many(['genpareto', 'expon', 'weibull_min'], executor=executor)
+    assert list(comparison.columns[:5]) == ['k', 'log-likelihood', 'AIC', 'KS statistic', 'KS p-value']
+    assert np.all(np.diff(comparison['AIC'].values) >= 0)
+    assert comparison.loc['genpareto', 'k'] == 2
+
+    # Promoted candidate is identical to a regular fit
+    eva.select_fit('genpareto')
+    promoted = eva.return_value(100)
+    eva.fit('genpareto')
+    assert np.isclose(promoted, eva.return_value(100))
+    assert np.isclose(comparison.loc['genpareto', 'Return Value 100'], promoted)
+
+
+def test_fit_stratified(hourly_series):
+    eva = EVA(hourly_series)
+    eva.get_extremes(method='POT', threshold=3.5, r=24)
+    with concurrent.futures.ThreadPoolExecutor(max_workers=2) as executor:
+        summary = eva.fit_stratified(by='season', executor=executor)
+    assert list(summary.index) == ['DJF', 'MAM', 'JJA', 'SON']
+    assert summary['Extremes'].sum() == len(eva.extremes)
+    # Effective durations of strata add up to the record length less the gap
+    assert np.isclose((summary['Effective Blocks'] / 4).sum(), eva.number_of_blocks, rtol=.02)
+    assert set(eva.strata.keys()) == set(summary.index)
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=2) as executor:
+        summary = eva.fit_stratified(by='month', executor=executor)
+    assert len(summary) == 12
+    # 4 years of data with a 90-day gap in April-June
+    assert np.isclose(summary.loc['Jan', 'Effective Blocks'], 4, rtol=.02)
+    assert summary.loc['May', 'Effective Blocks'] < 3.1
+
+
+def test_r_largest():
+    index = pd.date_range('2000-01-01', periods=24 * 365 * 20, freq='H')
+    np.random.seed(1)
+    series = pd.Series(np.random.gumbel(size=len(index)), index=index, name='Water Level')
+    series = series.drop(series.index[24 * 100:24 * 190])
+
+    block_maxima = EVA(series)
+    block_maxima.get_extremes(method='BM')
+    eva = EVA(series)
+
+    # Single largest event in each block is the block maximum
+    eva.get_extremes(method='RL', r_largest=1)
+    assert eva.number_of_blocks == block_maxima.number_of_blocks
+    assert np.array_equal(eva.block_boundaries, block_maxima.block_boundaries)
+    assert np.array_equal(eva.extremes['Water Level'].values, block_maxima.extremes['Water Level'].values)
+
+    eva.get_extremes(method='RL', r_largest=3, r=24)
+    assert len(eva.extremes) == 3 * eva.number_of_blocks
+    assert np.all(np.isin(block_maxima.extremes['Water Level'].values, eva.extremes['Water Level'].values))
+    assert np.all(np.diff(eva.extremes.index.values) > np.timedelta64(pd.Timedelta(hours=24)))
+    assert eva.extremes_rate == 1
+
+    eva.fit('genextreme')
+    block_maxima.fit('genextreme')
+    assert np.isclose(eva.return_value(100), block_maxima.return_value(100), rtol=.05)
+    lower, upper = eva.confidence_interval(100, method='Delta')
+    assert lower < eva.return_value(100) < upper
+
+
+def test_r_largest_goodness_of_fit():
+    index = pd.date_range('2000-01-01', periods=24 * 365 * 60, freq='H')
+    np.random.seed(1)
+    series = pd.Series(np.random.gumbel(size=len(index)), index=index, name='Water Level')
+    eva = EVA(series)
+    eva.get_extremes(method='RL', r_largest=5, r=24)
+    eva.fit('genextreme')
+    # Tests compare block maxima to the fitted distribution of block maxima
+    assert eva.goodness_of_fit(method='KS')[1] > .05
+    assert eva.goodness_of_fit(method='chi-square', chi_quantiles=6, k=3)[1] > .05
+    block_maxima = EVA(series)
+    block_maxima.get_extremes(method='BM')
+    assert np.isclose(
+        eva.goodness_of_fit(method='KS')[0],
+        scipy.stats.kstest(
+            block_maxima.extremes['Water Level'].values, 'genextreme', args=eva.fit_parameters
+        )[0]
+    )
+
+
+def test_extremal_index():
+    # Moving maximum of iid heavy-tailed values has clusters of two exceedances, extremal index is 0.5
+    index = pd.date_range('2000-01-01', periods=24 * 365 * 10, freq='H')
+    np.random.seed(2)
+    z = np.random.pareto(1, size=len(index) + 1)
+    series = pd.Series(np.maximum(z[1:], z[:-1]), index=index, name='Water Level')
+    threshold = np.quantile(series.values, .995)
+
+    assert extremal_index(np.arange(0, 1000, 10)) == 1
+    eva = EVA(series)
+    assert np.isclose(eva.get_extremal_index(threshold), .5, atol=.1)
+    assert np.isclose(eva.get_extremal_index(threshold, method='runs', r=2), .5, atol=.1)
+    assert len(eva.get_extremal_index([threshold, 2 * threshold])) == 2
+
+    eva.get_extremes(method='POT', threshold=threshold, extremal_index='intervals')
+    assert len(eva.extremes) == np.sum(series.values >= eva.threshold)
+    assert np.isclose(eva.extremes_rate, eva.extremal_index * len(eva.extremes) / eva.number_of_blocks)
+    eva.fit('genpareto')
+    declustered = EVA(series)
+    declustered.get_extremes(method='POT', threshold=threshold, r=2)
+    declustered.fit('genpareto')
+    assert np.isclose(eva.return_value(100), declustered.return_value(100), rtol=.2)
+
+    with pytest.raises(ValueError):
+        eva.get_extremes(method='POT', threshold=threshold, extremal_index=.5, r=24)
+
+
+def test_fit_nonstationary():
+    index = pd.date_range('1970-01-01', periods=24 * 365 * 40, freq='H')
+    np.random.seed(3)
+    trend = .02 * (index - index[0]).days.values / 365.2425
+    series = pd.Series(.3 * np.random.gumbel(size=len(index)) + trend, index=index, name='Water Level')
+
+    eva = EVA(series)
+    eva.get_extremes(method='BM')
+    summary = eva.fit_nonstationary('genextreme')
+    estimate = summary.loc[('loc', 'time')]
+    assert np.isclose(estimate['Estimate'], .02, atol=3 * estimate['Standard Error'])
+    early, late = eva.nonstationary_return_value(100, 1975), eva.nonstationary_return_value(100, 2005)
+    assert np.isclose(late - early, 30 * summary.loc[('loc', 'time'), 'Estimate'], rtol=1e-3)
+
+    # Covariate which is a linear function of time gives the same fit
+    covariate = pd.Series(np.arange(41) / 10, index=pd.date_range('1970-01-01', periods=41, freq='365.2425D'))
+    eva.fit_nonstationary('genextreme', covariates=covariate.rename('MSL'), loc=['MSL'])
+    assert np.isclose(eva.nonstationary_return_value(100, 2005), late, rtol=1e-3)
+
+
+def test_profiler(hourly_series):
+    eva = EVA(hourly_series, profiler=True)
+    eva.get_extremes(method='BM')
+    eva.fit('genextreme')
+    eva.return_value(100)
+    assert set(eva.timings.keys()) == {'__init__', 'get_extremes', 'fit', 'return_value'}
+    assert all(record['calls'] == 1 for record in eva.timings.values())
+    assert EVA(hourly_series).timings is None
+
+
+def test_plot_extremes_decimate(hourly_series):
+    hourly_series.index.name = 'Date'
+    eva = EVA(hourly_series, gap_length=24)
+    eva.get_extremes(method='POT', threshold=4)
+    fig, ax = eva.plot_extremes()
+    full = sum(len(line.get_xdata()) for line in ax.lines)
+    for method in ['minmax', 'lttb']:
+        fig, ax = eva.plot_extremes(decimate=method)
+        lines = [line for line in ax.lines if len(line.get_xdata()) > 2]
+        assert len(lines) == 2
+        assert sum(len(line.get_xdata()) for line in lines) < full / 5
+        # Extreme values are kept exactly
+        rendered = np.concatenate([line.get_xdata() for line in lines])
+        assert np.all(np.isin(eva.extremes.index.values, rendered))
+
+
+def test_get_plotting_positions(hourly_series):
+    eva = EVA(hourly_series)
+    for extremes_type in ['high', 'low']:
+        eva.get_extremes(method='BM', plotting_position='Gringorten', extremes_type=extremes_type)
+        with warnings.catch_warnings():
+            warnings.simplefilter('error', RuntimeWarning)
+            table = eva.get_plotting_positions()
+        assert len(table.columns) == 10
+        # Return period of the largest extreme is infinite for ECDF
+        assert np.isinf(table['ECDF'].values).sum() == 1
+        assert np.allclose(table['Gringorten'].values, eva.extremes['Return Period'].values)
+        cdf = eva.get_plotting_positions(return_cdf=True)
+        n = len(eva.extremes)
+        ranks = np.argsort(np.argsort(eva.extremes['Water Level'].values)) + 1
+        if extremes_type == 'low':
+            ranks = n + 1 - ranks
+        assert np.allclose(cdf['Weibull'].values, ranks / (n + 1))
+        assert np.allclose(cdf['Hazen'].values, (ranks - .5) / n)
+    with pytest.raises(ValueError):
+        eva.get_extremes(method='BM', plotting_position='Unknown')
+
+
+def test_generate_results_memory_budget(hourly_series):
+    eva = EVA(hourly_series)
+    eva.get_extremes(method='BM')
+    eva.fit('genextreme')
+    rp = np.logspace(0, 3, 300)
+    results = []
+    for memory_budget in [None, 8 * 20 * 7]:
+        np.random.seed(0)
+        eva.generate_results(rp=rp, ci_kwargs=dict(k=20), memory_budget=memory_budget)
+        results.append(eva.results.copy())
+    pd.testing.assert_frame_equal(results[0], results[1])
+    assert list(results[0].columns) == ['Return Value', '95% CI Lower', '95% CI Upper']
+    assert np.all(results[0]['95% CI Lower'] <= results[0]['Return Value'])
+
+
+def test_generate_catalogue(hourly_series, tmp_path):
+    eva = EVA(hourly_series)
+    eva.get_extremes(method='POT', threshold=4, r=24)
+    eva.fit('genpareto')
+    catalogue = eva.generate_catalogue(years=20000, chunk_size=3000, random_state=0)
+    assert list(catalogue.columns) == ['Year', 'Parameter Set', 'Water Level']
+    assert np.isclose(len(catalogue) / 20000, eva.extremes_rate, rtol=.05)
+    assert np.all(catalogue['Water Level'] > eva.threshold)
+    # Annual exceedance rate of the 50-year return value
+    annual_maxima = catalogue.groupby('Year')['Water Level'].max()
+    assert np.isclose((annual_maxima > eva.return_value(50)).sum() / 20000, 1 - np.exp(-1 / 50), rtol=.2)
+
+    catalogue = eva.generate_catalogue(years=100, uncertainty='bootstrap', k=10, random_state=0)
+    assert set(catalogue['Parameter Set'].unique()).issubset(set(range(10)))
+    with pytest.raises(ValueError):
+        eva.generate_catalogue(years=100, uncertainty='mcmc')
+
+    # Bootstrap after MCMC fit holds GPD location fixed at 0 same as the MLE fit
+    eva.fit('genpareto', fit_method='MCMC', nsamples=20, nwalkers=10)
+    pd.testing.assert_frame_equal(
+        eva.generate_catalogue(years=100, uncertainty='bootstrap', k=10, random_state=0, burn_in=10), catalogue
+    )
+    eva.fit('genpareto')
+
+    # One annual maximum per year for block maxima
+    eva_bm = EVA(hourly_series)
+    eva_bm.get_extremes(method='BM')
+    eva_bm.fit('genextreme')
+    catalogue = eva_bm.generate_catalogue(years=5000, chunk_size=3000, random_state=0)
+    assert np.array_equal(catalogue['Year'].values, np.arange(5000))
+    assert np.isclose((catalogue['Water Level'] > eva_bm.return_value(50)).mean(), 1 / 50, rtol=.2)
+
+    pytest.importorskip('pyarrow')
+    path = eva.generate_catalogue(years=1000, chunk_size=300, path=str(tmp_path / 'catalogue.parquet'), random_state=1)
+    pd.testing.assert_frame_equal(
+        pd.read_parquet(path), eva.generate_catalogue(years=1000, chunk_size=300, random_state=1)
+    )
+
+
+def test_delta_float64(hourly_series):
+    eva = EVA(hourly_series)
+    for method, distribution_name, threshold in [('BM', 'genextreme', None), ('POT', 'genpareto', 4)]:
+        if method == 'BM':
+            eva.get_extremes(method=method)
+        else:
+            eva.get_extremes(method=method, threshold=threshold, r=24)
+        eva.fit(distribution_name)
+        # Richardson extrapolation in float64 agrees with central differences evaluated with mpmath
+        assert np.allclose(
+            eva.confidence_interval([10, 100], method='Delta'),
+            eva.confidence_interval([10, 100], method='Delta', precision=100),
+            rtol=1e-8
+        )
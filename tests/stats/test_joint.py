@@ -0,0 +1,73 @@
+from coastlib.stats.extreme import EVA
+from coastlib.stats.joint import JointEVA, copulas, fit_copula, match_events
+import numpy as np
+import pandas as pd
+import pytest
+import scipy.stats
+
+
+@pytest.mark.parametrize('copula_name, theta', [
+    ('gaussian', .6), ('gaussian', -.4), ('clayton', 2), ('gumbel', 2.5), ('frank', 5), ('frank', -3)
+])
+def test_copulas(copula_name, theta):
+    copula = copulas[copula_name]
+    grid = np.linspace(.0005, .9995, 1000)
+    u, v = np.meshgrid(grid, grid)
+    assert np.isclose(np.exp(copula.log_density(u, v, theta)).mean(), 1, atol=1e-2)
+
+    u, v = copula.sample(100000, theta, np.random.default_rng(0))
+    assert np.isclose(np.mean((u < .3) & (v < .6)), copula.cdf(.3, .6, theta), atol=5e-3)
+    assert np.isclose(fit_copula(u[:5000], v[:5000], copula_name)[0], theta, rtol=.1, atol=.05)
+
+
+def test_gaussian_cdf():
+    for rho in [-.9, 0, .5, .95]:
+        expected = scipy.stats.multivariate_normal([0, 0], [[1, rho], [rho, 1]]).cdf([.3, -.2])
+        assert np.isclose(
+            copulas['gaussian'].cdf(scipy.stats.norm.cdf(.3), scipy.stats.norm.cdf(-.2), rho), expected, atol=1e-6
+        )
+
+
+def test_match_events():
+    np.random.seed(0)
+    times_1 = np.sort(np.random.choice(10000, 300, replace=False))
+    times_2 = np.sort(np.random.choice(10000, 300, replace=False))
+    indexes_1, indexes_2 = match_events(times_1, times_2, window=10)
+    assert np.all(np.abs(times_1[indexes_1] - times_2[indexes_2]) <= 10)
+    assert len(np.unique(indexes_2)) == len(indexes_2)
+    # Paired event is the nearest one
+    nearest = np.abs(times_2[np.newaxis, :] - times_1[indexes_1, np.newaxis]).min(axis=1)
+    assert np.array_equal(np.abs(times_1[indexes_1] - times_2[indexes_2]), nearest)
+
+
+def test_joint_eva():
+    index = pd.date_range('1970-01-01', '2010-01-01', freq='H')
+    np.random.seed(0)
+    z = np.random.normal(size=(2, len(index)))
+    surge = pd.Series(z[0], index=index, name='Surge')
+    waves = pd.Series(.8 * z[0] + .6 * z[1], index=index + pd.Timedelta(hours=3), name='Hs')
+    evas = []
+    for series, threshold in [(surge, 3.2), (waves, 3)]:
+        eva = EVA(series)
+        eva.get_extremes(method='POT', threshold=threshold, r=72)
+        eva.fit('genpareto')
+        evas.append(eva)
+
+    joint = JointEVA(*evas, window=12)
+    assert len(joint.pairs) > 50
+    assert np.all(joint.pairs['Lag'].abs() <= pd.Timedelta(hours=12))
+    fits = joint.fit()
+    assert joint.copula_name == fits['AIC'].idxmin()
+
+    x, y = evas[0].return_value(10), evas[1].return_value(10)
+    assert joint.return_period(x, y, kind='and') >= joint.return_period(x, y, kind='or')
+    grid = joint.return_period(np.linspace(3.5, 4, 5)[:, np.newaxis], np.linspace(3.5, 4, 7)[np.newaxis, :])
+    assert grid.shape == (5, 7) and np.all(np.diff(grid, axis=1) >= 0)
+
+    contours = joint.get_contours([10, 100], resolution=200)
+    for rp in [10, 100]:
+        contour = contours[rp].dropna()
+        assert np.allclose(joint.return_period(contour.index.values, contour.values), rp, rtol=1e-2)
+
+    sample = joint.sample(1000, random_state=0)
+    assert np.all(sample['Surge'] > evas[0].threshold) and np.all(sample['Hs'] > evas[1].threshold)
@@ -0,0 +1,54 @@
+import coastlib.stats.kernels as kernels
+import numpy as np
+import pytest
+
+
+@pytest.fixture
+def times():
+    np.random.seed(0)
+    steps = np.random.choice([1, 1, 1, 2, 5, 50], size=2000)
+    return np.cumsum(steps).astype(np.int64)
+
+
+def test_backend_flag():
+    assert kernels.backend in ['numba', 'numpy']
+    assert (kernels.backend == 'numba') == kernels.numba_available
+    with pytest.raises(ValueError):
+        kernels.set_backend('fortran')
+
+
+@pytest.mark.parametrize('extremes_type', ['high', 'low'])
+def test_decluster_runs(times, extremes_type):
+    values = np.round(np.random.normal(size=len(times)), 1)
+    assert np.array_equal(
+        kernels.decluster_runs(times, values, 3, extremes_type, backend='numba'),
+        kernels.decluster_runs(times, values, 3, extremes_type, backend='numpy')
+    )
+    # Non-integer distance is equivalent to its floor for integer times
+    for r in [2.5, 4.9, -.5]:
+        peaks = kernels.decluster_runs(times, values, np.floor(r), extremes_type, backend='numpy')
+        for backend in ['numba', 'numpy']:
+            assert np.array_equal(kernels.decluster_runs(times, values, r, extremes_type, backend=backend), peaks)
+
+
+def test_collapse_gaps(times):
+    assert np.array_equal(
+        kernels.collapse_gaps(times, gap=4, shift=2, backend='numba'),
+        kernels.collapse_gaps(times, gap=4, shift=2, backend='numpy')
+    )
+
+
+def test_segment_clusters(times):
+    assert np.array_equal(
+        kernels.segment_clusters(times, gap=4, backend='numba'),
+        kernels.segment_clusters(times, gap=4, backend='numpy')
+    )
+
+
+def test_insert_fixed_parameters():
+    chain = np.random.normal(size=(10, 20, 2))
+    fixed_parameters = [(0, 1.5), (2, 0)]
+    full_chain = kernels.insert_fixed_parameters(chain, fixed_parameters, backend='numpy')
+    assert np.array_equal(full_chain, kernels.insert_fixed_parameters(chain, fixed_parameters, backend='numba'))
+    assert np.all(full_chain[:, :, 0] == 1.5) and np.all(full_chain[:, :, 2] == 0)
+    assert np.array_equal(full_chain[:, :, [1, 3]], chain)
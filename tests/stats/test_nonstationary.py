@@ -0,0 +1,45 @@
+import coastlib.stats.nonstationary as nonstationary
+import numpy as np
+import pytest
+import scipy.stats
+
+
+@pytest.mark.parametrize('distribution_name,coefficients', [
+    ('genextreme', np.array([.1, 0, .5, 0])),
+    ('genextreme', np.array([0, 0, .5, 0])),
+    ('genpareto', np.array([.2, .1, .3]))
+])
+def test_log_likelihood_gradient(distribution_name, coefficients):
+    np.random.seed(0)
+    x = np.random.gumbel(size=50)
+    trend = np.column_stack([np.ones(50), np.linspace(0, 1, 50)])
+    if distribution_name == 'genextreme':
+        designs = [np.ones((50, 1)), trend, np.ones((50, 1))]
+    else:
+        x = np.abs(x)
+        designs = [np.ones((50, 1)), trend]
+    link_names = ['identity'] * (len(designs) - 1) + ['log']
+
+    value, gradient = nonstationary.log_likelihood(coefficients, x, distribution_name, designs, link_names)
+    step = 1e-6
+    numerical = [
+        (
+            nonstationary.log_likelihood(coefficients + step * e, x, distribution_name, designs, link_names)[0] -
+            nonstationary.log_likelihood(coefficients - step * e, x, distribution_name, designs, link_names)[0]
+        ) / (2 * step) for e in np.eye(len(coefficients))
+    ]
+    assert np.allclose(gradient, numerical, rtol=1e-3, atol=1e-3)
+
+
+def test_log_density_matches_scipy():
+    x = np.linspace(.1, 5, 20)
+    for shape in [-.2, 0, .2]:
+        assert np.allclose(
+            nonstationary.genextreme_log_density(x, shape, 1, 2)[0],
+            scipy.stats.genextreme.logpdf(x, -shape, 1, 2)
+        )
+        assert np.allclose(
+            nonstationary.genpareto_log_density(x, shape, 2)[0],
+            scipy.stats.genpareto.logpdf(x, shape, 0, 2)
+        )
+    assert np.isneginf(nonstationary.genextreme_log_density(10, -.5, 0, 1)[0])